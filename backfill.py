@@ -0,0 +1,143 @@
+"""
+Historical daily bar backfill into the local bar store (modules/bar_store.py).
+
+Pages backwards through history for many tickers at once under the shared
+KIS rate limit (history lane). Every page is written to the store as soon as
+it arrives, so an interrupted run resumes from the oldest stored day.
+
+Usage:
+    python backfill.py --market US --years 10
+    python backfill.py --market KR --years 5 --tickers 122630 233740
+"""
+import os
+import json
+import argparse
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from modules.bar_store import get_bar_store, rows_to_bars
+
+# Calendar days per domestic range request (keeps each page under the 100-row cap)
+KR_PAGE_DAYS = 140
+
+def _shift(yyyymmdd, days):
+    d = datetime.datetime.strptime(str(yyyymmdd), "%Y%m%d") + datetime.timedelta(days=days)
+    return d.strftime("%Y%m%d")
+
+class Backfill:
+    def __init__(self, market, client, store=None):
+        self.market = market
+        self.kis = client
+        self.store = store or get_bar_store()
+        self.state_path = os.path.join(self.store.root, market, "_backfill.json")
+        self.state = self._load_state()
+        self._state_lock = threading.Lock() # workers update state while run() saves it
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        with self._state_lock:
+            text = json.dumps(self.state, indent=1)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, self.state_path)
+
+    def _fetch_page(self, ticker, end):
+        """One page of rows ending at 'end' (inclusive), latest first"""
+        if self.market == "US":
+            return self.kis.get_daily_ohlc(ticker, bymd=end)
+        return self.kis.get_daily_ohlc_range(ticker, _shift(end, -KR_PAGE_DAYS), end)
+
+    def run_ticker(self, ticker, start):
+        """Fill [start, today] for one ticker. Returns number of stored bars."""
+        fetch_latest = (lambda t: self._fetch_page(t, datetime.datetime.now().strftime("%Y%m%d")))
+        restarted = False
+
+        # Top of history first (same delta sync as session start)
+        self.store.sync(self.market, ticker, fetch_latest)
+
+        while True:
+            bars = self.store.load(self.market, ticker)
+            if len(bars) == 0:
+                return 0
+            oldest = int(bars["date"][0])
+            with self._state_lock:
+                listed_from = self.state.get(ticker, {}).get("listed_from")
+            if oldest <= int(start) or listed_from == oldest:
+                return len(bars) # Reached the requested start / first listed day
+
+            # The page ends ON the oldest stored day: the overlapping day is compared
+            # against the store, which is how an adjusted-price revision is detected
+            rows = self._fetch_page(ticker, str(oldest))
+            if rows is None:
+                print(f"[Backfill] {ticker}: request failed at {oldest}, will resume on next run.")
+                return len(bars)
+            page = rows_to_bars(rows)
+            if len(page) == 0 or int(page["date"][0]) >= oldest:
+                # No older data: the ticker was listed on 'oldest'
+                with self._state_lock:
+                    self.state[ticker] = {"listed_from": oldest}
+                return len(bars)
+
+            _, status = self.store.prepend(self.market, ticker, page)
+            if status == "gap":
+                print(f"[Backfill] {ticker}: page before {oldest} does not overlap the store, will resume on next run.")
+                return len(bars)
+            if status == "revised":
+                if restarted:
+                    print(f"[Backfill] {ticker}: prices keep being revised, giving up for now.")
+                    return len(bars)
+                # Adjusted-price revision happened since the stored pages: start over
+                print(f"[Backfill] {ticker}: adjusted price revision, restarting from today.")
+                self.store.delete(self.market, ticker)
+                with self._state_lock:
+                    self.state.pop(ticker, None)
+                self.store.sync(self.market, ticker, fetch_latest)
+                restarted = True
+
+    def run(self, tickers, start, workers=8):
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill") as pool:
+            futures = {pool.submit(self.run_ticker, t, start): t for t in tickers}
+            for fut in as_completed(futures):
+                ticker = futures[fut]
+                try:
+                    results[ticker] = fut.result()
+                except Exception as e:
+                    print(f"[Backfill] {ticker}: failed ({e})")
+                    results[ticker] = None
+                bars = self.store.load(self.market, ticker)
+                first = int(bars["date"][0]) if len(bars) else "-"
+                print(f"[Backfill] {ticker}: {results[ticker]} bars (from {first})")
+                self._save_state()
+        return results
+
+if __name__ == "__main__":
+    from run_bot import TARGET_TICKERS_US, TARGET_TICKERS_KR
+
+    parser = argparse.ArgumentParser(description="Backfill daily bars into the local bar store")
+    parser.add_argument("--market", choices=["US", "KR"], default="US")
+    parser.add_argument("--years", type=float, default=10)
+    parser.add_argument("--tickers", nargs="*")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.market == "US":
+        from modules.kis_api import KisOverseas
+        client = KisOverseas()
+        tickers = args.tickers or TARGET_TICKERS_US
+    else:
+        from modules.kis_domestic import KisDomestic
+        client = KisDomestic()
+        tickers = args.tickers or TARGET_TICKERS_KR
+
+    start = (datetime.datetime.now() - datetime.timedelta(days=int(args.years * 365.25))).strftime("%Y%m%d")
+    print(f"[Backfill] {args.market} {tickers} from {start}")
+    Backfill(args.market, client).run(tickers, start, args.workers)
@@ -0,0 +1,104 @@
+"""
+Dashboard log parsing on a large trading log (modules/log_parser.py).
+A synthetic ~100 MB log in the bot's format is generated once into the temp dir.
+Full refresh = what the dashboard did on every rerun before LogTail; tail refresh =
+one rerun after NEW_LINES lines were appended to the (already tailed) log.
+Usage: python -m benchmarks.bench_log_parser [--json out.json]
+"""
+import os
+import shutil
+import time
+import random
+import tempfile
+import datetime
+import pandas as pd
+from modules.log_parser import parse_log_file, build_ticker_data, extract_trades, LogTail
+from benchmarks.common import cli
+
+LOG_MB = 100
+NEW_LINES = 1000
+TICKERS = ["NVDL", "SOXL", "TQQQ", "TECL", "FNGU", "BITX", "CONL", "TSLA", "122630", "233740", "449200"]
+
+def make_log(path, size_mb=LOG_MB, seed=0):
+    """Realistic mix of heartbeat, session setup, breakout and order lines"""
+    rng = random.Random(seed)
+    ts = datetime.datetime(2025, 1, 2, 23, 30)
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            ts += datetime.timedelta(milliseconds=rng.randint(50, 2000))
+            t = rng.choice(TICKERS)
+            price = round(rng.uniform(20, 200), 4)
+            r = rng.random()
+            if r < 0.4:
+                msg = "Heartbeat: Bot is alive... Market Status: US"
+            elif r < 0.6:
+                msg = f"[{t}] Current: {price}, MA20: {round(price * 0.98, 4)}"
+            elif r < 0.75:
+                msg = f"[{t}] Bull Market! Target Price: {round(price * 1.01, 4)} (Open: {price})"
+            elif r < 0.85:
+                msg = f"[{t}] Bear Market (Price < 20MA). Skipping."
+            elif r < 0.95:
+                msg = f"[{t}] Breakout Detected! ({price} >= {round(price * 0.999, 4)}) via ws"
+            else:
+                msg = f"[{t}] Selling Market Order..."
+            line = f"{ts:%Y-%m-%d %H:%M:%S},{ts.microsecond // 1000:03d} - INFO - {msg}\n"
+            f.write(line)
+            written += len(line)
+    return path
+
+def run(seconds=1.0):
+    path = os.path.join(tempfile.gettempdir(), f"bench_trading_{LOG_MB}mb.log")
+    if not os.path.exists(path) or os.path.getsize(path) < LOG_MB * 1024 * 1024:
+        print(f"Generating {LOG_MB} MB log at {path}...")
+        make_log(path)
+    size_mb = os.path.getsize(path) / 1024 / 1024
+
+    t0 = time.perf_counter()
+    parsed = parse_log_file(path)
+    t1 = time.perf_counter()
+    build_ticker_data(parsed)
+    extract_trades(parsed)
+    t2 = time.perf_counter()
+    pd.DataFrame(parsed)
+    t3 = time.perf_counter()
+
+    # Incremental: tail a copy of the log, append NEW_LINES, time one dashboard refresh
+    copy = path + ".tail"
+    shutil.copyfile(path, copy)
+    try:
+        tail = LogTail(copy)
+        t4 = time.perf_counter()
+        tail.poll()
+        t5 = time.perf_counter()
+        extra = make_log(copy + ".new", size_mb=0.1, seed=1)
+        with open(extra, encoding="utf-8") as src, open(copy, "a", encoding="utf-8") as dst:
+            for _, line in zip(range(NEW_LINES), src):
+                dst.write(line)
+        t6 = time.perf_counter()
+        new = tail.poll()
+        pd.DataFrame(list(tail.lines))
+        t7 = time.perf_counter()
+    finally:
+        for p in (copy, copy + ".new"):
+            if os.path.exists(p):
+                os.remove(p)
+
+    print(f"parse {size_mb:.0f} MB ({len(parsed):,} lines)   {t1 - t0:6.2f} s  ({size_mb / (t1 - t0):.1f} MB/s)")
+    print(f"ticker state + trades          {t2 - t1:6.2f} s")
+    print(f"DataFrame (System Logs)        {t3 - t2:6.2f} s")
+    print(f"full dashboard refresh         {t3 - t0:6.2f} s")
+    print(f"tail: initial load             {t5 - t4:6.2f} s")
+    print(f"tail: refresh (+{new} lines)    {(t7 - t6) * 1000:6.2f} ms")
+    return {
+        "log_tail_initial_s": t5 - t4,
+        "log_tail_refresh_ms": (t7 - t6) * 1000,
+        "log_parse_mb_per_sec": size_mb / (t1 - t0),
+        "log_ticker_state_s": t2 - t1,
+        "log_dataframe_s": t3 - t2,
+        "log_full_refresh_s": t3 - t0,
+    }
+
+if __name__ == "__main__":
+    cli(run, "Dashboard log parsing")
@@ -0,0 +1,90 @@
+"""
+RateLimiter.wait() overhead, throughput and fairness (private state file, no KIS calls).
+Usage: python -m benchmarks.bench_rate_limiter [--seconds 1] [--json out.json]
+"""
+import os
+import time
+import tempfile
+import threading
+from modules.rate_limiter import RateLimiter
+from benchmarks.common import cli, percentile
+
+def uncontended(path, seconds):
+    """Cost of one wait() when a slot is always free (flock + mmap read/write)"""
+    limiter = RateLimiter(max_calls=64, period=1e-9, path=path)
+    n = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(1000):
+            limiter.wait("quote")
+        n += 1000
+    return (time.perf_counter() - start) / n * 1e6
+
+def contended(path, seconds, max_calls=15, period=0.1, quote_threads=3):
+    """
+    Quote threads saturate the window while one order thread fires every 50 ms.
+    Returns achieved rate, worst window overshoot, per-thread quote share and order queueing.
+    """
+    limiter = RateLimiter(max_calls=max_calls, period=period, path=path)
+    stamps, counts, order_waits = [], [0] * quote_threads, []
+    lock = threading.Lock()
+    end = time.monotonic() + seconds
+
+    def quote(i):
+        while time.monotonic() < end:
+            if limiter.wait("quote"):
+                with lock:
+                    stamps.append(time.monotonic())
+                counts[i] += 1
+
+    def order():
+        while time.monotonic() < end:
+            t0 = time.perf_counter()
+            if limiter.wait("order"):
+                order_waits.append(time.perf_counter() - t0)
+                with lock:
+                    stamps.append(time.monotonic())
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=quote, args=(i,)) for i in range(quote_threads)]
+    threads.append(threading.Thread(target=order))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Largest number of calls inside any 'period' window (must never exceed max_calls)
+    stamps.sort()
+    worst, j = 0, 0
+    for i, ts in enumerate(stamps):
+        while ts - stamps[j] >= period:
+            j += 1
+        worst = max(worst, i - j + 1)
+    return {
+        "calls_per_sec": len(stamps) / seconds,
+        "overshoot_count": max(0, worst - max_calls),
+        "quote_fairness_ratio": min(counts) / max(counts) if max(counts) else 0.0,
+        "order_wait_p50_ms": percentile(order_waits, 0.5) * 1000,
+        "order_wait_p99_ms": percentile(order_waits, 0.99) * 1000,
+        "limit_per_sec": max_calls / period,
+    }
+
+def run(seconds=1.0):
+    tmp = tempfile.mkdtemp(prefix="bench_rl_")
+    results = {"wait_uncontended_us": uncontended(os.path.join(tmp, "a.bin"), seconds)}
+    print(f"wait() uncontended            {results['wait_uncontended_us']:8.2f} us/call")
+
+    c = contended(os.path.join(tmp, "b.bin"), max(seconds, 2.0))
+    print(f"contended throughput          {c['calls_per_sec']:8.1f} calls/s (limit {c['limit_per_sec']:.0f}/s, overshoot {c['overshoot_count']})")
+    print(f"quote fairness (min/max)      {c['quote_fairness_ratio']:8.2f}")
+    print(f"order wait under quote load   p50 {c['order_wait_p50_ms']:.1f} ms, p99 {c['order_wait_p99_ms']:.1f} ms")
+    results.update({
+        "contended_overshoot_count": c["overshoot_count"],
+        "quote_fairness_ratio": c["quote_fairness_ratio"],
+        "order_wait_p99_ms": c["order_wait_p99_ms"],
+        "contended_throughput_ratio": c["calls_per_sec"] / c["limit_per_sec"],
+    })
+    return results
+
+if __name__ == "__main__":
+    cli(run, "RateLimiter overhead and fairness")
@@ -0,0 +1,48 @@
+"""
+WebSocket tick decoder throughput (single core).
+Usage: python -m benchmarks.bench_tick_decoder [--seconds 1] [--json out.json]
+"""
+import time
+from modules.tick_decoder import decode_frame, decode_frames, HDFSCNT0_FIELDS, H0STCNT0_FIELDS
+from benchmarks.common import cli
+
+def make_frame(tr_id, fields, symbols, records):
+    """Synthetic frame with 'records' records cycling through 'symbols'."""
+    payload = []
+    for i in range(records):
+        rec = ["0"] * len(fields)
+        rec[0] = symbols[i % len(symbols)]
+        rec[1] = "093015"
+        rec[2] = rec[11] = f"{100 + i * 0.01:.2f}" # price slot of either layout
+        rec[12] = rec[19] = str(10 + i)
+        payload.extend(rec)
+    return f"0|{tr_id}|{records:03d}|" + "^".join(payload)
+
+def bench(name, fn, frames, records_per_frame, seconds=1.0):
+    n = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn(frames)
+        n += len(frames)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<34} {n / elapsed:>12,.0f} msg/s {n * records_per_frame / elapsed:>12,.0f} records/s")
+    return n / elapsed
+
+def run(seconds=1.0):
+    us = ["DNASTQQQ", "DNASSOXL", "DNASTECL", "DNASNVDL"]
+    kr = ["122630", "233740", "449200"]
+    results = {}
+    for records in (1, 4):
+        us_frames = [make_frame("HDFSCNT0", HDFSCNT0_FIELDS, us, records)] * 1000
+        kr_frames = [make_frame("H0STCNT0", H0STCNT0_FIELDS, kr, records)] * 1000
+        decode_each = lambda fs: [decode_frame(f) for f in fs]
+        results[f"decode_frame_hdfscnt0_x{records}_msgs_per_sec"] = bench(
+            f"decode_frame HDFSCNT0 x{records}", decode_each, us_frames, records, seconds)
+        results[f"decode_frame_h0stcnt0_x{records}_msgs_per_sec"] = bench(
+            f"decode_frame H0STCNT0 x{records}", decode_each, kr_frames, records, seconds)
+        results[f"decode_frames_hdfscnt0_x{records}_msgs_per_sec"] = bench(
+            f"decode_frames (NumPy) HDFSCNT0 x{records}", decode_frames, us_frames, records, seconds)
+    return results
+
+if __name__ == "__main__":
+    cli(run, "WebSocket tick decoder throughput")
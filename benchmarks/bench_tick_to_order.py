@@ -0,0 +1,78 @@
+"""
+End-to-end tick-to-order latency against the local KIS stand-in (modules/kis_stub.py):
+stub sends a breakout tick -> KisWebSocket decode/route -> BreakoutEngine.on_tick ->
+AI gate (prefetched stub verdict) -> KisOverseas.buy_market_order (order-lane quote + order POST)
+-> order received by the stub. Measured wire to wire on the stub's clock.
+Usage: python -m benchmarks.bench_tick_to_order [--seconds 1] [--json out.json]
+"""
+import time
+import logging
+import threading
+from modules.kis_stub import KisStubServer
+from benchmarks.kis_stub_load import configure
+from benchmarks.common import cli, percentile
+
+def run(seconds=1.0, latency=0.0):
+    server = KisStubServer(latency=latency, rate_limit=None, tick_rate=0, ping_interval=None).start()
+    configure(server)
+
+    from modules.logger import set_file_logging, set_console_level, set_journal_dir
+    from modules.kis_api import KisOverseas
+    from modules.kis_websocket import KisWebSocket
+    from modules.breakout_engine import BreakoutEngine
+    from modules.simulation import StubAnalyst
+    from modules.sentiment_prefetcher import SentimentPrefetcher
+
+    # Keep benchmark orders out of the trading log / console / journal
+    set_file_logging(False)
+    set_console_level(logging.WARNING)
+    set_journal_dir(None)
+
+    kis = KisOverseas()
+    targets = {"TQQQ": {"target": 1.0, "trend": None, "status": "monitoring", "buys": 0}}
+    sentiment = SentimentPrefetcher(StubAnalyst(), "US", ["TQQQ"]).start()
+    engine = BreakoutEngine("US", kis, sentiment, targets, 1)
+
+    async def on_tick(ticker, price):
+        engine.on_tick(ticker, price, source="ws")
+
+    ws = KisWebSocket(["TQQQ"], on_tick, market="US")
+    threading.Thread(target=ws.start, daemon=True).start()
+    deadline = time.monotonic() + 10
+    while server.stats["subscriptions"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Two REST calls per order; pace below the 15 req/s limiter so queueing is not measured
+    iterations = max(20, int(seconds * 6))
+    lat = []
+    try:
+        for _ in range(iterations):
+            targets["TQQQ"]["status"] = "monitoring"
+            before = len(server.orders)
+            sent = server.push("DNASTQQQ", price=100.0)
+            end = time.monotonic() + 2
+            while len(server.orders) == before and time.monotonic() < end:
+                time.sleep(0.0002)
+            if len(server.orders) > before:
+                lat.append(server.orders[-1][0] - sent)
+            time.sleep(0.15)
+    finally:
+        ws.stop()
+        engine.shutdown()
+        sentiment.stop()
+        server.stop()
+
+    client = engine.latency_summary() or {}
+    results = {
+        "tick_to_order_p50_ms": percentile(lat, 0.5) * 1000,
+        "tick_to_order_p99_ms": percentile(lat, 0.99) * 1000,
+        "tick_to_order_max_ms": max(lat) * 1000 if lat else 0.0,
+        "missed_orders_count": iterations - len(lat),
+    }
+    print(f"tick-to-order (wire)   p50 {results['tick_to_order_p50_ms']:.2f} ms   p99 {results['tick_to_order_p99_ms']:.2f} ms   "
+          f"max {results['tick_to_order_max_ms']:.2f} ms   ({len(lat)}/{iterations} orders, stub latency {latency * 1000:.0f} ms)")
+    print(f"engine (on_tick -> order response)  {client}")
+    return results
+
+if __name__ == "__main__":
+    cli(run, "Tick-to-order latency against the KIS stand-in")
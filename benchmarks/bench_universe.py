@@ -0,0 +1,70 @@
+"""
+Session-setup indicators for the whole universe: per-ticker calculate_ma /
+calculate_target_price (the original loop) vs. the vectorized strategies.universe path,
+plus the per-tick cost of the streaming MA20 trend check.
+Usage: python -m benchmarks.bench_universe [--seconds 1] [--json out.json]
+"""
+import time
+import random
+from strategies.technical import calculate_ma, check_trend, SMA
+from strategies.volatility_breakout import calculate_target_price
+from strategies.universe import to_bar_matrix, calculate_universe_targets, check_trend_universe
+from benchmarks.common import cli
+
+def make_ohlc(n_tickers, days=100, seed=0):
+    """KIS-style daily rows (strings, latest first) for n_tickers"""
+    rng = random.Random(seed)
+    universe = []
+    for _ in range(n_tickers):
+        close, rows = 100.0, []
+        for _ in range(days):
+            open_ = close * (1 + rng.gauss(0, 0.01))
+            high, low = max(open_, close) * 1.01, min(open_, close) * 0.99
+            rows.append({"open": f"{open_:.4f}", "high": f"{high:.4f}", "low": f"{low:.4f}", "clos": f"{close:.4f}"})
+            close = open_ * (1 + rng.gauss(0, 0.01))
+        universe.append(rows)
+    return universe
+
+def scalar(ohlc_list, prices):
+    out = []
+    for ohlc, price in zip(ohlc_list, prices):
+        ma = calculate_ma([float(x['clos']) for x in ohlc[:20]])
+        if check_trend(price, ma):
+            out.append(calculate_target_price(float(ohlc[0]['open']), ohlc, 0.5))
+    return out
+
+def vectorized(ohlc_list, prices):
+    ind = calculate_universe_targets(to_bar_matrix(ohlc_list), 20, 0.5)
+    return ind["target"][check_trend_universe(prices, ind["ma"])]
+
+def timed(fn, args, seconds):
+    n = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn(*args)
+        n += 1
+    return (time.perf_counter() - start) / n * 1000
+
+def run(seconds=1.0):
+    results = {}
+    for n in (8, 500):
+        ohlc = make_ohlc(n)
+        prices = [float(x[0]['clos']) for x in ohlc]
+        s_ms, v_ms = timed(scalar, (ohlc, prices), seconds), timed(vectorized, (ohlc, prices), seconds)
+        print(f"universe {n:>4} tickers   scalar {s_ms:8.3f} ms   vectorized {v_ms:8.3f} ms   ({s_ms / v_ms:.1f}x)")
+        results[f"universe_{n}_scalar_ms"] = s_ms
+        results[f"universe_{n}_vectorized_ms"] = v_ms
+
+    # Streaming trend check as run on every tick by BreakoutEngine
+    sma = SMA(20).warm([100.0 + i * 0.1 for i in range(20)])
+    ticks = [101.0 + (i % 100) * 0.01 for i in range(100000)]
+    start = time.perf_counter()
+    for p in ticks:
+        check_trend(p, sma.peek_last(p))
+    per_tick_ns = (time.perf_counter() - start) / len(ticks) * 1e9
+    print(f"streaming MA20 trend check  {per_tick_ns:8.0f} ns/tick")
+    results["trend_check_per_tick_ns"] = per_tick_ns
+    return results
+
+if __name__ == "__main__":
+    cli(run, "Universe target / trend computation")
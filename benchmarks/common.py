@@ -0,0 +1,22 @@
+import json
+import argparse
+
+# Shared helpers for the benchmark scripts.
+# Metric names carry their direction (see run_all.py):
+#   *_per_sec / *_ratio -> higher is better, *_ms / *_us / *_ns / *_s / *_count -> lower is better
+
+def percentile(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))] if xs else 0.0
+
+def cli(run, description, seconds=1.0):
+    """Standard entry point: --seconds per measurement, --json to write the results"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--seconds", type=float, default=seconds)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+    results = run(args.seconds)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
@@ -0,0 +1,128 @@
+"""
+Client load / fault scenarios against the local KIS stand-in (modules/kis_stub.py).
+No network access or real credentials needed; limiter and token state go to a temp dir.
+Usage: python -m benchmarks.kis_stub_load [--seconds 5]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+from modules.kis_stub import KisStubServer
+
+def configure(server):
+    """Point every KIS client at the stub (must run before config is imported)"""
+    tmp = tempfile.mkdtemp(prefix="kis_stub_")
+    os.environ.update({
+        "KIS_BASE_URL": server.base_url,
+        "KIS_WS_URL": server.ws_url,
+        "KIS_TOKEN_FILE": os.path.join(tmp, "credentials.json"),
+        "KIS_RATE_LIMIT_FILE": os.path.join(tmp, "ratelimit.bin"),
+        "BAR_STORE_DIR": os.path.join(tmp, "bars"),
+        "KIS_APP_KEY": os.environ.get("KIS_APP_KEY") or "stub-app-key",
+        "KIS_APP_SECRET": os.environ.get("KIS_APP_SECRET") or "stub-app-secret",
+    })
+    if "config" in sys.modules:
+        raise RuntimeError("configure() must run before config is imported")
+
+def pct(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))] * 1000 if xs else 0.0
+
+def quote_throughput(server, seconds, tickers):
+    """Concurrent quote fan-out through AsyncKisOverseas + RateLimiter"""
+    from modules.kis_api import KisOverseas
+    from modules.kis_async import AsyncKisOverseas
+
+    kis = AsyncKisOverseas(KisOverseas())
+    lat, ok, failed = [], 0, 0
+
+    async def worker(ticker):
+        nonlocal ok, failed
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            t0 = time.perf_counter()
+            price = await kis.get_current_price(ticker)
+            lat.append(time.perf_counter() - t0)
+            if price:
+                ok += 1
+            else:
+                failed += 1
+
+    async def main():
+        await asyncio.gather(*(worker(t) for t in tickers))
+
+    before = dict(server.stats)
+    asyncio.run(main())
+    kis.close()
+    throttled = server.stats["throttled"] - before["throttled"]
+    print(f"  quotes ok {ok / seconds:6.1f}/s  failed {failed}  EGW00201 {throttled}  "
+          f"p50 {pct(lat, 0.5):.1f} ms  p99 {pct(lat, 0.99):.1f} ms")
+    return {"quotes_per_sec": ok / seconds, "failed": failed, "throttled": throttled, "p99_ms": pct(lat, 0.99)}
+
+def token_sharing(server, clients=5):
+    """Several clients/threads at once: one tokenP call, no EGW00133"""
+    from modules.kis_api import KisOverseas
+    before = server.stats["tokens"], server.stats["token_rejected"]
+    threads = [threading.Thread(target=KisOverseas) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    issued = server.stats["tokens"] - before[0]
+    rejected = server.stats["token_rejected"] - before[1]
+    print(f"  {clients} clients -> tokenP issued {issued}, EGW00133 {rejected}")
+    return {"tokens_issued": issued, "token_rejected": rejected}
+
+def websocket_drops(server, seconds, tickers, drop_every=2.0):
+    """KisWebSocket against a server that drops the connection every few seconds"""
+    from modules.kis_websocket import KisWebSocket
+    received = {t: 0 for t in tickers}
+
+    async def on_tick(ticker, price):
+        received[ticker] += 1
+
+    ws = KisWebSocket(tickers, on_tick, market="US")
+    ws.BACKOFF_MIN = 0.2
+    threading.Thread(target=ws.start, daemon=True).start()
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        time.sleep(drop_every)
+        server.drop_sockets()
+    ws.stop()
+    total = sum(received.values())
+    print(f"  ticks {total} ({total / seconds:.0f}/s)  reconnects {ws.reconnects}  "
+          f"per ticker {received}")
+    return {"ticks": total, "reconnects": ws.reconnects, "silent_tickers": [t for t, n in received.items() if not n]}
+
+def run(seconds=5.0):
+    server = KisStubServer(latency=0.01, jitter=0.01, rate_limit=20, tick_rate=20).start()
+    configure(server)
+    tickers = ["TQQQ", "SOXL", "TECL", "NVDL", "FNGU", "BITX", "CONL", "TSLA"]
+    results = {}
+    try:
+        print("[Stub] Token sharing")
+        results["token"] = token_sharing(server)
+        print("[Stub] Quote fan-out, gateway limit 20/s")
+        results["quotes"] = quote_throughput(server, seconds, tickers)
+        print("[Stub] Quote fan-out, gateway limit cut to 10/s (EGW00201 storm)")
+        server.rate_limit = 10
+        results["quotes_throttled"] = quote_throughput(server, seconds, tickers)
+        server.rate_limit = 20
+        print("[Stub] Quote fan-out, 50 ms latency + 5% HTTP 500")
+        server.latency, server.error_rate = 0.05, 0.05
+        results["quotes_faulty"] = quote_throughput(server, seconds, tickers)
+        server.latency, server.error_rate = 0.01, 0.0
+        print("[Stub] WebSocket with socket drops")
+        results["websocket"] = websocket_drops(server, seconds, tickers[:3])
+    finally:
+        server.stop()
+    print(f"[Stub] Server stats: {server.stats}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    run(parser.parse_args().seconds)
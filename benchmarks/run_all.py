@@ -0,0 +1,182 @@
+"""
+Run the whole benchmark suite, store the results and compare them with the stored baseline.
+Each benchmark runs in its own process so module state (config, logger, limiter file) never leaks between them.
+Exit code 1 if any metric regressed by more than --tolerance.
+
+Usage:
+    python -m benchmarks.run_all                      # run + compare with benchmarks/baseline.json
+    python -m benchmarks.run_all --only bench_universe bench_tick_decoder
+    python -m benchmarks.run_all --update-baseline    # accept the current numbers as the new baseline
+    python -m benchmarks.run_all --repeat 3           # best of 3 per metric (noisy / shared hosts)
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_DIR = os.path.join(ROOT, "database", "bench")
+
+BENCHMARKS = [
+    "bench_rate_limiter",
+    "bench_tick_decoder",
+    "bench_universe",
+    "bench_log_parser",
+    "bench_tick_to_order",
+]
+
+HIGHER_BETTER = ("_per_sec", "_ratio")
+LOWER_BETTER = ("_ms", "_us", "_ns", "_s", "_count")
+# Tail latencies (p99 / max over a few dozen samples) get twice the tolerance
+TAIL_MARKERS = ("_p99_", "_max_")
+
+def direction(metric):
+    """+1 if higher is better, -1 if lower is better, 0 if the name carries no direction"""
+    if metric.endswith(HIGHER_BETTER):
+        return 1
+    if metric.endswith(LOWER_BETTER):
+        return -1
+    return 0
+
+def best_of(runs):
+    """Merge repeated runs of one benchmark keeping the best value of each metric"""
+    merged = {}
+    for results in runs:
+        for metric, value in results.items():
+            if metric not in merged:
+                merged[metric] = value
+            elif direction(metric) > 0:
+                merged[metric] = max(merged[metric], value)
+            elif direction(metric) < 0:
+                merged[metric] = min(merged[metric], value)
+    return merged
+
+def run_bench(name, seconds):
+    """Run one benchmark module in a subprocess and return its metrics (None on failure)"""
+    fd, out = tempfile.mkstemp(prefix=f"{name}_", suffix=".json")
+    os.close(fd)
+    try:
+        cmd = [sys.executable, "-m", f"benchmarks.{name}", "--seconds", str(seconds), "--json", out]
+        proc = subprocess.run(cmd, cwd=ROOT)
+        if proc.returncode != 0:
+            print(f"[Bench] {name} failed (exit {proc.returncode})")
+            return None
+        with open(out, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(out)
+
+def compare(current, baseline, tolerance):
+    """
+    Compare metric by metric. Returns list of (metric, base, now, change, verdict).
+    change is the relative move in the 'worse' direction (positive = slower / fewer).
+    """
+    rows = []
+    for metric, now in sorted(current.items()):
+        base = baseline.get(metric)
+        sign = direction(metric)
+        if base is None or sign == 0:
+            rows.append((metric, base, now, None, "new" if base is None else "-"))
+            continue
+        if base == 0:
+            # e.g. missed_orders_count / overshoot_count: any increase is a regression
+            worse = sign < 0 and now > 0 or sign > 0 and now < 0
+            rows.append((metric, base, now, None, "REGRESSED" if worse else "ok"))
+            continue
+        change = (base - now) / abs(base) if sign > 0 else (now - base) / abs(base)
+        limit = tolerance * 2 if any(m in metric for m in TAIL_MARKERS) else tolerance
+        if change > limit:
+            verdict = "REGRESSED"
+        elif change < -limit:
+            verdict = "improved"
+        else:
+            verdict = "ok"
+        rows.append((metric, base, now, change, verdict))
+    return rows
+
+def host_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all benchmarks and check for regressions")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="Run only these benchmarks")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Measurement time per benchmark step")
+    parser.add_argument("--repeat", type=int, default=1, help="Run each benchmark N times and keep the best value")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Write the current results as the new baseline")
+    args = parser.parse_args()
+
+    current, failed = {}, []
+    for name in args.only or BENCHMARKS:
+        print(f"\n=== {name} ===")
+        runs = []
+        for _ in range(max(1, args.repeat)):
+            results = run_bench(name, args.seconds)
+            if results is None:
+                break
+            runs.append(results)
+        if len(runs) < max(1, args.repeat):
+            failed.append(name)
+        else:
+            current.update(best_of(runs))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    record = {"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), "host": host_info(), "repeat": args.repeat, "metrics": current}
+    result_file = os.path.join(RESULTS_DIR, f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    print(f"\nResults saved to {result_file}")
+
+    if args.update_baseline:
+        if failed:
+            print(f"Not updating baseline: {', '.join(failed)} failed")
+            return 1
+        # Keep metrics of benchmarks that were not re-run this time
+        metrics = {}
+        if args.only and os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                metrics = json.load(f).get("metrics", {})
+        metrics.update(current)
+        record["metrics"] = metrics
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline yet. Run with --update-baseline to create one.")
+        return 1 if failed else 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        base = json.load(f)
+    if base.get("host", {}).get("platform") != host_info()["platform"]:
+        print(f"Note: baseline recorded on {base.get('host', {}).get('platform')} - numbers may not be comparable")
+
+    rows = compare(current, base.get("metrics", {}), args.tolerance)
+    print(f"\n{'metric':<42}{'baseline':>12}{'current':>12}{'change':>9}  verdict")
+    for metric, b, now, change, verdict in rows:
+        b_str = f"{b:12.3f}" if isinstance(b, (int, float)) else f"{'-':>12}"
+        c_str = f"{change * 100:+8.1f}%" if change is not None else f"{'':>9}"
+        print(f"{metric:<42}{b_str}{now:12.3f}{c_str}  {verdict}")
+
+    regressed = [r[0] for r in rows if r[4] == "REGRESSED"]
+    if regressed or failed:
+        print(f"\nFAIL: regressed {regressed or '-'}, failed {failed or '-'} (tolerance {args.tolerance:.0%})")
+        return 1
+    print(f"\nOK: no regressions beyond {args.tolerance:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,4 +16,68 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # Base URLs
 KIS_URL_REAL = "https://openapi.koreainvestment.com:9443"
 KIS_URL_MOCK = "https://openapivts.koreainvestment.com:29443"
-KIS_BASE_URL = KIS_URL_MOCK if KIS_MOCK else KIS_URL_REAL
+KIS_BASE_URL = os.getenv("KIS_BASE_URL") or (KIS_URL_MOCK if KIS_MOCK else KIS_URL_REAL)
+
+# WebSocket (real-time) URLs; KIS_BASE_URL / KIS_WS_URL can point at a local stand-in (modules/kis_stub.py)
+KIS_WS_URL_REAL = "ws://ops.koreainvestment.com:21000"
+KIS_WS_URL_MOCK = "ws://ops.koreainvestment.com:31000"
+KIS_WS_URL = os.getenv("KIS_WS_URL") or (KIS_WS_URL_MOCK if KIS_MOCK else KIS_WS_URL_REAL)
+
+# HTTP Connection Pool Config (KIS REST)
+KIS_POOL_SIZE = int(os.getenv("KIS_POOL_SIZE", "10"))
+KIS_CONNECT_TIMEOUT = float(os.getenv("KIS_CONNECT_TIMEOUT", "3.05"))
+KIS_READ_TIMEOUT = float(os.getenv("KIS_READ_TIMEOUT", "10"))
+
+# Host-wide Rate Limiter state file (default: <tmp>/kis_ratelimit_<appkey hash>.bin)
+KIS_RATE_LIMIT_FILE = os.getenv("KIS_RATE_LIMIT_FILE")
+
+# Shared KIS credential cache (access token / WebSocket approval key)
+KIS_TOKEN_FILE = os.getenv("KIS_TOKEN_FILE", "database/kis_credentials.json")
+
+# Real-time mode: drive breakouts from the KIS WebSocket feed (REST polling only as fallback)
+KIS_STREAMING = os.getenv("KIS_STREAMING", "True").lower() == "true"
+
+# Local daily bar store (one .npy per ticker)
+BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", "database/bars")
+
+# Record streamed ticks to <dir>/<market>/<YYYYMMDD>.csv for replay.py (off when unset)
+TICK_RECORD_DIR = os.getenv("TICK_RECORD_DIR")
+
+# AI sentiment verdict cache (shared by all tickers, persisted across job() restarts)
+AI_VERDICT_CACHE_FILE = os.getenv("AI_VERDICT_CACHE_FILE", "database/ai_verdicts.json")
+AI_VERDICT_TTL = int(os.getenv("AI_VERDICT_TTL", "900"))
+AI_VERDICT_CACHE_SIZE = int(os.getenv("AI_VERDICT_CACHE_SIZE", "256"))
+# Reuse the fetched RSS headlines for this many seconds
+AI_NEWS_TTL = int(os.getenv("AI_NEWS_TTL", "60"))
+
+# Background AI sentiment refresh: the breakout path only reads the latest verdict
+AI_REFRESH_INTERVAL = int(os.getenv("AI_REFRESH_INTERVAL", "60"))
+AI_MAX_STALENESS = int(os.getenv("AI_MAX_STALENESS", "300")) # older verdict -> no buy
+AI_READY_TIMEOUT = float(os.getenv("AI_READY_TIMEOUT", "5")) # max wait for the first verdict at session start
+
+# News RSS sources per market (comma-separated URLs) and headlines kept per source
+NEWS_SOURCES_US = [u.strip() for u in os.getenv("NEWS_SOURCES_US", ",".join([
+    "https://www.cnbc.com/id/10000664/device/rss/rss.html", # CNBC Finance
+    "https://www.cnbc.com/id/19854910/device/rss/rss.html", # CNBC Technology
+    "https://feeds.content.dowjones.io/public/rss/mw_topstories", # MarketWatch
+])).split(",") if u.strip()]
+NEWS_SOURCES_KR = [u.strip() for u in os.getenv("NEWS_SOURCES_KR", ",".join([
+    "https://www.yna.co.kr/rss/economy.xml", # 연합뉴스 경제
+    "https://www.hankyung.com/feed/finance", # 한국경제 증권
+])).split(",") if u.strip()]
+NEWS_MAX_ITEMS = int(os.getenv("NEWS_MAX_ITEMS", "10"))
+
+# Hot-path latency metrics (modules/metrics.py)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0")) # Prometheus /metrics on 127.0.0.1:<port> (0 = off)
+METRICS_FILE = os.getenv("METRICS_FILE", "database/metrics.prom") # rewritten every METRICS_INTERVAL s (empty = off)
+METRICS_INTERVAL = int(os.getenv("METRICS_INTERVAL", "15"))
+METRICS_DIR = os.getenv("METRICS_DIR", "database/metrics") # per-session p50/p99 summary (<market>_<date>.json)
+
+# Typed event journal (modules/logger.py): <dir>/<YYYYMMDD>.jsonl + per-ticker offset index
+JOURNAL_DIR = os.getenv("JOURNAL_DIR", "database/journal")
+
+# Trading log (modules/logger.py): <dir>/trading_<YYYYMMDD>.log, size-rotated within a day
+LOG_DIR = os.getenv("LOG_DIR", "database")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "10"))
+LOG_DEDUP_WINDOW = float(os.getenv("LOG_DEDUP_WINDOW", "10")) # identical INFO/DEBUG messages within this many seconds are dropped (0 = off)
@@ -2,9 +2,11 @@ import streamlit as st
 import pandas as pd
 import os
 import glob
-import re
 import time
 from modules.kis_api import KisOverseas
+from modules.log_parser import LogTail, EventTail
+from modules.logger import journal_days, journal_path
+from config import LOG_DIR
 
 st.set_page_config(
     page_title="US-ETF-Sniper Dashboard",
@@ -32,25 +34,33 @@ refresh_rate = st.sidebar.slider("Refresh Rate (sec)", 1, 60, 5)
 auto_refresh = st.sidebar.checkbox("Auto Refresh", value=True)
 st.sidebar.markdown(f"**API Status**: {api_status}")
 
+# Host-wide KIS rate limit usage (bot + dashboard + scripts combined)
+if kis:
+    rl = kis.limiter.stats()
+    st.sidebar.markdown(
+        f"**KIS Rate Limit**: {rl['calls_in_window']}/{rl['max_calls']} req/s "
+        f"(headroom {rl['headroom']}, throttled {rl['throttled_calls']})"
+    )
+
 # --- Helper Functions ---
 def get_latest_log_file():
-    log_files = glob.glob("database/trading_*.log")
+    log_files = glob.glob(os.path.join(LOG_DIR, "trading_*.log"))
     if not log_files:
         return None
     # Sort by filename (date) descending
     return sorted(log_files)[-1]
 
-def parse_log_line(line):
-    # Simple parser to extract timestamp and message
-    # Format: 2025-12-31 02:48:44,165 - INFO - Message
-    match = re.match(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d{3} - (\w+) - (.*)", line)
-    if match:
-        return {
-            "timestamp": match.group(1),
-            "level": match.group(2),
-            "message": match.group(3)
-        }
-    return None
+def get_tail(key, tail_class, path):
+    """
+    Tail kept in session_state across reruns: each refresh parses only the lines
+    appended since the previous one. A new file (next day / session) starts a new tail.
+    """
+    tail = st.session_state.get(key)
+    if tail is None or tail.path != path:
+        tail = tail_class(path)
+        st.session_state[key] = tail
+    tail.poll()
+    return tail
 
 def get_bot_status(last_log_time_str):
     if not last_log_time_str:
@@ -72,69 +82,25 @@ def get_bot_status(last_log_time_str):
 tab1, tab2, tab3 = st.tabs(["📊 Overview", "💰 Account & Portfolio", "📜 Logs & History"])
 
 log_file = get_latest_log_file()
-parsed_lines = []
+log_tail = get_tail("log_tail", LogTail, log_file) if log_file else None
 
-if log_file:
-    try:
-        with open(log_file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-    except UnicodeDecodeError:
-        # Fallback to system encoding (cp949/euc-kr)
-        with open(log_file, "r", encoding="cp949") as f:
-            lines = f.readlines()
-        
-    parsed_lines = [parse_log_line(line) for line in lines]
-    parsed_lines = [x for x in parsed_lines if x is not None]
+# Typed event journal of the latest session (bot state without parsing log text)
+days = journal_days()
+event_tail = get_tail("event_tail", EventTail, journal_path(days[-1])) if days else None
+events = event_tail is not None and event_tail.count > 0
 
 # --- Tab 1: Overview ---
 with tab1:
-    if parsed_lines:
+    if log_tail and log_tail.last:
         # 1. Status
-        last_log = parsed_lines[-1]
+        last_log = log_tail.last
         status = get_bot_status(last_log['timestamp'])
         
         st.metric("Bot Status", status)
         st.markdown(f"Last Update: `{last_log['timestamp']}`")
         
-        # 2. Key Metrics by Ticker
-        # We will scan lines to find the LATEST info for each ticker
-        ticker_data = {}
-        
-        # Regex patterns
-        # Log format: "[TQQQ] Current: 54.38, MA20: 54.31"
-        # Log format: "[TQQQ] Bull Market! Target Price: 55.12 (Open: 54.0)"
-        
-        for line in parsed_lines:
-            msg = line['message']
-            
-            # Extract Ticker from [TICKER]
-            ticker_match = re.search(r"\[([A-Z]+)\]", msg)
-            if not ticker_match:
-                continue
-            
-            ticker = ticker_match.group(1)
-            if ticker not in ticker_data:
-                ticker_data[ticker] = {"Current": "N/A", "MA20": "N/A", "Target": "N/A", "Trend": "Unknown"}
-            
-            # Parse Current & MA20
-            # [TQQQ] Current: 54.3839, MA20: 54.3137
-            m1 = re.search(r"Current: ([^,]+), MA20: (.+)", msg)
-            if m1:
-                ticker_data[ticker]["Current"] = m1.group(1).strip()
-                ticker_data[ticker]["MA20"] = m1.group(2).strip()
-                # If we see Current/MA20, we don't know trend yet unless explicit
-            
-            # Parse Target Price
-            # [TQQQ] Bull Market! Target Price: 55.12 ...
-            m2 = re.search(r"Target Price: ([^ ]+)", msg)
-            if m2:
-                ticker_data[ticker]["Target"] = m2.group(1).strip()
-                ticker_data[ticker]["Trend"] = "Bull 🐂"
-            
-            # Parse Bear Market
-            if "Bear Market" in msg:
-                ticker_data[ticker]["Trend"] = "Bear 🐻"
-                ticker_data[ticker]["Target"] = "-"
+        # 2. Key Metrics by Ticker (LATEST info for each ticker: journal, or text log for older sessions)
+        ticker_data = event_tail.ticker_data if events else log_tail.ticker_data
 
         # Convert to DataFrame for nice display
         if ticker_data:
@@ -146,7 +112,8 @@ with tab1:
                     "Price": d["Current"],
                     "Target Price": d["Target"],
                     "20 MA": d["MA20"],
-                    "Trend": d["Trend"]
+                    "Trend": d["Trend"],
+                    "Status": d.get("Status", "-")
                 })
             
             df_monitor = pd.DataFrame(data_list)
@@ -251,21 +218,24 @@ with tab2:
 # --- Tab 3: Logs ---
 with tab3:
     st.subheader("Recent Trades")
-    if parsed_lines:
-        trades = []
-        for line in parsed_lines:
-            msg = line['message']
-            if any(k in msg for k in ["Buy Order", "Sell Order", "Selling All", "Stop Loss"]):
-                trades.append(line)
+    if events:
+        trades = event_tail.trades
+        if trades:
+            st.dataframe(pd.DataFrame(list(trades)).iloc[::-1], hide_index=True)
+        else:
+            st.info("No orders in the latest session.")
+    elif log_tail:
+        trades = log_tail.trades
         
         if trades:
-            st.dataframe(pd.DataFrame(trades)[['timestamp', 'message']], hide_index=True)
+            st.dataframe(pd.DataFrame(list(trades))[['timestamp', 'message']], hide_index=True)
         else:
             st.info("No trade events found in logs.")
     
     st.subheader("System Logs")
-    if parsed_lines:
-        df = pd.DataFrame(parsed_lines)
+    if log_tail and log_tail.lines:
+        # Bounded window: the newest LogTail.window lines, not the whole day
+        df = pd.DataFrame(list(log_tail.lines))
         st.dataframe(df.iloc[::-1], hide_index=True) # Show newest first
 
 # Auto Refresh logic
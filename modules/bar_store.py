@@ -0,0 +1,190 @@
+import os
+import datetime
+import threading
+import numpy as np
+from config import BAR_STORE_DIR
+from modules.file_lock import FileLock
+from modules.tick_tape import session_date
+from modules import clock
+
+# One row per trading day, ascending by date
+BAR_DTYPE = np.dtype([
+    ("date", "i4"), # YYYYMMDD
+    ("open", "f8"), ("high", "f8"), ("low", "f8"), ("close", "f8"),
+    ("volume", "f8"),
+])
+
+# Relative tolerance when comparing stored vs. fetched prices for the same day
+REVISION_RTOL = 1e-6
+
+def rows_to_bars(rows):
+    """
+    KIS daily rows (any order) -> BAR_DTYPE array sorted by date.
+    Rows use the overseas keys: xymd, open, high, low, clos, tvol
+    (KisDomestic.get_daily_ohlc maps its fields to the same keys).
+    """
+    rows = [r for r in rows or [] if r.get('xymd')]
+    bars = np.empty(len(rows), dtype=BAR_DTYPE)
+    if not rows:
+        return bars
+    bars["date"] = [r['xymd'] for r in rows]
+    bars["open"] = [r['open'] for r in rows]
+    bars["high"] = [r['high'] for r in rows]
+    bars["low"] = [r['low'] for r in rows]
+    bars["close"] = [r['clos'] for r in rows]
+    bars["volume"] = [r.get('tvol') or 0 for r in rows]
+    bars = np.sort(bars, order="date")
+    # De-duplicate by date (keep the last occurrence)
+    _, last = np.unique(bars["date"][::-1], return_index=True)
+    return bars[len(bars) - 1 - last]
+
+def bars_to_rows(bars, limit=None):
+    """BAR_DTYPE array -> KIS-style rows, latest first (what strategies expect)"""
+    out = bars[::-1] if limit is None else bars[::-1][:limit]
+    return [{
+        'xymd': str(int(b["date"])),
+        'open': float(b["open"]),
+        'high': float(b["high"]),
+        'low': float(b["low"]),
+        'clos': float(b["close"]),
+        'tvol': float(b["volume"]),
+    } for b in out]
+
+def previous_weekday(date):
+    """Weekday before YYYYMMDD 'date' (holidays are not known here: a stricter check, never a looser one)"""
+    day = datetime.datetime.strptime(str(date), "%Y%m%d") - datetime.timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= datetime.timedelta(days=1)
+    return int(day.strftime("%Y%m%d"))
+
+class BarStore:
+    """
+    Local daily bar store: one memory-mapped .npy per ticker under
+    <root>/<market>/<ticker>.npy, written atomically and guarded by a file lock.
+    sync() turns session start into a disk read + one delta request per ticker.
+    """
+    def __init__(self, root=None):
+        self.root = root or BAR_STORE_DIR
+        # One FileLock (one open fd) per ticker for the life of the store
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def path(self, market, ticker):
+        return os.path.join(self.root, market, f"{ticker}.npy")
+
+    def _lock(self, market, ticker):
+        with self._locks_lock:
+            lock = self._locks.get((market, ticker))
+            if lock is None:
+                os.makedirs(os.path.join(self.root, market), exist_ok=True)
+                lock = self._locks[(market, ticker)] = FileLock(self.path(market, ticker) + ".lock")
+            return lock
+
+    def load(self, market, ticker):
+        """Stored bars (read-only memory map), empty array if none"""
+        try:
+            return np.load(self.path(market, ticker), mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return np.empty(0, dtype=BAR_DTYPE)
+
+    def save(self, market, ticker, bars):
+        path = self.path(market, ticker)
+        tmp = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp, np.ascontiguousarray(bars, dtype=BAR_DTYPE))
+        os.replace(tmp, path)
+
+    def merge(self, market, ticker, new_bars):
+        """
+        Merge freshly fetched bars into the store.
+        Returns (bars, status): 'new', 'updated' or 'revised'.
+        'revised' = an adjusted-price revision (split/dividend; MODP / FID_ORG_ADJ_PRC)
+        changed past days, so the old history is dropped and only the fetched bars kept.
+        """
+        with self._lock(market, ticker):
+            old = np.array(self.load(market, ticker)) # copy out of the mmap
+            if len(new_bars) == 0:
+                return old, "updated"
+            if len(old) == 0:
+                self.save(market, ticker, new_bars)
+                return new_bars, "new"
+
+            # Compare overlapping days, except the newest stored day (may be a still-forming bar)
+            settled = old[old["date"] < old["date"][-1]]
+            common, i_old, i_new = np.intersect1d(settled["date"], new_bars["date"], return_indices=True)
+            gap = new_bars["date"][0] > old["date"][-1] # fetched page does not reach stored data
+            revised = gap or not np.allclose(settled["close"][i_old], new_bars["close"][i_new], rtol=REVISION_RTOL)
+
+            if revised:
+                reason = "gap since last sync" if gap else "adjusted price revision detected"
+                print(f"[BarStore] {market}/{ticker}: {reason}, history reset.")
+                self.save(market, ticker, new_bars)
+                return new_bars, "revised"
+
+            merged = np.concatenate([old[old["date"] < new_bars["date"][0]], new_bars])
+            self.save(market, ticker, merged)
+            return merged, "updated"
+
+    def prepend(self, market, ticker, older):
+        """
+        Add older history (backfill pages), de-duplicated by date.
+        The page must overlap the store by at least one day, and overlapping days must
+        agree with it, otherwise the page was fetched on a different adjusted-price
+        basis: returns 'revised' and leaves the store untouched. A page that does not
+        reach the stored history cannot be verified (and would leave a hole): 'gap'.
+        Returns (bars, status): 'extended', 'unchanged', 'revised' or 'gap'.
+        """
+        with self._lock(market, ticker):
+            old = np.array(self.load(market, ticker))
+            if len(old) == 0:
+                self.save(market, ticker, older)
+                return older, "extended"
+
+            common, i_old, i_new = np.intersect1d(old["date"], older["date"], return_indices=True)
+            if len(common) == 0:
+                return old, "gap"
+            if not np.allclose(old["close"][i_old], older["close"][i_new], rtol=REVISION_RTOL):
+                return old, "revised"
+
+            new_days = older[older["date"] < old["date"][0]]
+            if len(new_days) == 0:
+                return old, "unchanged"
+            merged = np.concatenate([new_days, old])
+            self.save(market, ticker, merged)
+            return merged, "extended"
+
+    def delete(self, market, ticker):
+        with self._lock(market, ticker):
+            try:
+                os.remove(self.path(market, ticker))
+            except FileNotFoundError:
+                pass
+
+    def sync(self, market, ticker, fetch, limit=None, today=None):
+        """
+        Gap-fill one ticker: fetch() returns the latest page of KIS daily rows
+        (one request); only days newer than/overlapping the store are merged.
+        Returns up to 'limit' KIS-style rows (latest first) from the store, None if nothing is available.
+        If the request fails, the stored bars are served only while they are current (they
+        reach the previous weekday before 'today', the session date); older bars would give
+        a stale MA / range, so None is returned and the caller skips the ticker.
+        """
+        rows = fetch(ticker)
+        if rows is None:
+            bars = self.load(market, ticker)
+            today = today or session_date(market, clock.now())
+            newest = int(bars["date"][-1]) if len(bars) else None
+            if newest is None or newest < previous_weekday(today):
+                print(f"[BarStore] {market}/{ticker}: daily bar request failed and stored bars end at {newest}, skipping.")
+                return None
+            print(f"[BarStore] {market}/{ticker}: daily bar request failed, using stored bars (up to {newest}).")
+        else:
+            bars, _ = self.merge(market, ticker, rows_to_bars(rows))
+        return bars_to_rows(bars, limit) if len(bars) else None
+
+_store = None
+
+def get_bar_store():
+    global _store
+    if _store is None:
+        _store = BarStore()
+    return _store
@@ -0,0 +1,120 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from modules.logger import logger, log_event
+from modules import clock
+from modules import metrics
+from strategies.technical import check_trend
+
+class BreakoutEngine:
+    """
+    Event-driven breakout detection.
+    Every price update (KisWebSocket tick, or REST quote as fallback) goes through
+    on_tick(); a price at/above target fires the AI gate + buy path immediately on a
+    worker thread, so the feed is never blocked by order round trips.
+    The AI gate reads the ticker's verdict from the SentimentPrefetcher table (no network I/O on the buy path).
+    Tick-to-order latency is recorded per order.
+    """
+    # AI rejection cool-down per ticker (seconds)
+    REJECT_COOLDOWN = 10
+
+    def __init__(self, market, kis, sentiment, targets, qty, executor=None):
+        self.market = market
+        self.kis = kis
+        self.sentiment = sentiment # SentimentPrefetcher
+        self.targets = targets # {ticker: {'target', 'trend', 'status', 'buys'}}
+        self.qty = qty
+        self.last_tick = {} # ticker -> clock.monotonic() of last streamed tick
+        self.latencies = [] # tick-to-order seconds
+        self._lock = threading.Lock()
+        self._executor = executor or ThreadPoolExecutor(max_workers=4, thread_name_prefix="order")
+        self._gate_hist = metrics.histogram("ai_gate")
+        self._t2o_hist = metrics.histogram("tick_to_order")
+
+    def pending_tickers(self):
+        """Tickers still waiting for a breakout"""
+        return [t for t, d in self.targets.items() if d['status'] == 'monitoring']
+
+    def stale_tickers(self, max_age):
+        """Pending tickers without a streamed tick in the last max_age seconds (REST fallback)"""
+        now = clock.monotonic()
+        return [t for t in self.pending_tickers() if now - self.last_tick.get(t, 0) > max_age]
+
+    def on_tick(self, ticker, price, source="ws"):
+        """Target-price check for one price update. Cheap enough to run on every tick."""
+        t0 = time.perf_counter()
+        if source == "ws":
+            self.last_tick[ticker] = clock.monotonic()
+        
+        data = self.targets.get(ticker)
+        if data is None or data['status'] != 'monitoring' or not price:
+            return
+        if price < data['target'] or clock.time() < data.get('cooldown_until', 0):
+            return
+        
+        # Trend filter on every tick: MA20 with today's bar at the live price
+        trend = data.get('trend')
+        if trend is not None and not check_trend(price, trend.peek_last(price)):
+            return
+        
+        with self._lock:
+            # Ticks may arrive from the stream and the REST fallback at once
+            if data['status'] != 'monitoring':
+                return
+            data['status'] = 'ordering'
+        
+        logger.info(f"[{ticker}] Breakout Detected! ({price} >= {data['target']}) via {source}")
+        log_event("breakout", market=self.market, ticker=ticker, price=price, target=data['target'], source=source)
+        self._executor.submit(self._buy, ticker, t0)
+
+    def _buy(self, ticker, t0):
+        data = self.targets[ticker]
+        try:
+            gate_t0 = time.perf_counter()
+            sentiment = self.sentiment.snapshot(ticker)
+            gate_s = time.perf_counter() - gate_t0
+            self._gate_hist.observe(gate_s)
+            gate_us = gate_s * 1e6
+            
+            logger.info(f"[{ticker}] AI Result: {sentiment} (gate {gate_us:.0f} us)")
+            log_event("ai_verdict", market=self.market, ticker=ticker, can_buy=sentiment.get('can_buy', False),
+                      risk_level=sentiment.get('risk_level'), reason=sentiment.get('reason'))
+            
+            if not sentiment.get('can_buy', False):
+                logger.info(f"[{ticker}] AI Rejected buying due to risk.")
+                data['cooldown_until'] = clock.time() + self.REJECT_COOLDOWN
+                data['status'] = 'monitoring'
+                return
+            
+            logger.info(f"[{ticker}] AI Approved. Buying...")
+            res = self.kis.buy_market_order(ticker, self.qty)
+            latency = time.perf_counter() - t0
+            self.latencies.append(latency)
+            self._t2o_hist.observe(latency)
+            logger.info(f"[{ticker}] Tick-to-order latency: {latency * 1000:.1f} ms")
+
+            accepted = bool(res and res.get('rt_cd') == '0')
+            log_event("order", market=self.market, ticker=ticker, side="buy", qty=self.qty,
+                      accepted=accepted, latency_ms=round(latency * 1000, 3), response=res)
+            if accepted:
+                data['status'] = 'bought'
+                data['buys'] += 1
+                logger.info(f"[{ticker}] Buy Success!")
+            else:
+                data['status'] = 'monitoring'
+                logger.error(f"[{ticker}] Buy Failed: {res}")
+        except Exception as e:
+            data['status'] = 'monitoring'
+            logger.error(f"[{ticker}] Buy path error: {e}")
+
+    def latency_summary(self):
+        """p50 / p99 / max tick-to-order latency in ms (None if no orders were sent)"""
+        if not self.latencies:
+            return None
+        xs = sorted(self.latencies)
+        pick = lambda q: xs[min(len(xs) - 1, int(q * len(xs)))] * 1000
+        return {"orders": len(xs), "p50_ms": round(pick(0.5), 1), "p99_ms": round(pick(0.99), 1), "max_ms": round(xs[-1] * 1000, 1)}
+
+    def shutdown(self):
+        """Wait for in-flight orders before the session sell-off"""
+        self._executor.shutdown(wait=True)
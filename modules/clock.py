@@ -0,0 +1,96 @@
+import time as _time
+import asyncio
+import datetime
+import threading
+
+# Process-wide clock used by the session logic (run_bot, BreakoutEngine).
+# Live runs use the wall clock; replay.py swaps in a SimClock so a recorded
+# session runs through the same code at any speed.
+
+class RealClock:
+    def now(self):
+        return datetime.datetime.now()
+
+    def time(self):
+        return _time.time()
+
+    def monotonic(self):
+        return _time.monotonic()
+
+    def sleep(self, seconds):
+        _time.sleep(seconds)
+
+    async def asleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+class SimClock:
+    """
+    Virtual clock for replays. sleep()/asleep() advance virtual time instead of
+    waiting; speed=N also waits seconds/N of real time (None = as fast as possible).
+    Listeners are called with the new virtual datetime after every advance,
+    which is how a replay feed delivers the ticks that fall inside the step.
+    """
+    def __init__(self, start, speed=None):
+        self._now = start
+        self.speed = speed
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def now(self):
+        return self._now
+
+    def time(self):
+        return self._now.timestamp()
+
+    def monotonic(self):
+        return self._now.timestamp()
+
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    def remove_listener(self, fn):
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def advance(self, seconds):
+        with self._lock:
+            self._now += datetime.timedelta(seconds=seconds)
+            now = self._now
+        for fn in list(self._listeners):
+            fn(now)
+
+    def sleep(self, seconds):
+        if self.speed:
+            _time.sleep(seconds / self.speed)
+        self.advance(seconds)
+
+    async def asleep(self, seconds):
+        # Always yield to the event loop, even at full speed
+        await asyncio.sleep(seconds / self.speed if self.speed else 0)
+        self.advance(seconds)
+
+_clock = RealClock()
+
+def set_clock(clock):
+    """Install a clock (SimClock for replays); returns the previous one"""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+def get_clock():
+    return _clock
+
+def now():
+    return _clock.now()
+
+def time():
+    return _clock.time()
+
+def monotonic():
+    return _clock.monotonic()
+
+def sleep(seconds):
+    _clock.sleep(seconds)
+
+async def asleep(seconds):
+    await _clock.asleep(seconds)
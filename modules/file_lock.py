@@ -0,0 +1,43 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError: # Windows: fall back to in-process locking only
+    fcntl = None
+
+class FileLock:
+    """
+    Exclusive lock shared by every thread AND every process on the host.
+    flock() alone does not exclude threads sharing one fd, so a thread lock is held too.
+    Re-entrant within a thread: only the outermost exit releases the flock.
+    Usage:
+        with FileLock(path):
+            ...
+    """
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._fd = None
+        self._depth = 0 # nested holds by the owning thread
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        self._depth += 1
+        if self._depth == 1 and fcntl is not None:
+            try:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._depth -= 1
+                self._thread_lock.release()
+                raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0 and fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+        return False
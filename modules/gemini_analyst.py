@@ -1,11 +1,37 @@
 import google.generativeai as genai
-import requests
-import xml.etree.ElementTree as ET
 import json
-from config import GEMINI_API_KEY
+import threading
+from config import GEMINI_API_KEY, AI_VERDICT_CACHE_FILE, AI_VERDICT_TTL, AI_VERDICT_CACHE_SIZE
+from modules.verdict_cache import VerdictCache, headline_key
+from modules.news_feed import NewsFeed
+
+# What the headlines are about, per market (prompt context)
+MARKET_CONTEXT = {
+    "US": "US Tech Market & Fed",
+    "KR": "Korean Stock Market (KOSPI/KOSDAQ), BOK & FX",
+}
+
+# What each ticker tracks, so the model can judge it against the headlines (KR codes are opaque)
+TICKER_PROFILES = {
+    "NVDL": "2x NVIDIA (AI / semiconductors)",
+    "SOXL": "3x Semiconductor index",
+    "TQQQ": "3x Nasdaq 100",
+    "TECL": "3x US Technology sector",
+    "FNGU": "3x FANG+ big tech",
+    "BITX": "2x Bitcoin futures",
+    "CONL": "2x Coinbase (crypto proxy)",
+    "TSLA": "Tesla",
+    "122630": "KODEX Leverage - 2x KOSPI 200",
+    "233740": "KODEX KOSDAQ150 Leverage - 2x KOSDAQ 150",
+    "449200": "KODEX US Tech Top10 - US big tech (KRW)",
+}
 
 class GeminiAnalyst:
-    def __init__(self):
+    def __init__(self, cache_path=AI_VERDICT_CACHE_FILE):
+        # Verdicts keyed by headline set: simultaneous breakouts share one Gemini call
+        self.cache = VerdictCache(cache_path, ttl=AI_VERDICT_TTL, max_entries=AI_VERDICT_CACHE_SIZE)
+        self._feeds = {} # market -> NewsFeed (validators + seen items live across polls)
+        self._feeds_lock = threading.Lock()
         if not GEMINI_API_KEY or "INSERT" in GEMINI_API_KEY:
             print("[Gemini] API Key is missing. AI analysis will be skipped (Defaulting to Neutral/Positive).")
             self.model = None
@@ -13,37 +39,101 @@ class GeminiAnalyst:
             genai.configure(api_key=GEMINI_API_KEY)
             self.model = genai.GenerativeModel('gemini-1.5-flash')
 
-    def fetch_news(self):
-        """CNBC Finance RSS Feed Fetch"""
-        url = "https://www.cnbc.com/id/10000664/device/rss/rss.html" # Finance
+    def fetch_news(self, market="US"):
+        """Latest headlines from the market's RSS sources (modules/news_feed.py)"""
+        with self._feeds_lock:
+            feed = self._feeds.get(market)
+            if feed is None:
+                feed = self._feeds[market] = NewsFeed(market)
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            root = ET.fromstring(response.content)
-            
-            headlines = []
-            for item in root.findall('./channel/item'):
-                title = item.find('title').text
-                description = item.find('description').text
-                headlines.append(f"- {title}: {description}")
-                if len(headlines) >= 10: # Top 10 only
-                    break
-            
-            return "\n".join(headlines)
+            return feed.fetch()
         except Exception as e:
             print(f"[Gemini] Failed to fetch news: {e}")
             return ""
 
-    def check_market_sentiment(self, news_text):
+    def check_market_sentiment(self, news_text, market="US"):
         if not self.model:
             return {"risk_level": "LOW", "can_buy": True, "reason": "API Key missing, skipping AI check."}
         
         if not news_text:
             return {"risk_level": "LOW", "can_buy": True, "reason": "No news found, skipping AI check."}
 
+        # Errors are not cached: the next breakout retries the model
+        return self.cache.get_or_compute(
+            headline_key(news_text),
+            lambda: self._ask_model(news_text, market),
+            cacheable=lambda verdict: verdict.get("risk_level") != "UNKNOWN",
+        )
+
+    def assess_universe(self, news_text, tickers, market="US"):
+        """
+        One batched call scoring every ticker of the universe against the headlines.
+        Returns {ticker: verdict, ..., "market": verdict}; tickers the model skipped get the market verdict.
+        """
+        tickers = list(tickers)
+        if not self.model:
+            verdict = {"risk_level": "LOW", "can_buy": True, "reason": "API Key missing, skipping AI check."}
+            return {t: verdict for t in tickers + ["market"]}
+        if not news_text:
+            verdict = {"risk_level": "LOW", "can_buy": True, "reason": "No news found, skipping AI check."}
+            return {t: verdict for t in tickers + ["market"]}
+
+        # Same headlines + same universe -> one Gemini call shared by all callers
+        key = headline_key(news_text + "\n#universe " + ",".join(sorted(tickers)))
+        return self.cache.get_or_compute(
+            key,
+            lambda: self._ask_universe(news_text, tickers, market),
+            cacheable=lambda verdicts: verdicts["market"].get("risk_level") != "UNKNOWN",
+        )
+
+    def _ask_universe(self, news_text, tickers, market):
+        universe = "\n".join(f"- {t}: {TICKER_PROFILES.get(t, t)}" for t in tickers)
+        prompt = f"""
+        Act as a aggressive stock trader.
+        Here are the latest news headlines regarding {MARKET_CONTEXT.get(market, MARKET_CONTEXT["US"])}:
+        {news_text}
+
+        These are the tickers we may buy on a breakout today:
+        {universe}
+
+        Critical Check, for the market as a whole and for EACH ticker separately:
+        1. Is there any MAJOR crash signal for what it tracks (e.g. War, Unexpected Rate Hike, sector-specific shock)?
+        2. Is the sentiment around it predominantly Fear?
+
+        Reply with JSON ONLY:
+        {{
+            "market": {{"risk_level": "HIGH" or "LOW", "can_buy": boolean, "reason": "short summary"}},
+            "tickers": {{
+                "<TICKER>": {{"risk_level": "HIGH" or "LOW", "can_buy": boolean, "reason": "short summary"}}
+            }}
+        }}
+        """
+        try:
+            data = self._generate_json(prompt)
+            market_verdict = data.get("market") or {"risk_level": "UNKNOWN", "can_buy": False, "reason": "No market verdict"}
+            scored = data.get("tickers") or {}
+            verdicts = {t: scored.get(t, market_verdict) for t in tickers}
+            verdicts["market"] = market_verdict
+            return verdicts
+        except Exception as e:
+            print(f"[Gemini] AI Universe Analysis failed: {e}")
+            verdict = {"risk_level": "UNKNOWN", "can_buy": False, "reason": f"AI Error: {e}"}
+            return {t: verdict for t in tickers + ["market"]}
+
+    def _generate_json(self, prompt):
+        response = self.model.generate_content(prompt)
+        text = response.text.strip()
+        # Clean up markdown code blocks if present
+        if text.startswith("```json"):
+            text = text[7:]
+        if text.endswith("```"):
+            text = text[:-3]
+        return json.loads(text)
+
+    def _ask_model(self, news_text, market):
         prompt = f"""
         Act as a aggressive stock trader.
-        Here are the latest news headlines regarding US Tech Market & Fed:
+        Here are the latest news headlines regarding {MARKET_CONTEXT.get(market, MARKET_CONTEXT["US"])}:
         {news_text}
 
         Critical Check:
@@ -59,15 +149,7 @@ class GeminiAnalyst:
         """
         
         try:
-            response = self.model.generate_content(prompt)
-            text = response.text.strip()
-            # Clean up markdown code blocks if present
-            if text.startswith("```json"):
-                text = text[7:]
-            if text.endswith("```"):
-                text = text[:-3]
-            
-            return json.loads(text)
+            return self._generate_json(prompt)
         except Exception as e:
             print(f"[Gemini] AI Analysis failed: {e}")
             # Fail safe: Do not buy if AI fails? Or buy? 
@@ -0,0 +1,50 @@
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from config import KIS_POOL_SIZE, KIS_CONNECT_TIMEOUT, KIS_READ_TIMEOUT
+
+# (connect, read) timeout tuple passed to every KIS REST call
+TIMEOUT = (KIS_CONNECT_TIMEOUT, KIS_READ_TIMEOUT)
+
+_session = None
+_lock = threading.Lock()
+
+def get_session():
+    """
+    Process-wide keep-alive Session shared by KisOverseas / KisDomestic.
+    TCP+TLS handshake is paid once per pooled connection instead of once per call.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=KIS_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def prewarm(base_url, connections=None):
+    """
+    Open 'connections' pooled sockets to base_url before the market opens.
+    Requests run concurrently so each one checks out its own connection.
+    Returns the number of connections that completed the handshake.
+    """
+    n = connections or KIS_POOL_SIZE
+    session = get_session()
+
+    def _touch(_):
+        try:
+            # Any HTTP response (even 404) means TCP+TLS is established and pooled
+            session.head(base_url, timeout=TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        ok = sum(pool.map(_touch, range(n)))
+
+    print(f"[HTTP] Pre-warmed {ok}/{n} connections to {base_url}")
+    return ok
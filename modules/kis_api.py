@@ -1,38 +1,11 @@
-import requests
 import json
 import time
-from collections import deque
 from config import KIS_BASE_URL, KIS_APP_KEY, KIS_APP_SECRET, KIS_CANO, KIS_ACNT_PRDT_CD
-
-class RateLimiter:
-    """
-    Token Bucket / Sliding Window Rate Limiter
-    Ensures we do not exceed 'max_calls' per 'period' seconds.
-    """
-    def __init__(self, max_calls=15, period=1.0):
-        self.max_calls = max_calls
-        self.period = period
-        self.timestamps = deque()
-
-    def wait(self):
-        """Blocks execution if rate limit is hit"""
-        now = time.time()
-        
-        # Remove timestamps older than the period
-        while self.timestamps and now - self.timestamps[0] > self.period:
-            self.timestamps.popleft()
-            
-        if len(self.timestamps) >= self.max_calls:
-            # Calculate wait time
-            wait_time = self.period - (now - self.timestamps[0])
-            if wait_time > 0:
-                time.sleep(wait_time)
-            # Clean up again after sleeping
-            now = time.time()
-            while self.timestamps and now - self.timestamps[0] > self.period:
-                self.timestamps.popleft()
-                
-        self.timestamps.append(time.time())
+from modules.http_pool import get_session, prewarm, TIMEOUT
+from modules.bar_store import get_bar_store
+from modules.rate_limiter import RateLimiter
+from modules.token_store import get_credential_store
+from modules import metrics
 
 class KisOverseas:
     def __init__(self):
@@ -44,44 +17,26 @@ class KisOverseas:
         self.access_token = None
         self.token_expiry = 0
         
-        # System-level Rate Limiter (Max 15 req/sec safely under 20 limit)
+        # Host-wide Rate Limiter shared with every process using this app key
+        # (Max 15 req/sec safely under 20 limit)
         self.limiter = RateLimiter(max_calls=15, period=1.0)
         
+        # Shared keep-alive connection pool (see modules/http_pool.py)
+        self.session = get_session()
+        
+        # Token shared with every other client/process; refreshed in the background by run_bot
+        self.credentials = get_credential_store(self.url, self.app_key, self.app_secret)
         self._refresh_token()
 
+    def prewarm(self, connections=None):
+        """장 시작 전 커넥션 풀 예열 (TCP+TLS handshake 선처리)"""
+        return prewarm(self.url, connections)
+
     def _refresh_token(self):
-        """Access Token 발급"""
+        """Access Token 조회 (shared credential store: memory -> disk -> network)"""
         if time.time() < self.token_expiry:
             return
-
-        path = "/oauth2/tokenP"
-        headers = {"content-type": "application/json"}
-        body = {
-            "grant_type": "client_credentials",
-            "appkey": self.app_key,
-            "appsecret": self.app_secret
-        }
-        
-        try:
-            res = requests.post(self.url + path, headers=headers, data=json.dumps(body))
-            
-            # Handle Rate Limit (1 request per minute)
-            if res.status_code == 403 and "EGW00133" in res.text:
-                print("[KIS] Token rate limit hit. Waiting 60 seconds...")
-                time.sleep(65)
-                res = requests.post(self.url + path, headers=headers, data=json.dumps(body))
-
-            if res.status_code != 200:
-                print(f"[KIS] Token Refresh Error: {res.status_code} {res.text}")
-            
-            res.raise_for_status()
-            data = res.json()
-            self.access_token = data['access_token']
-            self.token_expiry = time.time() + int(data['expires_in']) - 60 # 1분 여유
-            print(f"[KIS] Token refreshed. Expires in {data['expires_in']} seconds.")
-        except Exception as e:
-            print(f"[KIS] Token refresh failed: {e}")
-            raise
+        self.access_token, self.token_expiry = self.credentials.get_access_token()
 
     def _get_headers(self, tr_id):
         self._refresh_token()
@@ -93,13 +48,17 @@ class KisOverseas:
             "tr_id": tr_id
         }
 
-    def _request(self, method, path, headers=None, params=None, data=None):
-        self.limiter.wait()
+    def _request(self, method, path, headers=None, params=None, data=None, kind="quote", block=False):
+        if not self.limiter.wait(kind, block):
+            print(f"[KIS] Rate limit queue timeout ({kind}): {path}")
+            return None
         try:
+            t0 = time.perf_counter()
             if method == "GET":
-                res = requests.get(self.url + path, headers=headers, params=params)
+                res = self.session.get(self.url + path, headers=headers, params=params, timeout=TIMEOUT)
             elif method == "POST":
-                res = requests.post(self.url + path, headers=headers, data=data)
+                res = self.session.post(self.url + path, headers=headers, data=data, timeout=TIMEOUT)
+            metrics.observe("order_post" if method == "POST" else "rest_get", time.perf_counter() - t0, kind=kind)
             
             # Simple error logging
             if res.status_code != 200:
@@ -113,8 +72,12 @@ class KisOverseas:
             # print(f"[KIS_API] Request Exception ({path}): {e}")
             return None
 
-    def get_current_price(self, ticker):
-        """현재가 조회 (주식현재가 시세)"""
+    def get_current_price(self, ticker, kind="quote", block=False):
+        """현재가 조회 (주식현재가 시세). kind: RateLimiter request class, block: rate limit 대기 시간 제한 없음"""
+        with metrics.timer("quote_fetch", kind=kind):
+            return self._get_current_price(ticker, kind, block)
+
+    def _get_current_price(self, ticker, kind, block=False):
         # HHHDFS76200200 : 해외주식 현재가 상세 (미국)
         tr_id = "HDFS76200200" if "openapivts" not in self.url else "HHDFS76200200" 
         path = "/uapi/overseas-price/v1/quotations/price"
@@ -127,9 +90,9 @@ class KisOverseas:
         }
         
         # Use Rate Limited Request
-        res = self._request("GET", path, headers=headers, params=params)
+        res = self._request("GET", path, headers=headers, params=params, kind=kind, block=block)
         
-        if res and res['rt_cd'] == '0':
+        if res and res.get('rt_cd') == '0':
             return float(res['output']['last'])
         return None
 
@@ -143,8 +106,12 @@ class KisOverseas:
             "SYMB": ticker
         }
         
+        if not self.limiter.wait("quote"):
+            print("[KIS] Quote skipped: rate limit queue timeout")
+            return None
+        
         try:
-            res = requests.get(self.url + path, headers=headers, params=params)
+            res = self.session.get(self.url + path, headers=headers, params=params, timeout=TIMEOUT)
             res.raise_for_status()
             data = res.json()
             if data['rt_cd'] != '0':
@@ -155,15 +122,15 @@ class KisOverseas:
             print(f"[KIS] Exception getting quote: {e}")
             return None
 
-    def get_daily_ohlc(self, ticker, period="D"):
-        """해외주식 기간별 시세 (일봉)"""
+    def get_daily_ohlc(self, ticker, period="D", bymd=None):
+        """해외주식 기간별 시세 (일봉). bymd: 조회 기준일 (YYYYMMDD, 기본 오늘) - 과거 페이지 조회용"""
         # HHDFS76240000 : 해외주식 기간별시세(일/주/월/년)
         path = "/uapi/overseas-price/v1/quotations/dailyprice"
         headers = self._get_headers("HHDFS76240000")
         
         # 오늘 날짜 기준
         import datetime
-        today = datetime.datetime.now().strftime("%Y%m%d")
+        today = bymd or datetime.datetime.now().strftime("%Y%m%d")
         
         params = {
             "AUTH": "",
@@ -174,8 +141,12 @@ class KisOverseas:
             "MODP": "1" # 0:수정주가미반영, 1:수정주가반영
         }
         
+        if not self.limiter.wait("history"):
+            print("[KIS] OHLC skipped: rate limit queue timeout")
+            return None
+        
         try:
-            res = requests.get(self.url + path, headers=headers, params=params)
+            res = self.session.get(self.url + path, headers=headers, params=params, timeout=TIMEOUT)
             res.raise_for_status()
             data = res.json()
             if data['rt_cd'] != '0':
@@ -186,6 +157,10 @@ class KisOverseas:
             print(f"[KIS] Exception getting OHLC: {e}")
             return None
 
+    def get_daily_ohlc_cached(self, ticker, limit=100):
+        """일봉 (local bar store + 1 delta request), latest first like get_daily_ohlc"""
+        return get_bar_store().sync("US", ticker, self.get_daily_ohlc, limit)
+
     def buy_market_order(self, ticker, qty):
         """해외주식 시장가 매수"""
         # 모의투자/실전투자 TR_ID 구분 필요
@@ -213,8 +188,8 @@ class KisOverseas:
             # -> 수정: 현재가 조회 후 +1% 가격으로 지정가 주문 (시장가 효과)
         }
         
-        # 현재가 조회
-        current_price = self.get_current_price(ticker)
+        # 현재가 조회 (order lane: 주문 직전 시세는 quote polling 보다 우선)
+        current_price = self.get_current_price(ticker, kind="order")
         if not current_price:
             return None
             
@@ -222,8 +197,13 @@ class KisOverseas:
         buy_price = round(current_price * 1.01, 2)
         data["OVRS_ORD_UNPR"] = str(buy_price)
         
+        if not self.limiter.wait("order"):
+            print("[KIS] Order skipped: rate limit queue timeout")
+            return None
+        
         try:
-            res = requests.post(self.url + path, headers=headers, data=json.dumps(data))
+            with metrics.timer("order_post", kind="order"):
+                res = self.session.post(self.url + path, headers=headers, data=json.dumps(data), timeout=TIMEOUT)
             res.raise_for_status()
             return res.json()
         except Exception as e:
@@ -236,8 +216,8 @@ class KisOverseas:
         path = "/uapi/overseas-stock/v1/trading/order"
         headers = self._get_headers(tr_id)
         
-        # 현재가 조회
-        current_price = self.get_current_price(ticker)
+        # 현재가 조회 (order lane). 매도는 rate limit 대기 중 포기하지 않음 - 장 마감 청산이 누락되면 레버리지 포지션을 오버나잇 보유
+        current_price = self.get_current_price(ticker, kind="order", block=True)
         if not current_price:
             return None
             
@@ -255,8 +235,11 @@ class KisOverseas:
             "ORD_DVSN": "00" 
         }
         
+        self.limiter.wait("order", block=True)
+        
         try:
-            res = requests.post(self.url + path, headers=headers, data=json.dumps(data))
+            with metrics.timer("order_post", kind="order"):
+                res = self.session.post(self.url + path, headers=headers, data=json.dumps(data), timeout=TIMEOUT)
             res.raise_for_status()
             return res.json()
         except Exception as e:
@@ -281,8 +264,12 @@ class KisOverseas:
             "CTX_AREA_NK200": ""
         }
         
+        if not self.limiter.wait("account"):
+            print("[KIS] Balance check skipped: rate limit queue timeout")
+            return None
+        
         try:
-            res = requests.get(self.url + path, headers=headers, params=params)
+            res = self.session.get(self.url + path, headers=headers, params=params, timeout=TIMEOUT)
             res.raise_for_status()
             return res.json()
         except Exception as e:
@@ -312,8 +299,12 @@ class KisOverseas:
             "INQR_DVSN_CD": "00"
         }
         
+        if not self.limiter.wait("account"):
+            print("[KIS] Foreign Balance check skipped: rate limit queue timeout")
+            return None
+        
         try:
-            res = requests.get(self.url + path, headers=headers, params=params)
+            res = self.session.get(self.url + path, headers=headers, params=params, timeout=TIMEOUT)
             res.raise_for_status()
             data = res.json()
             # print(f"[DEBUG] Foreign Balance Response: {data}")  # Uncomment for deep debug
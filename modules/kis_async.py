@@ -0,0 +1,70 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from config import KIS_POOL_SIZE
+from modules.kis_api import KisOverseas
+from modules.kis_domestic import KisDomestic
+
+class _AsyncKisBase:
+    """
+    asyncio front-end over a synchronous KIS client.
+    Each blocking call runs on a worker thread sized to the HTTP pool (one pooled
+    keep-alive connection per worker) and still goes through client.limiter,
+    so concurrent fan-out never exceeds the RateLimiter budget.
+    """
+    def __init__(self, client):
+        self.client = client
+        self.limiter = client.limiter
+        self.url = client.url
+        self._executor = ThreadPoolExecutor(max_workers=KIS_POOL_SIZE, thread_name_prefix="kis")
+
+    async def _call(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def prewarm(self, connections=None):
+        return await self._call(self.client.prewarm, connections)
+
+    async def get_current_price(self, ticker):
+        return await self._call(self.client.get_current_price, ticker)
+
+    async def get_current_prices(self, tickers):
+        """
+        Concurrent quote fan-out for the whole universe.
+        Returns {ticker: price or None}; latency ~= slowest single round trip.
+        """
+        prices = await asyncio.gather(*(self.get_current_price(t) for t in tickers))
+        return dict(zip(tickers, prices))
+
+    async def get_daily_ohlc(self, ticker):
+        return await self._call(self.client.get_daily_ohlc, ticker)
+
+    async def get_daily_ohlc_cached(self, ticker):
+        return await self._call(self.client.get_daily_ohlc_cached, ticker)
+
+    async def get_balance(self):
+        return await self._call(self.client.get_balance)
+
+    async def buy_market_order(self, ticker, qty):
+        return await self._call(self.client.buy_market_order, ticker, qty)
+
+    async def sell_market_order(self, ticker, qty):
+        return await self._call(self.client.sell_market_order, ticker, qty)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+class AsyncKisOverseas(_AsyncKisBase):
+    """Async KisOverseas (same method surface, awaitable)"""
+    def __init__(self, client=None):
+        super().__init__(client or KisOverseas())
+
+    async def get_quote(self, ticker):
+        return await self._call(self.client.get_quote, ticker)
+
+    async def get_foreign_balance(self):
+        return await self._call(self.client.get_foreign_balance)
+
+class AsyncKisDomestic(_AsyncKisBase):
+    """Async KisDomestic (same method surface, awaitable)"""
+    def __init__(self, client=None):
+        super().__init__(client or KisDomestic())
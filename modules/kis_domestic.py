@@ -1,8 +1,11 @@
-import requests
 import json
 import time
 from config import KIS_BASE_URL, KIS_APP_KEY, KIS_APP_SECRET, KIS_CANO, KIS_ACNT_PRDT_CD
-from modules.kis_api import RateLimiter
+from modules.rate_limiter import RateLimiter
+from modules.token_store import get_credential_store
+from modules.http_pool import get_session, prewarm, TIMEOUT
+from modules.bar_store import get_bar_store
+from modules import metrics
 
 class KisDomestic:
     def __init__(self):
@@ -14,43 +17,25 @@ class KisDomestic:
         self.access_token = None
         self.token_expiry = 0
         
-        # Share rate limiter concept or create new one
+        # Same host-wide window as KisOverseas (both use the same app key)
         self.limiter = RateLimiter(max_calls=15, period=1.0)
         
+        # Shared keep-alive connection pool (same pool as KisOverseas)
+        self.session = get_session()
+        
+        # Token shared with every other client/process; refreshed in the background by run_bot
+        self.credentials = get_credential_store(self.url, self.app_key, self.app_secret)
         self._refresh_token()
 
+    def prewarm(self, connections=None):
+        """장 시작 전 커넥션 풀 예열"""
+        return prewarm(self.url, connections)
+
     def _refresh_token(self):
-        """Access Token 발급 (동일 로직)"""
+        """Access Token 조회 (shared credential store: memory -> disk -> network)"""
         if time.time() < self.token_expiry:
             return
-
-        path = "/oauth2/tokenP"
-        headers = {"content-type": "application/json"}
-        body = {
-            "grant_type": "client_credentials",
-            "appkey": self.app_key,
-            "appsecret": self.app_secret
-        }
-        
-        try:
-            res = requests.post(self.url + path, headers=headers, data=json.dumps(body))
-            
-            if res.status_code == 403 and "EGW00133" in res.text:
-                print("[KIS-KR] Token rate limit hit. Waiting 60 seconds...")
-                time.sleep(65)
-                res = requests.post(self.url + path, headers=headers, data=json.dumps(body))
-
-            if res.status_code != 200:
-                print(f"[KIS-KR] Token Refresh Error: {res.status_code} {res.text}")
-            
-            res.raise_for_status()
-            data = res.json()
-            self.access_token = data['access_token']
-            self.token_expiry = time.time() + int(data['expires_in']) - 60
-            print(f"[KIS-KR] Token refreshed.")
-        except Exception as e:
-            print(f"[KIS-KR] Token refresh failed: {e}")
-            raise
+        self.access_token, self.token_expiry = self.credentials.get_access_token()
 
     def _get_headers(self, tr_id):
         self._refresh_token()
@@ -63,20 +48,28 @@ class KisDomestic:
             "custtype": "P" # 개인
         }
 
-    def _request(self, method, path, headers=None, params=None, data=None):
-        self.limiter.wait()
+    def _request(self, method, path, headers=None, params=None, data=None, kind="quote", block=False):
+        if not self.limiter.wait(kind, block):
+            print(f"[KIS-KR] Rate limit queue timeout ({kind}): {path}")
+            return None
         try:
+            t0 = time.perf_counter()
             if method == "GET":
-                res = requests.get(self.url + path, headers=headers, params=params)
+                res = self.session.get(self.url + path, headers=headers, params=params, timeout=TIMEOUT)
             elif method == "POST":
-                res = requests.post(self.url + path, headers=headers, data=data)
+                res = self.session.post(self.url + path, headers=headers, data=data, timeout=TIMEOUT)
+            metrics.observe("order_post" if method == "POST" else "rest_get", time.perf_counter() - t0, kind=kind)
             return res.json()
         except Exception as e:
             print(f"[KIS-KR] Request Exception: {e}")
             return None
 
-    def get_current_price(self, ticker):
-        """국내주식 현재가 조회 - FHKST01010100"""
+    def get_current_price(self, ticker, kind="quote"):
+        """국내주식 현재가 조회 - FHKST01010100. kind: RateLimiter request class"""
+        with metrics.timer("quote_fetch", kind=kind):
+            return self._get_current_price(ticker, kind)
+
+    def _get_current_price(self, ticker, kind):
         path = "/uapi/domestic-stock/v1/quotations/inquire-price"
         headers = self._get_headers("FHKST01010100")
         params = {
@@ -84,8 +77,8 @@ class KisDomestic:
             "FID_INPUT_ISCD": ticker
         }
         
-        res = self._request("GET", path, headers=headers, params=params)
-        if res and res['rt_cd'] == '0':
+        res = self._request("GET", path, headers=headers, params=params, kind=kind)
+        if res and res.get('rt_cd') == '0':
             return float(res['output']['stck_prpr']) # 현재가
         return None
 
@@ -101,21 +94,61 @@ class KisDomestic:
             "FID_ORG_ADJ_PRC": "1" # 수정주가 반영
         }
         
-        res = self._request("GET", path, headers=headers, params=params)
-        if res and res['rt_cd'] == '0':
+        res = self._request("GET", path, headers=headers, params=params, kind="history")
+        if res and res.get('rt_cd') == '0':
             # Format to match strategies expectations: [{'clos': '100', ...}]
             # API returns stck_clpr (close), stck_oprc (open), etc.
             output_list = []
             for item in res['output']:
                 output_list.append({
+                    'xymd': item['stck_bsop_date'],
+                    'clos': item['stck_clpr'],
+                    'open': item['stck_oprc'],
+                    'high': item['stck_hgpr'],
+                    'low': item['stck_lwpr'],
+                    'tvol': item['acml_vol']
+                })
+            return output_list
+        return None
+
+    def get_daily_ohlc_range(self, ticker, start, end):
+        """
+        국내주식 기간별 시세 (일봉, 기간 지정) - FHKST03010100
+        start/end: YYYYMMDD. 최대 100건/요청. Same row format as get_daily_ohlc.
+        """
+        path = "/uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice"
+        headers = self._get_headers("FHKST03010100")
+        
+        params = {
+            "FID_COND_MRKT_DIV_CODE": "J",
+            "FID_INPUT_ISCD": ticker,
+            "FID_INPUT_DATE_1": start,
+            "FID_INPUT_DATE_2": end,
+            "FID_PERIOD_DIV_CODE": "D",
+            "FID_ORG_ADJ_PRC": "0" # 0: 수정주가, 1: 원주가
+        }
+        
+        res = self._request("GET", path, headers=headers, params=params, kind="history")
+        if res and res.get('rt_cd') == '0':
+            output_list = []
+            for item in res['output2']:
+                if not item.get('stck_bsop_date'):
+                    continue # Empty padding rows
+                output_list.append({
+                    'xymd': item['stck_bsop_date'],
                     'clos': item['stck_clpr'],
                     'open': item['stck_oprc'],
                     'high': item['stck_hgpr'],
-                    'low': item['stck_lwpr']
+                    'low': item['stck_lwpr'],
+                    'tvol': item['acml_vol']
                 })
             return output_list
         return None
 
+    def get_daily_ohlc_cached(self, ticker, limit=100):
+        """일봉 (local bar store + 1 delta request), latest first like get_daily_ohlc"""
+        return get_bar_store().sync("KR", ticker, self.get_daily_ohlc, limit)
+
     def get_balance(self):
         """주식 잔고 조회 - TTTC8434R (실전/모의 구분 필요)"""
         # 실전: TTTC8434R, 모의: VTTC8434R
@@ -137,7 +170,7 @@ class KisDomestic:
             "CTX_AREA_NK100": ""
         }
         
-        res = self._request("GET", path, headers=headers, params=params)
+        res = self._request("GET", path, headers=headers, params=params, kind="account")
         return res
 
     def buy_market_order(self, ticker, qty):
@@ -156,7 +189,7 @@ class KisDomestic:
             "ORD_UNPR": "0" # 시장가는 0
         }
         
-        return self._request("POST", path, headers=headers, data=json.dumps(data))
+        return self._request("POST", path, headers=headers, data=json.dumps(data), kind="order")
 
     def sell_market_order(self, ticker, qty):
         """국내주식 시장가 매도"""
@@ -174,4 +207,5 @@ class KisDomestic:
             "ORD_UNPR": "0"
         }
         
-        return self._request("POST", path, headers=headers, data=json.dumps(data))
+        # 매도는 rate limit 대기 중 포기하지 않음 (장 마감 청산 누락 방지)
+        return self._request("POST", path, headers=headers, data=json.dumps(data), kind="order", block=True)
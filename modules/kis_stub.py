@@ -0,0 +1,442 @@
+import json
+import time
+import uuid
+import random
+import asyncio
+import datetime
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import websockets
+from modules.tick_decoder import HDFSCNT0_FIELDS, H0STCNT0_FIELDS
+
+# Local KIS Open API stand-in (REST + WebSocket) for load and fault testing.
+# Serves the endpoints / TR IDs used by KisOverseas, KisDomestic, CredentialStore
+# and KisWebSocket, with knobs for latency, throttling (EGW00201 / EGW00133),
+# injected errors, dropped sockets and the real-time tick rate.
+#
+#   server = KisStubServer(latency=0.02, rate_limit=20).start()
+#   KIS_BASE_URL=server.base_url, KIS_WS_URL=server.ws_url -> clients talk to the stub
+
+EGW00201 = {"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}
+EGW00133 = {"error_code": "EGW00133", "error_description": "접근토큰 발급 잠시 후 다시 시도하세요(1분당 1회)"}
+
+def _ok(**fields):
+    return {"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.", **fields}
+
+class PriceModel:
+    """Random-walk last price per symbol, shared by REST quotes and streamed ticks"""
+    def __init__(self, start=100.0, vol=0.0005, seed=None):
+        self.start = start
+        self.vol = vol
+        self.prices = {}
+        self.opens = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def set_price(self, symbol, price):
+        with self._lock:
+            self.prices[symbol] = float(price)
+            self.opens.setdefault(symbol, float(price))
+
+    def last(self, symbol):
+        with self._lock:
+            if symbol not in self.prices:
+                self.prices[symbol] = self.opens[symbol] = self.start
+            return self.prices[symbol]
+
+    def step(self, symbol):
+        price = self.last(symbol)
+        with self._lock:
+            price = round(price * (1 + self._rng.gauss(0, self.vol)), 4)
+            self.prices[symbol] = price
+        return price
+
+    def daily(self, symbol, end=None, count=100):
+        """Deterministic daily bars ending at 'end' (YYYYMMDD), latest first, KIS overseas keys"""
+        day = datetime.datetime.strptime(end, "%Y%m%d") if end else datetime.datetime.now()
+        rng = random.Random(f"{symbol}{day:%Y%m%d}")
+        close = self.last(symbol)
+        rows = []
+        while len(rows) < count:
+            if day.weekday() < 5:
+                open_ = close * (1 + rng.gauss(0, 0.01))
+                high = max(open_, close) * (1 + abs(rng.gauss(0, 0.01)))
+                low = min(open_, close) * (1 - abs(rng.gauss(0, 0.01)))
+                rows.append({"xymd": day.strftime("%Y%m%d"), "clos": f"{close:.4f}", "open": f"{open_:.4f}",
+                             "high": f"{high:.4f}", "low": f"{low:.4f}", "tvol": str(rng.randint(10**5, 10**7))})
+                close = open_ * (1 + rng.gauss(0, 0.01))
+            day -= datetime.timedelta(days=1)
+        return rows
+
+class KisStubServer:
+    """
+    In-process KIS stand-in on 127.0.0.1 (REST on one port, WebSocket on another).
+    Every knob is a plain attribute and can be changed while the server runs:
+      latency / jitter   : seconds added to every REST response
+      rate_limit         : requests/sec per app key before EGW00201 (None = unlimited)
+      throttle_rate      : extra random share of requests answered with EGW00201
+      error_rate         : share of requests answered with HTTP 500 (no KIS body)
+      token_interval     : minimum seconds between tokenP calls per app key (EGW00133)
+      tick_rate          : ticks/sec per subscribed symbol, batch = records per frame
+      ping_interval      : PINGPONG heartbeat period (None = silent server)
+      drop_after         : abort every WebSocket this many seconds after connect
+    """
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit=20, throttle_rate=0.0, error_rate=0.0,
+                 token_interval=60, tick_rate=10.0, batch=1, ping_interval=10.0, drop_after=None,
+                 prices=None, host="127.0.0.1", port=0, ws_port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.token_interval = token_interval
+        self.tick_rate = tick_rate
+        self.batch = batch
+        self.ping_interval = ping_interval
+        self.drop_after = drop_after
+        self.prices = prices or PriceModel()
+        self.host = host
+        self.port = port
+        self.ws_port = ws_port
+
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "tokens": 0, "token_rejected": 0,
+                      "orders": 0, "ws_connections": 0, "ws_drops": 0, "subscriptions": 0, "frames": 0}
+        self.paths = {}
+        self.orders = []
+        self._calls = {} # appkey -> deque of request times (rate limit window)
+        self._last_token = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+        self._http = None
+        self._loop = None
+        self._ws_server = None
+        self._sockets = {} # websocket -> {tr_key: tr_id}
+        self._ready = threading.Event()
+
+    # --- Lifecycle ---
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self):
+        return f"ws://{self.host}:{self.ws_port}"
+
+    def start(self):
+        handler = type("Handler", (_Handler,), {"stub": self})
+        self._http = ThreadingHTTPServer((self.host, self.port), handler)
+        self._http.daemon_threads = True
+        self.port = self._http.server_address[1]
+        threading.Thread(target=self._http.serve_forever, name="kis-stub-http", daemon=True).start()
+        threading.Thread(target=self._run_ws, name="kis-stub-ws", daemon=True).start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        if self._http:
+            self._http.shutdown()
+            self._http.server_close()
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def drop_sockets(self):
+        """Abort every open WebSocket now (simulated network drop)"""
+        def _abort():
+            for ws in list(self._sockets):
+                self.stats["ws_drops"] += 1
+                ws.transport.abort()
+        if self._loop:
+            self._loop.call_soon_threadsafe(_abort)
+
+    def push(self, tr_key, price=None, timeout=5):
+        """
+        Sends one tick for tr_key to every subscribed socket right now (blocking).
+        Returns the wall-clock send time - the start of a tick-to-order measurement.
+        """
+        async def _push():
+            sent = None
+            for ws, subs in list(self._sockets.items()):
+                tr_id = subs.get(tr_key)
+                if tr_id is None:
+                    continue
+                if price is not None:
+                    self.prices.set_price(tr_key[4:] if tr_id == "HDFSCNT0" else tr_key, price)
+                frame = self.make_frame(tr_id, tr_key)
+                sent = time.time()
+                await ws.send(frame)
+                self.stats["frames"] += 1
+            return sent
+        return asyncio.run_coroutine_threadsafe(_push(), self._loop).result(timeout)
+
+    # --- REST ---
+    def _throttled(self, appkey):
+        if self._rng.random() < self.throttle_rate:
+            return True
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            window = self._calls.setdefault(appkey, deque())
+            while window and now - window[0] >= 1.0:
+                window.popleft()
+            if len(window) >= self.rate_limit:
+                return True
+            window.append(now)
+        return False
+
+    def handle(self, method, path, headers, query, body):
+        """Returns (status, json body) for one REST call"""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.paths[path] = self.paths.get(path, 0) + 1
+
+        delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if method == "HEAD":
+            return 200, None
+        if path == "/oauth2/tokenP":
+            return self._token(body)
+        if path == "/oauth2/Approval":
+            return 200, {"approval_key": str(uuid.uuid4())}
+
+        if self._rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return 500, {"error": "Internal Server Error"}
+        if self._throttled(headers.get("appkey", "")):
+            self.stats["throttled"] += 1
+            return 500, EGW00201
+
+        route = ROUTES.get(path)
+        if route is None:
+            return 404, {"rt_cd": "1", "msg_cd": "OPSQ0002", "msg1": f"없는 서비스 코드 입니다: {path}"}
+        return 200, route(self, query, body, headers.get("tr_id", ""))
+
+    def _token(self, body):
+        appkey = body.get("appkey", "")
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_token.get(appkey)
+            if last is not None and now - last < self.token_interval:
+                self.stats["token_rejected"] += 1
+                return 403, EGW00133
+            self._last_token[appkey] = now
+            self.stats["tokens"] += 1
+        return 200, {"access_token": uuid.uuid4().hex, "token_type": "Bearer", "expires_in": 86400,
+                     "access_token_token_expired": (datetime.datetime.now() + datetime.timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")}
+
+    # --- WebSocket ---
+    def _run_ws(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        async def _serve():
+            self._ws_server = await websockets.serve(self._ws_handler, self.host, self.ws_port, ping_interval=None)
+            self.ws_port = self._ws_server.sockets[0].getsockname()[1]
+            self._ready.set()
+
+        self._loop.run_until_complete(_serve())
+        self._loop.run_forever()
+
+    async def _ws_handler(self, ws, path=None):
+        self.stats["ws_connections"] += 1
+        subs = self._sockets[ws] = {} # tr_key -> tr_id
+        tasks = [asyncio.ensure_future(self._stream(ws, subs)), asyncio.ensure_future(self._heartbeat(ws))]
+        if self.drop_after:
+            tasks.append(asyncio.ensure_future(self._drop_later(ws, self.drop_after)))
+        try:
+            async for message in ws:
+                try:
+                    req = json.loads(message)
+                except ValueError:
+                    continue # PONG echo / garbage
+                header, inp = req.get("header", {}), req.get("body", {}).get("input", {})
+                tr_id, tr_key = inp.get("tr_id"), inp.get("tr_key")
+                if not tr_id:
+                    continue
+                if header.get("tr_type") == "2":
+                    subs.pop(tr_key, None)
+                    msg = "UNSUBSCRIBE SUCCESS"
+                else:
+                    subs[tr_key] = tr_id
+                    self.stats["subscriptions"] += 1
+                    msg = "SUBSCRIBE SUCCESS"
+                await ws.send(json.dumps({
+                    "header": {"tr_id": tr_id, "tr_key": tr_key, "encrypt": "N"},
+                    "body": {"rt_cd": "0", "msg_cd": "OPSP0000", "msg1": msg, "output": {"iv": "0" * 16, "key": "0" * 32}},
+                }))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._sockets.pop(ws, None)
+
+    async def _drop_later(self, ws, seconds):
+        await asyncio.sleep(seconds)
+        self.stats["ws_drops"] += 1
+        ws.transport.abort()
+
+    async def _heartbeat(self, ws):
+        while self.ping_interval:
+            await asyncio.sleep(self.ping_interval)
+            await ws.send(json.dumps({"header": {"tr_id": "PINGPONG", "datetime": datetime.datetime.now().strftime("%Y%m%d%H%M%S")}}))
+
+    async def _stream(self, ws, subs):
+        while True:
+            await asyncio.sleep(1.0 / self.tick_rate if self.tick_rate else 1.0)
+            if not self.tick_rate:
+                continue
+            for tr_key, tr_id in list(subs.items()):
+                frame = self.make_frame(tr_id, tr_key, self.batch)
+                if frame:
+                    await ws.send(frame)
+                    self.stats["frames"] += 1
+
+    def make_frame(self, tr_id, tr_key, count=1):
+        """One real-time frame (count records) for a subscription, moving the price model"""
+        if tr_id == "HDFSCNT0":
+            fields, sym, tm, last, vol = HDFSCNT0_FIELDS, "RSYM", "XHMS", "LAST", "EVOL"
+            symbol = tr_key[4:] # DNASTQQQ -> TQQQ
+        elif tr_id == "H0STCNT0":
+            fields, sym, tm, last, vol = H0STCNT0_FIELDS, "MKSC_SHRN_ISCD", "STCK_CNTG_HOUR", "STCK_PRPR", "CNTG_VOL"
+            symbol = tr_key
+        else:
+            return None
+        idx = {name: fields.index(name) for name in (sym, tm, last, vol)}
+        now = datetime.datetime.now().strftime("%H%M%S")
+        records = []
+        for _ in range(count):
+            rec = ["0"] * len(fields)
+            rec[idx[sym]] = tr_key
+            rec[idx[tm]] = now
+            rec[idx[last]] = f"{self.prices.step(symbol):.4f}"
+            rec[idx[vol]] = "1"
+            records.append("^".join(rec))
+        return f"0|{tr_id}|{count:03d}|" + "^".join(records)
+
+# --- REST endpoint handlers: (stub, query, body, tr_id) -> KIS JSON ---
+
+def _overseas_price(stub, q, body, tr_id):
+    symbol = q.get("SYMB", "")
+    last = stub.prices.last(symbol)
+    base = stub.prices.opens.get(symbol, last)
+    return _ok(output={"rsym": f"D{q.get('EXCD', 'NAS')}{symbol}", "last": f"{last:.4f}", "base": f"{base:.4f}",
+                       "open": f"{base:.4f}", "high": f"{max(base, last):.4f}", "low": f"{min(base, last):.4f}", "tvol": "0"})
+
+def _overseas_daily(stub, q, body, tr_id):
+    return _ok(output1={"rsym": q.get("SYMB", "")}, output2=stub.prices.daily(q.get("SYMB", ""), q.get("BYMD") or None))
+
+def _order(stub, q, body, tr_id):
+    with stub._lock:
+        stub.stats["orders"] += 1
+        stub.orders.append((time.time(), tr_id, body.get("PDNO"), body.get("ORD_QTY"), body.get("OVRS_ORD_UNPR") or body.get("ORD_UNPR")))
+        odno = f"{len(stub.orders):010d}"
+    return _ok(output={"KRX_FWDG_ORD_ORGNO": "00000", "ODNO": odno, "ORD_TMD": datetime.datetime.now().strftime("%H%M%S")})
+
+def _overseas_balance(stub, q, body, tr_id):
+    return _ok(output1=[], output2={"tot_evlu_pfls_amt": "0", "frcr_pchs_amt1": "0"})
+
+def _present_balance(stub, q, body, tr_id):
+    return _ok(output1=[], output2=[{"crcy_cd": "USD", "frcr_dncl_amt_2": "10000.00", "frcr_drwg_psbl_amt_1": "10000.00"}], output3={})
+
+def _domestic_price(stub, q, body, tr_id):
+    symbol = q.get("FID_INPUT_ISCD", "")
+    last = stub.prices.last(symbol)
+    return _ok(output={"stck_prpr": f"{last:.0f}", "stck_oprc": f"{stub.prices.opens.get(symbol, last):.0f}"})
+
+def _domestic_rows(stub, symbol, end=None):
+    return [{"stck_bsop_date": r["xymd"], "stck_clpr": r["clos"], "stck_oprc": r["open"], "stck_hgpr": r["high"],
+             "stck_lwpr": r["low"], "acml_vol": r["tvol"]} for r in stub.prices.daily(symbol, end)]
+
+def _domestic_daily(stub, q, body, tr_id):
+    return _ok(output=_domestic_rows(stub, q.get("FID_INPUT_ISCD", ""))[:30])
+
+def _domestic_range(stub, q, body, tr_id):
+    rows = _domestic_rows(stub, q.get("FID_INPUT_ISCD", ""), q.get("FID_INPUT_DATE_2") or None)
+    start = q.get("FID_INPUT_DATE_1", "")
+    return _ok(output1={}, output2=[r for r in rows if r["stck_bsop_date"] >= start])
+
+def _domestic_balance(stub, q, body, tr_id):
+    return _ok(output1=[], output2=[{"dnca_tot_amt": "10000000", "tot_evlu_amt": "10000000"}])
+
+ROUTES = {
+    "/uapi/overseas-price/v1/quotations/price": _overseas_price,
+    "/uapi/overseas-price/v1/quotations/dailyprice": _overseas_daily,
+    "/uapi/overseas-stock/v1/trading/order": _order,
+    "/uapi/overseas-stock/v1/trading/inquire-balance": _overseas_balance,
+    "/uapi/overseas-stock/v1/trading/inquire-present-balance": _present_balance,
+    "/uapi/domestic-stock/v1/quotations/inquire-price": _domestic_price,
+    "/uapi/domestic-stock/v1/quotations/inquire-daily-price": _domestic_daily,
+    "/uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice": _domestic_range,
+    "/uapi/domestic-stock/v1/trading/order-cash": _order,
+    "/uapi/domestic-stock/v1/trading/inquire-balance": _domestic_balance,
+}
+
+class _Handler(BaseHTTPRequestHandler):
+    stub = None
+    protocol_version = "HTTP/1.1" # keep-alive, like the real gateway
+    disable_nagle_algorithm = True # headers and body are separate writes; don't let delayed ACKs stall them
+
+    def _serve(self, method):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = {}
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                pass
+        status, payload = self.stub.handle(method, url.path, self.headers, query, body)
+        data = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if method != "HEAD":
+            self.wfile.write(data)
+
+    def do_GET(self):
+        self._serve("GET")
+
+    def do_POST(self):
+        self._serve("POST")
+
+    def do_HEAD(self):
+        self._serve("HEAD")
+
+    def log_message(self, format, *args):
+        pass # Quiet
+
+if __name__ == "__main__":
+    # Standalone: python -m modules.kis_stub, then run the bot with
+    # KIS_BASE_URL=<base_url> KIS_WS_URL=<ws_url> KIS_TOKEN_FILE=/tmp/stub_credentials.json
+    import argparse
+    parser = argparse.ArgumentParser(description="Local KIS Open API stand-in")
+    parser.add_argument("--port", type=int, default=18443)
+    parser.add_argument("--ws-port", type=int, default=18000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--rate-limit", type=int, default=20)
+    parser.add_argument("--tick-rate", type=float, default=10)
+    parser.add_argument("--drop-after", type=float)
+    args = parser.parse_args()
+
+    server = KisStubServer(latency=args.latency, rate_limit=args.rate_limit, tick_rate=args.tick_rate,
+                           drop_after=args.drop_after, port=args.port, ws_port=args.ws_port).start()
+    print(f"[KIS-STUB] REST {server.base_url}  WS {server.ws_url}")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"[KIS-STUB] {server.stats}")
+    except KeyboardInterrupt:
+        server.stop()
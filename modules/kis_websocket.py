@@ -1,141 +1,205 @@
 import asyncio
+import random
 import websockets
 import json
-import logging
-import time
-from config import KIS_APP_KEY, KIS_APP_SECRET, KIS_MOCK
+from config import KIS_APP_KEY, KIS_APP_SECRET, KIS_BASE_URL, KIS_WS_URL
+from modules.token_store import get_credential_store
+from modules.tick_decoder import decode_frame, Tick
+from modules.logger import logger
+
+# Real-time execution (체결가) TR per market
+TR_ID_BY_MARKET = {
+    "US": "HDFSCNT0", # 해외주식 실시간체결가
+    "KR": "H0STCNT0", # 국내주식 실시간체결가
+}
+
+# Subscribe rejections that mean the approval key itself is bad (expired / unknown / other app key)
+AUTH_ERROR_CODES = {"OPSP0011", "OPSP8993"}
+
+def is_auth_error(body):
+    msg = (body.get("msg1") or "").lower()
+    return body.get("msg_cd") in AUTH_ERROR_CODES or "approval" in msg or "appkey" in msg
 
 class KisWebSocket:
-    def __init__(self, tickers, callback):
-        self.tickers = tickers
-        self.callback = callback
+    """
+    Self-healing, multiplexed KIS real-time feed.
+    - One connection carries every subscription (US and KR can be mixed)
+    - Reconnects with exponential backoff + jitter and re-subscribes everything
+    - Answers PINGPONG heartbeats and reconnects if the server goes silent
+    - Routes each frame by (tr_id, tr_key) to the handler of that symbol
+    Handlers are coroutines: async def handler(ticker, price)
+    """
+    BACKOFF_MIN = 1.0
+    BACKOFF_MAX = 60.0
+    # KIS sends PINGPONG periodically; no frame at all for this long means a dead socket
+    HEARTBEAT_TIMEOUT = 60.0
+
+    def __init__(self, tickers=None, callback=None, market="US"):
         self.approval_key = None
         self.connected = False
-        
-        # Real/Mock URL differentiation
-        if KIS_MOCK:
-            self.base_url = "https://openapivts.koreainvestment.com:29443"
-            self.ws_url = "ws://ops.koreainvestment.com:31000" # Advanced Mock
-        else:
-            self.base_url = "https://openapi.koreainvestment.com:9443"
-            self.ws_url = "ws://ops.koreainvestment.com:21000" # Real
-            
+        self.running = False
+        self.loop = None
+        self.websocket = None
+        self.reconnects = 0
+
+        # Routing table: (tr_id, tr_key) -> (ticker, handler)
+        self.routes = {}
+
+        # Real/Mock URL differentiation (config.KIS_BASE_URL / KIS_WS_URL)
+        self.base_url = KIS_BASE_URL
+        self.ws_url = KIS_WS_URL
+
+        for ticker in tickers or []:
+            self.subscribe(ticker, callback, market)
+
+    def _store(self):
+        return get_credential_store(self.base_url, KIS_APP_KEY, KIS_APP_SECRET)
+
     def get_approval_key(self):
-        import requests
-        url = f"{self.base_url}/oauth2/Approval"
-        headers = {"content-type": "application/json; utf-8"}
-        body = {
-            "grant_type": "client_credentials",
-            "appkey": KIS_APP_KEY,
-            "secretkey": KIS_APP_SECRET
-        }
+        """Approval key from the shared credential store (issued once per app key, re-issued when expired)"""
         try:
-            res = requests.post(url, headers=headers, data=json.dumps(body))
-            res.raise_for_status()
-            self.approval_key = res.json()["approval_key"]
-            logging.info(f"WebSocket Approval Key: {self.approval_key[:10]}...")
+            key = self._store().get_approval_key()
+            if key != self.approval_key:
+                logger.info(f"WebSocket Approval Key: {key[:10]}...")
+            self.approval_key = key
             return True
         except Exception as e:
-            logging.error(f"Failed to get WebSocket Approval Key: {e}")
+            logger.error(f"Failed to get WebSocket Approval Key: {e}")
             return False
 
+    @staticmethod
+    def make_tr_key(ticker, market="US", exchange="NAS"):
+        """
+        Subscription key for a symbol.
+        US: D + exchange + ticker (e.g. DNASTQQQ). KR: 6-digit code as-is.
+        """
+        if market == "US":
+            return f"D{exchange}{ticker}"
+        return ticker
+
+    def subscribe(self, ticker, handler, market="US", exchange="NAS"):
+        """Register a symbol handler. Sent immediately if connected, else on (re)connect."""
+        tr_id = TR_ID_BY_MARKET[market]
+        tr_key = self.make_tr_key(ticker, market, exchange)
+        self.routes[(tr_id, tr_key)] = (ticker, handler)
+        if self.connected and self.loop:
+            asyncio.run_coroutine_threadsafe(self._send_subscription(self.websocket, tr_id, tr_key, "1"), self.loop)
+
+    def unsubscribe(self, ticker, market="US", exchange="NAS"):
+        tr_id = TR_ID_BY_MARKET[market]
+        tr_key = self.make_tr_key(ticker, market, exchange)
+        if self.routes.pop((tr_id, tr_key), None) and self.connected and self.loop:
+            asyncio.run_coroutine_threadsafe(self._send_subscription(self.websocket, tr_id, tr_key, "2"), self.loop)
+
+    async def _send_subscription(self, websocket, tr_id, tr_key, tr_type):
+        # tr_type: 1 = register, 2 = release
+        req = {
+            "header": {
+                "approval_key": self.approval_key,
+                "custtype": "P",
+                "tr_type": tr_type,
+                "content-type": "utf-8"
+            },
+            "body": {
+                "input": {
+                    "tr_id": tr_id,
+                    "tr_key": tr_key
+                }
+            }
+        }
+        await websocket.send(json.dumps(req))
+        logger.info(f"{'Subscribed' if tr_type == '1' else 'Unsubscribed'} {tr_key} ({tr_id})")
+
+    async def _handle_frame(self, websocket, data):
+        # Real-time data: encrypted(0/1) | tr_id | record count | payload
+        if data[0] in "01":
+            # A frame may batch several records (possibly for different symbols)
+            for tick in decode_frame(data):
+                route = self.routes.get((tick.tr_id, tick.symbol))
+                if route is not None and isinstance(tick, Tick):
+                    ticker, handler = route
+                    await handler(ticker, tick.price)
+            return
+
+        # JSON system message (PINGPONG or subscribe ACK)
+        msg = json.loads(data)
+        header = msg.get("header", {})
+        if header.get("tr_id") == "PINGPONG":
+            await websocket.pong(data)
+            return
+
+        body = msg.get("body", {})
+        if body.get("rt_cd") not in (None, "0"):
+            logger.warning(f"WebSocket {header.get('tr_id')} {header.get('tr_key')}: {body.get('msg1')}")
+            if is_auth_error(body) and self.approval_key:
+                # Rejected key: drop it from the store and reconnect, which fetches a new one
+                logger.warning("WebSocket approval key rejected. Re-issuing and reconnecting.")
+                try:
+                    self._store().invalidate_approval_key(self.approval_key)
+                except Exception as e:
+                    logger.error(f"Failed to invalidate WebSocket Approval Key: {e}")
+                self.approval_key = None
+                await websocket.close()
+
+    def connect_url(self):
+        """ws_url + /tryitout/<tr_id> of the first subscribed TR (US execution TR when nothing is routed yet)"""
+        tr_id = next(iter(self.routes), (TR_ID_BY_MARKET["US"],))[0]
+        return f"{self.ws_url.rstrip('/')}/tryitout/{tr_id}"
+
     async def connect(self):
-        if not self.approval_key:
+        """Connection manager: runs until stop(), reconnecting with exponential backoff."""
+        self.running = True
+        self.loop = asyncio.get_running_loop()
+        backoff = self.BACKOFF_MIN
+
+        while self.running:
+            # Re-read before every (re)connect: the store re-issues an expired or rejected key
             if not self.get_approval_key():
-                return
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.BACKOFF_MAX)
+                continue
 
-        try:
-            async with websockets.connect(f"{self.ws_url}/tryitout/HDFSZC413000") as websocket:
-                logging.info("WebSocket Connected.")
-                self.connected = True
-                
-                # Subscribe to each ticker
-                for ticker in self.tickers:
-                    # TR_ID: HDFSZC413000 (US Realtime Execution) or HDFSCNT0 (Quote)
-                    # Using Execution Price (HDFSZC413000) for fastest trade data
-                    # Mock uses H0STCNT0 generally
-                    
-                    tr_id = "H0STCNT0" if KIS_MOCK else "HDFSZC413000" 
-                    tr_type = "1" # Register
-                    
-                    # Format Input: Key depends on TR_ID
-                    # Real: HDFSZC413000 -> ticker (DNAS), Mock: H0STCNT0 -> ticker (DNAS)
-                    
-                    # Note: Need ticker symbol like 'DNASS' + 'AAPL' ?
-                    # Usually: D+NAS+Ticker (e.g., DNASAAPL)
-                    # For ETF/Stock: R+NAS+Ticker or D+NAS+Ticker
-                    # Let's try general format D+NAS+{Ticker}
-                    
-                    # Symbol Code Generation
-                    # US Market Codes: NAS(Nasdaq), NYS(NYSE), AMS(Amex)
-                    # Simplified: Assume all are NAS for now or lookup. 
-                    # TQQQ, SOXL, NVDA are NAS. TSLA is NAS. FNGU is NYS(Arca)? No, FNGU is BZX (Cboe).
-                    # This is tricky. Let's start with NAS assumption for simplicity.
-                    
-                    stock_code = f"DNAS{ticker}" 
-                    
-                    req = {
-                        "header": {
-                            "approval_key": self.approval_key,
-                            "custtype": "P",
-                            "tr_type": tr_type,
-                            "content-type": "utf-8"
-                        },
-                        "body": {
-                            "input": {
-                                "tr_id": tr_id,
-                                "tr_key": stock_code 
-                            }
-                        }
-                    }
-                    await websocket.send(json.dumps(req))
-                    logging.info(f"Subscribed to {ticker} ({stock_code})")
-                    
-                while True:
-                    data = await websocket.recv()
-                    
-                    # Ping/Pong handling if necessary (KIS usually sends data stream)
-                    # Decrypt/Parse data
-                    # Data format is separated by |
-                    # 0: encrypted(0/1) | 1: tr_id | 2: len | 3: data
-                    
-                    # Raw parsing
-                    parts = data.split('|')
-                    if len(parts) > 3:
-                        tr_id = parts[1]
-                        payload = parts[3]
-                        
-                        # Parse payload based on documentation
-                        # For US Stock Realtime (HDFSZC413000):
-                        # Fields: Time, Price, Vol, etc.
-                        # Simple retrieval of current price
-                        
+            try:
+                async with websockets.connect(self.connect_url(), ping_interval=None) as websocket:
+                    logger.info("WebSocket Connected.")
+                    self.websocket = websocket
+                    self.connected = True
+
+                    # (Re)subscribe every routed symbol
+                    for tr_id, tr_key in list(self.routes):
+                        await self._send_subscription(websocket, tr_id, tr_key, "1")
+                    backoff = self.BACKOFF_MIN
+
+                    while self.running:
+                        data = await asyncio.wait_for(websocket.recv(), self.HEARTBEAT_TIMEOUT)
                         try:
-                            # Typically split by '^'
-                            fields = payload.split('^')
-                            if len(fields) > 2:
-                                # Field 1 is usually current price (check docs)
-                                # 11:11:11^120.50^10...
-                                # Assuming Price is at index 1 or 2
-                                current_price_str = fields[2] # Example index. Needs verification.
-                                
-                                # Let's assume index 2 is price (Common in KIS)
-                                # But let's log first message to calibrate
-                                
-                                price = float(current_price_str)
-                                await self.callback(ticker, price)
-                                
+                            await self._handle_frame(websocket, data)
                         except Exception as e:
-                            pass # Parse error
-                            
-                    elif data[0] == '{': # JSON system message (PING or ACK)
-                        msg = json.loads(data)
-                        # logging.debug(f"WS Sys Msg: {msg}")
-                        
-        except Exception as e:
-            logging.error(f"WebSocket Error: {e}")
+                            logger.debug(f"WebSocket frame error: {e}")
+            except asyncio.TimeoutError:
+                logger.warning(f"WebSocket silent for {self.HEARTBEAT_TIMEOUT}s. Reconnecting.")
+            except Exception as e:
+                if self.running:
+                    logger.error(f"WebSocket Error: {e}")
+
             self.connected = False
+            self.websocket = None
+            if not self.running:
+                break
+
+            # Exponential backoff with jitter so several clients don't reconnect in lockstep
+            delay = backoff * (1 + random.random() * 0.2)
+            logger.info(f"WebSocket reconnecting in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, self.BACKOFF_MAX)
+            self.reconnects += 1
 
     def start(self):
         # Run async loop
         asyncio.run(self.connect())
+
+    def stop(self):
+        """Stop reconnecting and close the connection (callable from another thread)"""
+        self.running = False
+        if self.loop and self.websocket:
+            asyncio.run_coroutine_threadsafe(self.websocket.close(), self.loop)
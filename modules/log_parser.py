@@ -0,0 +1,261 @@
+import os
+import re
+import abc
+import json
+from collections import deque
+
+# Trading log parsing shared by dashboard.py and the benchmarks.
+# Format: 2025-12-31 02:48:44,165 - INFO - Message
+# The event journal (modules/logger.py) is the primary source for bot state; the
+# text-log helpers remain for logs written before the journal existed.
+
+LOG_LINE = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d{3} - (\w+) - (.*)")
+# "[TQQQ] ..." / "[122630] ..." at the start of the message; "[US] ..." / "[KR] ..." are market tags
+TICKER = re.compile(r"^\[([A-Z]{1,5}|\d{6})\]")
+MARKET_TAGS = {"US", "KR"}
+CURRENT_MA = re.compile(r"Current: ([^,]+), MA20: (.+)")
+TARGET = re.compile(r"Target Price: ([^ ]+)")
+
+TRADE_KEYWORDS = ("Buy Order", "Sell Order", "Selling All", "Stop Loss")
+
+def parse_log_line(line):
+    """{'timestamp', 'level', 'message'} or None for lines not in the log format"""
+    match = LOG_LINE.match(line)
+    if match:
+        return {
+            "timestamp": match.group(1),
+            "level": match.group(2),
+            "message": match.group(3)
+        }
+    return None
+
+def read_log_lines(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.readlines()
+    except UnicodeDecodeError:
+        # Fallback to system encoding (cp949/euc-kr)
+        with open(path, "r", encoding="cp949") as f:
+            return f.readlines()
+
+def parse_log_file(path):
+    """Every parsed line of a log file, oldest first"""
+    parsed = (parse_log_line(line) for line in read_log_lines(path))
+    return [x for x in parsed if x is not None]
+
+def update_ticker_data(ticker_data, parsed_lines):
+    """
+    Latest Current / MA20 / Target / Trend per ticker, from run_bot's session logs:
+      "[TQQQ] Current: 54.38, MA20: 54.31"
+      "[TQQQ] Bull Market! Target Price: 55.12 (Open: 54.0)"
+      "[TQQQ] Bear Market (Price < 20MA). Skipping."
+    """
+    for line in parsed_lines:
+        msg = line['message']
+
+        # Extract Ticker from [TICKER]
+        ticker_match = TICKER.search(msg)
+        if not ticker_match or ticker_match.group(1) in MARKET_TAGS:
+            continue
+
+        ticker = ticker_match.group(1)
+        if ticker not in ticker_data:
+            ticker_data[ticker] = {"Current": "N/A", "MA20": "N/A", "Target": "N/A", "Trend": "Unknown"}
+
+        m1 = CURRENT_MA.search(msg)
+        if m1:
+            ticker_data[ticker]["Current"] = m1.group(1).strip()
+            ticker_data[ticker]["MA20"] = m1.group(2).strip()
+
+        m2 = TARGET.search(msg)
+        if m2:
+            ticker_data[ticker]["Target"] = m2.group(1).strip()
+            ticker_data[ticker]["Trend"] = "Bull 🐂"
+
+        if "Bear Market" in msg:
+            ticker_data[ticker]["Trend"] = "Bear 🐻"
+            ticker_data[ticker]["Target"] = "-"
+    return ticker_data
+
+def build_ticker_data(parsed_lines):
+    return update_ticker_data({}, parsed_lines)
+
+def extract_trades(parsed_lines):
+    """Order / sell-off / stop events for the "Recent Trades" table"""
+    return [line for line in parsed_lines if any(k in line['message'] for k in TRADE_KEYWORDS)]
+
+# --- Event journal consumers ---
+
+TREND_LABELS = {"bull": "Bull 🐂", "bear": "Bear 🐻"}
+
+def _fmt(value, missing="N/A"):
+    return missing if value is None else str(value)
+
+def ticker_data_from_events(events):
+    """Same shape as build_ticker_data, from journal events (no text parsing)"""
+    return update_ticker_data_from_events({}, events)
+
+def update_ticker_data_from_events(ticker_data, events):
+    for event in events:
+        ticker = event.get("ticker")
+        if not ticker:
+            continue
+        d = ticker_data.setdefault(ticker, {"Current": "N/A", "MA20": "N/A", "Target": "N/A", "Trend": "Unknown", "Status": "-"})
+        kind = event["type"]
+        # Strings like the text-log path (one column type for the dashboard table)
+        if kind == "target":
+            d["Current"] = _fmt(event.get("price"))
+            d["MA20"] = _fmt(event.get("ma"))
+            d["Target"] = _fmt(event.get("target"), "-")
+            d["Trend"] = TREND_LABELS.get(event.get("trend"), "Unknown")
+            d["Status"] = "monitoring" if event.get("trend") == "bull" else "skipped"
+        elif kind == "breakout":
+            d["Current"] = _fmt(event.get("price"), d["Current"])
+            d["Status"] = "breakout"
+        elif kind == "ai_verdict" and not event.get("can_buy"):
+            d["Status"] = "AI rejected"
+        elif kind == "order":
+            d["Status"] = ("bought" if event.get("side") == "buy" else "sold") if event.get("accepted") else "order failed"
+    return ticker_data
+
+def trades_from_events(events):
+    """Order / fill events for the "Recent Trades" table"""
+    return [
+        {
+            "timestamp": e["ts"],
+            "ticker": e.get("ticker"),
+            "side": e.get("side"),
+            "qty": e.get("qty"),
+            "status": e["type"] if e["type"] == "fill" else ("accepted" if e.get("accepted") else "failed"),
+            "latency_ms": e.get("latency_ms"),
+        }
+        for e in events if e["type"] in ("order", "fill")
+    ]
+
+# --- Incremental tailing (dashboard reruns) ---
+# The dashboard reruns every few seconds; a tail object kept across reruns remembers
+# the byte offset and the state derived so far, so each refresh only reads and parses
+# the lines appended since the last one (cost ~ new lines, not file size).
+
+class _Tail(abc.ABC):
+    """
+    Complete lines appended to 'path' since the last poll(). A partially written last line waits for the next poll.
+    Size rotation (path -> path.1, new file under path) is followed: what was appended to the old
+    file before it was rotated is drained from the backup first, then the new file is read from 0.
+    """
+    CHUNK = 4 * 1024 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.inode = None
+        self._partial = b""
+
+    def _read_from(self, path, offset):
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                chunk = f.read(self.CHUNK)
+                if not chunk:
+                    break
+                self.offset += len(chunk)
+                lines = (self._partial + chunk).split(b"\n")
+                self._partial = lines.pop()
+                yield from lines
+
+    def _rotated(self):
+        """
+        After a size rotation: the backup our file was renamed to (path.N) and any newer
+        backups (path.N-1 .. path.1), oldest first. Empty if our file is gone.
+        """
+        n = 1
+        while True:
+            backup = f"{self.path}.{n}"
+            try:
+                if os.stat(backup).st_ino == self.inode:
+                    return [f"{self.path}.{i}" for i in range(n, 0, -1)]
+            except FileNotFoundError:
+                return []
+            n += 1
+
+    def _new_lines(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if st.st_ino != self.inode:
+            if self.inode is not None:
+                # Rotated: drain the rest of the old file (and anything rotated after it) first
+                offset = self.offset
+                for backup in self._rotated():
+                    yield from self._read_from(backup, offset)
+                    offset = 0
+                    if self._partial:
+                        yield self._partial # a finished file's last line will not be completed any more
+                        self._partial = b""
+            self.inode = st.st_ino
+            self.offset = 0
+            self._partial = b""
+        elif st.st_size < self.offset:
+            # Truncated in place: start over at 0
+            self.offset = 0
+            self._partial = b""
+        if st.st_size == self.offset:
+            return
+        yield from self._read_from(self.path, self.offset)
+
+    def poll(self):
+        """Consume the new lines; returns how many there were"""
+        count = 0
+        for line in self._new_lines():
+            self._consume(line)
+            count += 1
+        return count
+
+    @abc.abstractmethod
+    def _consume(self, line):
+        """Handle one complete raw line (bytes, without the newline)"""
+
+class LogTail(_Tail):
+    """
+    Trading log state kept across dashboard reruns: ticker_data (build_ticker_data),
+    and bounded windows of the newest trades (extract_trades) and parsed lines
+    for the Recent Trades / System Logs tables.
+    """
+    def __init__(self, path, window=2000, trade_window=500):
+        super().__init__(path)
+        self.lines = deque(maxlen=window)
+        self.ticker_data = {}
+        self.trades = deque(maxlen=trade_window)
+        self.last = None # newest parsed line
+
+    def _consume(self, raw):
+        try:
+            text = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            # Fallback to system encoding (cp949/euc-kr)
+            text = raw.decode("cp949", errors="replace")
+        parsed = parse_log_line(text.rstrip("\r"))
+        if parsed is None:
+            return
+        self.lines.append(parsed)
+        self.last = parsed
+        update_ticker_data(self.ticker_data, (parsed,))
+        self.trades.extend(extract_trades((parsed,)))
+
+class EventTail(_Tail):
+    """Journal (<day>.jsonl) state kept across dashboard reruns: ticker_data and the newest trades"""
+    def __init__(self, path, trade_window=500):
+        super().__init__(path)
+        self.count = 0
+        self.ticker_data = {}
+        self.trades = deque(maxlen=trade_window)
+
+    def _consume(self, raw):
+        try:
+            event = json.loads(raw)
+        except ValueError:
+            return
+        self.count += 1
+        update_ticker_data_from_events(self.ticker_data, (event,))
+        self.trades.extend(trades_from_events((event,)))
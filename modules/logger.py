@@ -1,27 +1,280 @@
 import logging
 import os
-from datetime import datetime
+import json
+import time
+import queue
+import atexit
+import threading
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from config import JOURNAL_DIR, LOG_DIR, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_DEDUP_WINDOW
+from modules import clock
 
 # Ensure database directory exists for logs
-if not os.path.exists('database'):
-    os.makedirs('database')
+if not os.path.exists(LOG_DIR):
+    os.makedirs(LOG_DIR)
+
+# Logging never blocks the caller: logger -> dedup filter -> in-memory queue, and a
+# background listener thread formats and writes to the file / console.
+
+class DailyRotatingFileHandler(RotatingFileHandler):
+    """
+    <dir>/<prefix><YYYYMMDD>.log for the day of each record (a bot running for weeks
+    gets one file per day); within a day the file is size-rotated to .log.1, .log.2 ...
+    """
+    def __init__(self, directory, prefix="trading_", max_bytes=0, backup_count=0):
+        self.directory = directory
+        self.prefix = prefix
+        self.day = time.strftime("%Y%m%d")
+        # delay: the file is only created once something is written
+        super().__init__(self._path(self.day), maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+
+    def _path(self, day):
+        return os.path.abspath(os.path.join(self.directory, f"{self.prefix}{day}.log"))
+
+    def emit(self, record):
+        day = time.strftime("%Y%m%d", time.localtime(record.created))
+        if day != self.day:
+            # New day: switch files (reopened lazily by emit)
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.day = day
+            self.baseFilename = self._path(day)
+        super().emit(record)
+
+class DedupFilter(logging.Filter):
+    """
+    Rate-limits repeated INFO/DEBUG messages: the same level + text within 'window' seconds
+    is dropped; the next occurrence after the window is logged with the number suppressed.
+    WARNING and above always pass (a repeated order failure is exactly what must be seen).
+    """
+    MAX_KEYS = 1024
+
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        self._seen = OrderedDict() # (level, message) -> [first logged at, suppressed count]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.window <= 0 or record.levelno >= logging.WARNING:
+            return True
+        message = record.getMessage()
+        key = (record.levelno, message)
+        now = record.created
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+            self._seen[key] = [now, 0]
+            self._seen.move_to_end(key)
+            if len(self._seen) > self.MAX_KEYS:
+                self._seen.popitem(last=False)
+        if entry is not None and entry[1]:
+            record.msg = f"{message} (suppressed {entry[1]} repeats in {now - entry[0]:.0f}s)"
+            record.args = None
+        return True
+
+class _AsyncHandler(QueueHandler):
+    """Enqueue the record as is; formatting happens on the listener thread, not the caller's"""
+    def prepare(self, record):
+        return record
 
 def setup_logger():
     logger = logging.getLogger("US_ETF_Sniper")
     logger.setLevel(logging.INFO)
+    # Records must not also reach the (synchronous) root handlers
+    logger.propagate = False
     
     formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
     
-    # File Handler
-    file_handler = logging.FileHandler(f"database/trading_{datetime.now().strftime('%Y%m%d')}.log", encoding='utf-8')
+    # File Handler (one file per day, size-rotated)
+    file_handler = DailyRotatingFileHandler(LOG_DIR, "trading_", LOG_MAX_BYTES, LOG_BACKUP_COUNT)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
     
     # Console Handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
     
-    return logger
+    log_queue = queue.SimpleQueue()
+    queue_handler = _AsyncHandler(log_queue)
+    queue_handler.addFilter(DedupFilter(LOG_DEDUP_WINDOW))
+    logger.addHandler(queue_handler)
+    
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop) # drain the queue on exit
+    return logger, file_handler, console_handler, listener
+
+logger, file_handler, console_handler, _listener = setup_logger()
+
+def set_file_logging(enabled):
+    """Turn the trading log file on/off (replays and benchmarks keep it clean)"""
+    file_handler.setLevel(logging.NOTSET if enabled else logging.CRITICAL + 1)
+
+def set_console_level(level):
+    console_handler.setLevel(level)
+
+def flush_logs():
+    """Block until every queued record is written (tests / before reading the log back)"""
+    _listener.stop()
+    _listener.start()
+
+# --- Event journal ---
+# Typed, append-only JSONL record of what the bot did, next to the free-text log.
+# Consumers (dashboard, analysis) read events instead of regex-parsing log lines.
+#   database/journal/<YYYYMMDD>.jsonl  one event per line: {"ts", "type", "market", "ticker", ...}
+#   database/journal/<YYYYMMDD>.idx    "<ticker>\t<byte offset>" per ticker event (read one ticker without a full scan)
+# The day is the session's start date, so an overnight US session stays in one file.
+
+EVENT_TYPES = {
+    "session_start", # market, tickers
+    "target",        # market, ticker, price, ma, open, target (None when bear), trend ("bull" / "bear")
+    "breakout",      # market, ticker, price, target, source ("ws" / "rest")
+    "ai_verdict",    # market, ticker, can_buy, risk_level, reason
+    "order",         # market, ticker, side, qty, accepted, latency_ms, response
+    "fill",          # market, ticker, side, qty, price (simulated broker)
+    "session_end",   # market, latency (tick-to-order summary), stages (metrics summary)
+}
+
+class EventJournal:
+    """
+    Events are stamped on the caller's thread and written (JSON + index) by a background
+    writer thread, so journaling adds no disk I/O to the breakout path.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.day = None # set by session_start
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._open_day = None
+        self._file = None
+        self._index = None
+
+    def _open(self, day):
+        if self._open_day == day:
+            return
+        self._close_files()
+        os.makedirs(self.root, exist_ok=True)
+        # Append mode: tell() starts at the end of what previous runs wrote
+        self._file = open(journal_path(day, self.root), "ab")
+        self._index = open(journal_path(day, self.root, ".idx"), "a", encoding="utf-8")
+        self._open_day = day
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                day, event = item
+                line = (json.dumps(event, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+                self._open(day)
+                offset = self._file.tell()
+                self._file.write(line)
+                self._file.flush()
+                if event.get("ticker"):
+                    self._index.write(f"{event['ticker']}\t{offset}\n")
+                    self._index.flush()
+            except Exception as e:
+                logger.error(f"Journal write failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def write(self, type, **fields):
+        if type not in EVENT_TYPES:
+            raise ValueError(f"Unknown journal event type: {type}")
+        now = clock.now()
+        if type == "session_start":
+            self.day = now.strftime("%Y%m%d")
+        day = self.day or now.strftime("%Y%m%d")
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._writer, name="event-journal", daemon=True)
+                    self._thread.start()
+        self._queue.put((day, {"ts": now.isoformat(sep=" ", timespec="milliseconds"), "type": type, **fields}))
+
+    def flush(self):
+        """Block until every queued event is on disk"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _close_files(self):
+        for f in (self._file, self._index):
+            if f:
+                f.close()
+        self._file = self._index = self._open_day = None
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._close_files()
+
+journal = EventJournal(JOURNAL_DIR)
+atexit.register(lambda: journal and journal.close())
+
+def set_journal_dir(root):
+    """Redirect the journal (replays write their own) or disable it with None"""
+    global journal
+    if journal is not None:
+        journal.close()
+    journal = EventJournal(root) if root else None
+
+def log_event(type, **fields):
+    """Queue one typed event for the journal (unknown types raise ValueError)"""
+    if journal is None:
+        return
+    journal.write(type, **fields)
+
+def journal_path(day, root=JOURNAL_DIR, ext=".jsonl"):
+    return os.path.join(root, f"{day}{ext}")
+
+def journal_days(root=JOURNAL_DIR):
+    """Days with a journal, oldest first"""
+    if not os.path.isdir(root):
+        return []
+    return sorted(name[:-6] for name in os.listdir(root) if name.endswith(".jsonl"))
+
+def read_events(day, ticker=None, types=None, root=JOURNAL_DIR):
+    """
+    Events of one day, oldest first. With ticker, only that ticker's events are
+    read (seek to the offsets in the .idx file instead of scanning the day).
+    types: optional collection of event types to keep.
+    """
+    path = journal_path(day, root)
+    if not os.path.exists(path):
+        return []
+    events = []
+    with open(path, "rb") as f:
+        if ticker is None:
+            lines = f
+        else:
+            offsets = []
+            try:
+                with open(journal_path(day, root, ".idx"), encoding="utf-8") as idx:
+                    for entry in idx:
+                        name, _, offset = entry.rstrip("\n").partition("\t")
+                        if name == ticker and offset:
+                            offsets.append(int(offset))
+            except FileNotFoundError:
+                pass
 
-logger = setup_logger()
+            def _at(offsets):
+                for offset in offsets:
+                    f.seek(offset)
+                    yield f.readline()
+            lines = _at(offsets)
+        for line in lines:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue # partially written last line
+            if types is None or event.get("type") in types:
+                events.append(event)
+    return events
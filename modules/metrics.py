@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Per-stage latency histograms for the hot path (quote fetch, limiter queueing, AI gate,
+# order POST, token refresh, tick-to-order). observe() is a bisect + a few adds under a
+# lock (~1 us), cheap enough for every request. Exported as Prometheus text (HTTP
+# endpoint and/or periodic file) and summarized as p50/p99 per session.
+
+# Bucket upper bounds in seconds: 10 per decade (~26% apart) from 10 us to 100 s
+BUCKETS = [round(10 ** (e / 10), 12) for e in range(-50, 21)]
+METRIC_NAME = "sniper_stage_seconds"
+
+class Histogram:
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels # (("kind", "quote"), ...)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(BUCKETS) + 1) # last slot: > BUCKETS[-1]
+            self.count = 0
+            self.sum = 0.0
+            self.max = 0.0
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def time(self):
+        """with hist.time(): ... observes the block's duration"""
+        return _Timer(self)
+
+    def quantile(self, q):
+        """Approximate quantile (linear within the bucket), in seconds"""
+        with self._lock:
+            counts, count, top = list(self.counts), self.count, self.max
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for i, c in enumerate(counts):
+            if c and seen + c >= rank:
+                lo = BUCKETS[i - 1] if i > 0 else 0.0
+                hi = BUCKETS[i] if i < len(BUCKETS) else top
+                return min(top, lo + (hi - lo) * (rank - seen) / c)
+            seen += c
+        return top
+
+    def name(self):
+        return self.stage + "".join(f"[{v}]" for _, v in self.labels)
+
+class _Timer:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.hist.observe(time.perf_counter() - self.t0)
+        return False
+
+_histograms = {}
+_lock = threading.Lock()
+
+def histogram(stage, **labels):
+    """Process-wide histogram for a stage (+ labels). Look it up once, observe() many times."""
+    key = (stage, tuple(sorted(labels.items())))
+    hist = _histograms.get(key)
+    if hist is None:
+        with _lock:
+            hist = _histograms.setdefault(key, Histogram(stage, key[1]))
+    return hist
+
+def observe(stage, seconds, **labels):
+    histogram(stage, **labels).observe(seconds)
+
+def timer(stage, **labels):
+    return histogram(stage, **labels).time()
+
+def reset():
+    """Start a new session: clear every histogram (series stay registered)"""
+    for hist in list(_histograms.values()):
+        hist.reset()
+
+def summary():
+    """{'stage[label]': {'count', 'p50_ms', 'p99_ms', 'max_ms'}} for stages with samples"""
+    out = {}
+    for hist in sorted(_histograms.values(), key=Histogram.name):
+        if hist.count:
+            out[hist.name()] = {
+                "count": hist.count,
+                "p50_ms": round(hist.quantile(0.5) * 1000, 3),
+                "p99_ms": round(hist.quantile(0.99) * 1000, 3),
+                "max_ms": round(hist.max * 1000, 3),
+            }
+    return out
+
+def _series(suffix, labels):
+    """sniper_stage_seconds<suffix>{k="v",...}"""
+    return METRIC_NAME + suffix + "{" + ",".join('%s="%s"' % kv for kv in labels) + "}"
+
+def render():
+    """Prometheus text exposition format"""
+    lines = [
+        f"# HELP {METRIC_NAME} Hot-path stage latency",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    quantiles = []
+    for hist in sorted(_histograms.values(), key=Histogram.name):
+        with hist._lock:
+            counts, count, total = list(hist.counts), hist.count, hist.sum
+        base = [("stage", hist.stage)] + list(hist.labels)
+        cumulative = 0
+        for bound, c in zip(BUCKETS, counts):
+            cumulative += c
+            lines.append(f"{_series('_bucket', base + [('le', f'{bound:g}')])} {cumulative}")
+        lines.append(f"{_series('_bucket', base + [('le', '+Inf')])} {count}")
+        lines.append(f"{_series('_sum', base)} {total:.6f}")
+        lines.append(f"{_series('_count', base)} {count}")
+        for q in (0.5, 0.99):
+            quantiles.append(f"{_series('_quantile', base + [('quantile', str(q))])} {hist.quantile(q):.6f}")
+    lines += [f"# HELP {METRIC_NAME}_quantile Approximate stage latency quantiles (from the histogram)",
+              f"# TYPE {METRIC_NAME}_quantile gauge"] + quantiles
+    return "\n".join(lines) + "\n"
+
+def write_file(path, text=None):
+    """Atomically write the current metrics (Prometheus text, or JSON summary for *.json)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if text is None:
+        text = json.dumps(summary(), indent=2) if path.endswith(".json") else render()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def start_file_exporter(path, interval=15):
+    """Rewrite 'path' every 'interval' seconds (node_exporter textfile collector style)"""
+    def _loop():
+        while True:
+            time.sleep(interval)
+            try:
+                write_file(path)
+            except OSError as e:
+                print(f"[Metrics] Failed to write {path}: {e}")
+
+    thread = threading.Thread(target=_loop, name="metrics-file", daemon=True)
+    thread.start()
+    return thread
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_http_server(port, host="127.0.0.1"):
+    """Serve /metrics on host:port from a daemon thread. Returns the server."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[Metrics] Serving http://{host}:{server.server_port}/metrics")
+    return server
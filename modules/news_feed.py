@@ -0,0 +1,165 @@
+import re
+import time
+import codecs
+import threading
+import requests
+import xml.etree.ElementTree as ET
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from config import NEWS_SOURCES_US, NEWS_SOURCES_KR, NEWS_MAX_ITEMS, AI_NEWS_TTL
+
+NEWS_SOURCES = {"US": NEWS_SOURCES_US, "KR": NEWS_SOURCES_KR}
+TIMEOUT = (3.05, 10)
+CHUNK = 8192
+SEEN_LIMIT = 5000 # remembered item ids per feed (dedup across polls)
+
+_XML_ENCODING = re.compile(rb"""<\?xml[^>]*encoding=["']([A-Za-z0-9._-]+)["']""")
+# Encodings expat parses natively from bytes; anything else (EUC-KR, CP949...) is decoded first
+_NATIVE = {"utf-8", "utf8", "us-ascii", "ascii", "iso-8859-1", "latin-1", "latin1"}
+
+def _local(tag):
+    """'{http://www.w3.org/2005/Atom}entry' -> 'entry'"""
+    return tag.rsplit("}", 1)[-1]
+
+def _item_fields(elem):
+    """(id, title, description) of an RSS <item> / Atom <entry>"""
+    fields = {}
+    for child in elem:
+        name = _local(child.tag)
+        if name == "link" and child.get("href"):
+            fields.setdefault("link", child.get("href"))
+        elif child.text and name not in fields:
+            fields[name] = child.text.strip()
+    title = fields.get("title", "")
+    description = fields.get("description") or fields.get("summary") or ""
+    return fields.get("guid") or fields.get("id") or fields.get("link") or title, title, description
+
+class _Source:
+    """Per-feed state: conditional GET validators, seen item ids, latest headlines"""
+    def __init__(self, url, max_items):
+        self.url = url
+        self.etag = None
+        self.last_modified = None
+        self.seen = OrderedDict()
+        self.headlines = deque(maxlen=max_items) # newest first
+        self.stats = {"polls": 0, "not_modified": 0, "new_items": 0, "bytes": 0}
+
+class NewsFeed:
+    """
+    Concurrent RSS/Atom ingestion for one market.
+    - Conditional GET (ETag / If-Modified-Since): an unchanged feed is a bodiless 304.
+    - Streaming parse (XMLPullParser over the response chunks), stopping after
+      max_items new items or once max_items already-seen items in a row were read
+      (feeds are newest first, the rest is old news) - the rest is never downloaded.
+    - Items already seen are skipped across polls; each source keeps its latest
+      max_items headlines, so an unchanged feed yields the same text (verdict cache hit).
+    """
+    def __init__(self, market="US", sources=None, max_items=NEWS_MAX_ITEMS, min_interval=AI_NEWS_TTL):
+        urls = sources if sources is not None else NEWS_SOURCES.get(market, [])
+        self.market = market
+        self.max_items = max_items
+        self.min_interval = min_interval
+        self.sources = [_Source(url, max_items) for url in urls]
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(1, len(urls)), pool_maxsize=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = "Mozilla/5.0 (US-ETF-Sniper news reader)"
+        self._last_poll = 0.0
+        self._lock = threading.Lock()
+
+    def _fetch(self, source):
+        """Poll one source. Returns the number of new items."""
+        headers = {}
+        if source.etag:
+            headers["If-None-Match"] = source.etag
+        if source.last_modified:
+            headers["If-Modified-Since"] = source.last_modified
+        source.stats["polls"] += 1
+
+        with self.session.get(source.url, headers=headers, timeout=TIMEOUT, stream=True) as res:
+            if res.status_code == 304:
+                source.stats["not_modified"] += 1
+                return 0
+            res.raise_for_status()
+            new = self._parse(source, res)
+            # Only trust the validators once the response was handled
+            source.etag = res.headers.get("ETag")
+            source.last_modified = res.headers.get("Last-Modified")
+        return new
+
+    def _parse(self, source, res):
+        parser = ET.XMLPullParser(["end"])
+        decoder = None
+        fresh, seen_run = [], 0
+        first = True
+        for chunk in res.iter_content(CHUNK):
+            source.stats["bytes"] += len(chunk)
+            if first:
+                first = False
+                m = _XML_ENCODING.search(chunk[:200])
+                encoding = (m.group(1).decode() if m else res.encoding or "utf-8").lower()
+                if encoding not in _NATIVE:
+                    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            parser.feed(decoder.decode(chunk) if decoder else chunk)
+
+            for _, elem in parser.read_events():
+                if _local(elem.tag) not in ("item", "entry"):
+                    continue
+                item_id, title, description = _item_fields(elem)
+                elem.clear()
+                if not title:
+                    continue
+                if item_id in source.seen:
+                    seen_run += 1
+                else:
+                    seen_run = 0
+                    source.seen[item_id] = True
+                    fresh.append(f"- {title}: {description}" if description else f"- {title}")
+                if len(fresh) >= self.max_items or seen_run >= self.max_items:
+                    break
+            else:
+                continue
+            break # stop downloading: closing the response drops the rest of the body
+
+        while len(source.seen) > SEEN_LIMIT:
+            source.seen.popitem(last=False)
+        # fresh is newest first; keep the newest max_items overall
+        for line in reversed(fresh):
+            source.headlines.appendleft(line)
+        source.stats["new_items"] += len(fresh)
+        return len(fresh)
+
+    def poll(self, force=False):
+        """
+        Poll every source concurrently (skipped if polled within min_interval).
+        Returns the number of new items across all sources.
+        """
+        with self._lock:
+            if not force and time.monotonic() - self._last_poll < self.min_interval:
+                return 0
+            self._last_poll = time.monotonic()
+
+            def _safe(source):
+                try:
+                    return self._fetch(source)
+                except Exception as e:
+                    print(f"[News] Failed to fetch {source.url}: {e}")
+                    return 0
+
+            if not self.sources:
+                return 0
+            with ThreadPoolExecutor(max_workers=len(self.sources), thread_name_prefix="news") as pool:
+                return sum(pool.map(_safe, self.sources))
+
+    def text(self):
+        """Current headline set, one '- title: description' line per item"""
+        return "\n".join(line for source in self.sources for line in source.headlines)
+
+    def fetch(self, force=False):
+        self.poll(force)
+        return self.text()
+
+    def stats(self):
+        return {source.url: dict(source.stats) for source in self.sources}
@@ -0,0 +1,179 @@
+import os
+import mmap
+import time
+import struct
+import hashlib
+import tempfile
+import threading
+from config import KIS_APP_KEY, KIS_RATE_LIMIT_FILE
+from modules.file_lock import FileLock
+from modules import metrics
+
+# Shared state layout (little endian):
+#   header: ring capacity, ring head, total calls, throttled calls, total wait seconds
+#   ring:   RING_SIZE call timestamps (float64), oldest overwritten first
+_HEADER = struct.Struct("<IIQQd")
+RING_SIZE = 64
+_FILE_SIZE = _HEADER.size + RING_SIZE * 8
+
+def default_limit_file(app_key=None):
+    """One state file per app key - KIS throttles per key, not per process."""
+    if KIS_RATE_LIMIT_FILE:
+        return KIS_RATE_LIMIT_FILE
+    key = app_key or KIS_APP_KEY or "default"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"kis_ratelimit_{digest}.bin")
+
+# Request classes, highest priority first
+PRIORITIES = {"order": 0, "account": 1, "quote": 2, "history": 3}
+
+# Share of the window each class may fill; the rest is kept free for higher classes,
+# so quote polling (from any process) can never take the slot a breakout order needs.
+LANE_SHARE = {"order": 1.0, "account": 0.9, "quote": 0.8, "history": 0.6}
+
+# Longest a caller may queue before the request is dropped (seconds).
+# A quote older than 1s is useless to the watch loop; an order may wait a little longer.
+MAX_WAIT = {"order": 2.0, "account": 5.0, "quote": 1.0, "history": 30.0}
+
+class RateLimiter:
+    """
+    Priority Sliding Window Rate Limiter shared by every process on the host.
+    Ensures the bot, dashboard and test/debug scripts together do not exceed
+    'max_calls' per 'period' seconds against the same app key.
+
+    The window lives in a memory-mapped file guarded by an flock. Requests are
+    classified (order > account > quote > history): inside a process a waiting
+    higher class always takes the next slot, and across processes each class is
+    capped at LANE_SHARE of the window so orders keep headroom.
+    """
+    def __init__(self, max_calls=15, period=1.0, path=None):
+        if max_calls > RING_SIZE:
+            raise ValueError(f"max_calls must be <= {RING_SIZE}")
+        self.max_calls = max_calls
+        self.period = period
+        self.path = path or default_limit_file()
+        self.lock = FileLock(self.path)
+        self._mm = self._open_shared()
+        
+        self.caps = {k: max(1, int(max_calls * share)) for k, share in LANE_SHARE.items()}
+        self._cond = threading.Condition()
+        self._waiting = [0] * len(PRIORITIES)
+        # Per-process queueing delay metrics per class
+        self.lane_stats = {k: {"count": 0, "timeouts": 0, "total_delay": 0.0, "max_delay": 0.0} for k in PRIORITIES}
+        self._wait_hist = {k: metrics.histogram("limiter_wait", kind=k) for k in PRIORITIES}
+
+    def _open_shared(self):
+        with self.lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size < _FILE_SIZE:
+                    os.ftruncate(fd, _FILE_SIZE)
+                return mmap.mmap(fd, _FILE_SIZE)
+            finally:
+                os.close(fd) # mmap keeps its own reference
+
+    def _slots(self):
+        return struct.unpack_from(f"<{RING_SIZE}d", self._mm, _HEADER.size)
+
+    def _try_acquire(self, now, cap, delay):
+        """
+        Takes a slot if fewer than 'cap' calls (all processes) are in the window.
+        Returns None on success, otherwise the time the next slot frees up.
+        """
+        with self.lock:
+            _, head, calls, throttled, waited = _HEADER.unpack_from(self._mm, 0)
+            
+            # cap-th most recent call (0.0 if the ring is not that full yet)
+            nth = self._slots()[(head - cap) % RING_SIZE]
+            if now - nth <= self.period:
+                return nth + self.period
+            
+            struct.pack_into("<d", self._mm, _HEADER.size + head * 8, now)
+            if delay > 0:
+                throttled += 1
+                waited += delay
+            _HEADER.pack_into(self._mm, 0, RING_SIZE, (head + 1) % RING_SIZE, calls + 1, throttled, waited)
+            return None
+
+    def _record(self, kind, delay, timed_out=False):
+        st = self.lane_stats[kind]
+        if timed_out:
+            st["timeouts"] += 1
+            return
+        st["count"] += 1
+        self._wait_hist[kind].observe(delay)
+        st["total_delay"] += delay
+        st["max_delay"] = max(st["max_delay"], delay)
+
+    def wait(self, kind="quote", block=False):
+        """
+        Blocks until a slot for request class 'kind' is free.
+        Returns False if MAX_WAIT[kind] elapsed first - the caller should drop the request.
+        block=True never gives up (session-end sells: a dropped sell would hold a position overnight).
+        """
+        prio = PRIORITIES[kind]
+        start = time.time()
+        deadline = float("inf") if block else start + MAX_WAIT[kind]
+        
+        with self._cond:
+            self._waiting[prio] += 1
+            try:
+                while True:
+                    now = time.time()
+                    if any(self._waiting[:prio]):
+                        # A higher class is queued in this process: let it go first
+                        retry = now + self.period / self.max_calls
+                    else:
+                        retry = self._try_acquire(now, self.caps[kind], now - start)
+                        if retry is None:
+                            self._record(kind, now - start)
+                            return True
+                    
+                    if now >= deadline:
+                        self._record(kind, now - start, timed_out=True)
+                        return False
+                    self._cond.wait(min(retry, deadline) - now)
+            finally:
+                self._waiting[prio] -= 1
+                self._cond.notify_all()
+
+    def stats(self):
+        """
+        Live utilization of the shared window (all processes combined) plus
+        this process's queueing delay per request class.
+        headroom = calls still available in the current window.
+        """
+        with self.lock:
+            _, _, calls, throttled, waited = _HEADER.unpack_from(self._mm, 0)
+            now = time.time()
+            in_window = sum(1 for t in self._slots() if now - t <= self.period)
+        
+        lanes = {}
+        with self._cond:
+            for kind, st in self.lane_stats.items():
+                lanes[kind] = {
+                    "count": st["count"],
+                    "timeouts": st["timeouts"],
+                    "queued": self._waiting[PRIORITIES[kind]],
+                    "avg_delay_ms": round(st["total_delay"] / st["count"] * 1000, 2) if st["count"] else 0.0,
+                    "max_delay_ms": round(st["max_delay"] * 1000, 2),
+                }
+        
+        return {
+            "calls_in_window": in_window,
+            "max_calls": self.max_calls,
+            "utilization": round(in_window / self.max_calls, 3),
+            "headroom": max(0, self.max_calls - in_window),
+            "total_calls": calls,
+            "throttled_calls": throttled,
+            "total_wait_sec": round(waited, 3),
+            "lanes": lanes,
+        }
+
+if __name__ == "__main__":
+    # Live view: python -m modules.rate_limiter
+    limiter = RateLimiter()
+    print(f"Shared limiter file: {limiter.path}")
+    while True:
+        print(limiter.stats())
+        time.sleep(1)
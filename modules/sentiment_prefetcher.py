@@ -0,0 +1,72 @@
+import time
+import threading
+from modules.logger import logger
+from config import AI_REFRESH_INTERVAL, AI_MAX_STALENESS
+
+class SentimentPrefetcher:
+    """
+    Keeps the AI verdicts fresh on a background thread: every 'interval' seconds one
+    batched assess_universe call scores every ticker of the session against the latest
+    news, and the {ticker: verdict} table replaces the snapshot. The breakout path only
+    reads that table and does no network I/O.
+    A snapshot older than 'max_age' seconds (AI / RSS down) counts as no verdict: don't buy.
+    """
+    def __init__(self, ai, market="US", tickers=(), interval=AI_REFRESH_INTERVAL, max_age=AI_MAX_STALENESS):
+        self.ai = ai
+        self.market = market
+        self.tickers = list(tickers)
+        self.interval = interval
+        self.max_age = max_age
+        self._snapshot = None # (time.monotonic() of refresh, {ticker: verdict, "market": verdict}) - replaced atomically
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Fetch news and score the universe in one AI call; the new table replaces the snapshot."""
+        news = self.ai.fetch_news(self.market)
+        verdicts = self.ai.assess_universe(news, self.tickers, self.market)
+        market_verdict = verdicts.get('market', {})
+        if market_verdict.get('risk_level') == 'UNKNOWN' and self._snapshot:
+            # AI error: keep the last good table until it goes stale
+            logger.warning(f"AI refresh failed, keeping previous verdicts: {market_verdict.get('reason')}")
+            return self._snapshot[1]
+        self._snapshot = (time.monotonic(), verdicts)
+        self._ready.set()
+        blocked = [t for t in self.tickers if not verdicts.get(t, market_verdict).get('can_buy', False)]
+        logger.info(f"[{self.market}] AI verdicts refreshed: market {market_verdict.get('risk_level')}, blocked {blocked or 'none'}")
+        return verdicts
+
+    def snapshot(self, ticker=None):
+        """Latest verdict for ticker (market-wide if None / not scored) without blocking. Missing or stale -> can_buy False."""
+        snap = self._snapshot
+        if snap is None:
+            return {"risk_level": "UNKNOWN", "can_buy": False, "reason": "No AI verdict yet"}
+        age = time.monotonic() - snap[0]
+        if age > self.max_age:
+            return {"risk_level": "UNKNOWN", "can_buy": False, "reason": f"AI verdict stale ({age:.0f}s old)"}
+        verdicts = snap[1]
+        return verdicts.get(ticker) or verdicts.get('market') or {"risk_level": "UNKNOWN", "can_buy": False, "reason": "No verdict"}
+
+    def wait_ready(self, timeout):
+        """Block until the first verdict is in (or timeout). Returns True if ready."""
+        return self._ready.wait(timeout)
+
+    def start(self):
+        if self._thread is not None:
+            return self
+
+        def _loop():
+            while not self._stop.is_set():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"AI sentiment refresh error: {e}")
+                self._stop.wait(self.interval)
+
+        self._thread = threading.Thread(target=_loop, name="ai-prefetch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
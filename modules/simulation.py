@@ -0,0 +1,147 @@
+import bisect
+import threading
+from concurrent.futures import Executor, Future
+from modules.bar_store import bars_to_rows
+from modules import clock
+from modules.logger import log_event
+
+# Stand-ins for the live session dependencies, used by replay.py.
+
+class SimBroker:
+    """
+    Simulated KIS client with the method surface run_bot / BreakoutEngine use.
+    Daily bars come from the bar store (strictly before the replayed day), prices
+    from the replayed tick tape, and market orders fill at the last price.
+    """
+    def __init__(self, market, bars, ticks):
+        self.market = market
+        self.limiter = None
+        self.url = "sim://"
+        self._bars = bars # {ticker: BAR_DTYPE array before the session date}
+        self._first = {}  # ticker -> first price of the session (quote before the first tick)
+        for _, ticker, price in ticks:
+            self._first.setdefault(ticker, price)
+        self.prices = {}
+        self.positions = {}
+        self.fills = [] # (datetime, side, ticker, qty, price)
+        self._lock = threading.Lock()
+
+    def on_price(self, ticker, price):
+        self.prices[ticker] = price
+
+    # --- Market data ---
+    def get_current_price(self, ticker, kind="quote"):
+        return self.prices.get(ticker, self._first.get(ticker))
+
+    def get_daily_ohlc(self, ticker, period="D", bymd=None):
+        return self.get_daily_ohlc_cached(ticker)
+
+    def get_daily_ohlc_cached(self, ticker, limit=100):
+        bars = self._bars.get(ticker)
+        if bars is None or len(bars) == 0:
+            return []
+        return bars_to_rows(bars, limit)
+
+    # --- Orders / account ---
+    def _fill(self, side, ticker, qty):
+        price = self.get_current_price(ticker)
+        if price is None:
+            return {'rt_cd': '1', 'msg1': 'No price'}
+        with self._lock:
+            held = self.positions.get(ticker, 0)
+            if side == "sell" and held < qty:
+                return {'rt_cd': '1', 'msg1': 'Insufficient position'}
+            self.positions[ticker] = held + qty if side == "buy" else held - qty
+            self.fills.append((clock.now(), side, ticker, qty, price))
+        log_event("fill", market=self.market, ticker=ticker, side=side, qty=qty, price=price)
+        return {'rt_cd': '0', 'msg1': 'Simulated fill', 'output': {'ODNO': str(len(self.fills))}}
+
+    def buy_market_order(self, ticker, qty):
+        return self._fill("buy", ticker, qty)
+
+    def sell_market_order(self, ticker, qty):
+        return self._fill("sell", ticker, qty)
+
+    def get_balance(self):
+        return {'rt_cd': '0', 'output1': [{'ticker': t, 'qty': q} for t, q in self.positions.items() if q]}
+
+    def prewarm(self, connections=None):
+        return 0
+
+    def report(self):
+        """Round trips and realized P&L per ticker (buy/sell pairs in fill order)"""
+        trades, open_buys = [], {}
+        for ts, side, ticker, qty, price in self.fills:
+            if side == "buy":
+                open_buys.setdefault(ticker, []).append((ts, qty, price))
+            elif open_buys.get(ticker):
+                bts, bqty, bprice = open_buys[ticker].pop(0)
+                trades.append({"ticker": ticker, "entry_time": bts.isoformat(sep=' '), "entry": bprice,
+                               "exit_time": ts.isoformat(sep=' '), "exit": price,
+                               "pnl": (price - bprice) * qty, "return": price / bprice - 1})
+        return {"fills": len(self.fills), "trades": trades, "pnl": sum(t["pnl"] for t in trades)}
+
+class StubAnalyst:
+    """GeminiAnalyst stand-in with a fixed verdict (no network)"""
+    def __init__(self, can_buy=True):
+        self.verdict = {"risk_level": "LOW" if can_buy else "HIGH", "can_buy": can_buy, "reason": "Replay stub"}
+
+    def fetch_news(self, market="US"):
+        return ""
+
+    def check_market_sentiment(self, news_text, market="US"):
+        return dict(self.verdict)
+
+    def assess_universe(self, news_text, tickers, market="US"):
+        return {t: dict(self.verdict) for t in list(tickers) + ["market"]}
+
+class InlineExecutor(Executor):
+    """Runs submitted work immediately on the caller's thread (deterministic replays)"""
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+class ReplayFeed:
+    """
+    Plays a tick tape on the SimClock: every clock advance delivers the ticks up
+    to the new virtual time to the broker and, for watched tickers, to
+    engine.on_tick (as streamed ticks, like KisWebSocket).
+    """
+    def __init__(self, ticks, broker):
+        self.ticks = ticks
+        self.times = [t[0] for t in ticks]
+        self.broker = broker
+        self.pos = 0
+        self.engine = None
+        self.watched = set()
+        self._clock = None
+
+    def seek(self, now):
+        """Skip ticks before 'now' without delivering them"""
+        self.pos = bisect.bisect_right(self.times, now)
+
+    def _on_advance(self, now):
+        ticks, pos = self.ticks, self.pos
+        while pos < len(ticks) and ticks[pos][0] <= now:
+            _, ticker, price = ticks[pos]
+            pos += 1
+            self.pos = pos
+            self.broker.on_price(ticker, price)
+            if self.engine is not None and ticker in self.watched:
+                self.engine.on_tick(ticker, price, source="ws")
+
+    def __call__(self, market, tickers, engine):
+        """Same role as run_bot.start_stream: wire the feed to the engine, return a stoppable handle"""
+        self.engine = engine
+        self.watched = set(tickers)
+        self._clock = clock.get_clock()
+        self._clock.add_listener(self._on_advance)
+        return self
+
+    def stop(self):
+        if self._clock:
+            self._clock.remove_listener(self._on_advance)
@@ -0,0 +1,151 @@
+from collections import namedtuple
+import numpy as np
+
+# KIS real-time frame: encrypted(0/1) | tr_id | record count | payload
+# payload = record count x len(schema) fields, all joined by '^'
+
+# --- Field schemas (KIS Open API real-time TR specs) ---
+HDFSCNT0_FIELDS = [ # 해외주식 실시간체결가
+    "RSYM", "SYMB", "ZDIV", "TYMD", "XYMD", "XHMS", "KYMD", "KHMS",
+    "OPEN", "HIGH", "LOW", "LAST", "SIGN", "DIFF", "RATE",
+    "PBID", "PASK", "VBID", "VASK", "EVOL", "TVOL", "TAMT",
+    "BIVL", "ASVL", "STRN", "MTYP",
+]
+
+H0STCNT0_FIELDS = [ # 국내주식 실시간체결가
+    "MKSC_SHRN_ISCD", "STCK_CNTG_HOUR", "STCK_PRPR", "PRDY_VRSS_SIGN", "PRDY_VRSS", "PRDY_CTRT",
+    "WGHN_AVRG_STCK_PRC", "STCK_OPRC", "STCK_HGPR", "STCK_LWPR", "ASKP1", "BIDP1",
+    "CNTG_VOL", "ACML_VOL", "ACML_TR_PBMN", "SELN_CNTG_CSNU", "SHNU_CNTG_CSNU", "NTBY_CNTG_CSNU",
+    "CTTR", "SELN_CNTG_SMTN", "SHNU_CNTG_SMTN", "CCLD_DVSN", "SHNU_RATE", "PRDY_VOL_VRSS_ACML_VOL_RATE",
+    "OPRC_HOUR", "OPRC_VRSS_PRPR_SIGN", "OPRC_VRSS_PRPR", "HGPR_HOUR", "HGPR_VRSS_PRPR_SIGN", "HGPR_VRSS_PRPR",
+    "LWPR_HOUR", "LWPR_VRSS_PRPR_SIGN", "LWPR_VRSS_PRPR", "BSOP_DATE", "NEW_MKOP_CLS_CODE", "TRHT_YN",
+    "ASKP_RSQN1", "BIDP_RSQN1", "TOTAL_ASKP_RSQN", "TOTAL_BIDP_RSQN", "VOL_TNRT", "PRDY_SMNS_HOUR_ACML_VOL",
+    "PRDY_SMNS_HOUR_ACML_VOL_RATE", "HOUR_CLS_CODE", "MRKT_TRTM_CLS_CODE", "VI_STND_PRC",
+]
+
+HDFSASP0_FIELDS = [ # 해외주식 실시간호가 (1호가)
+    "RSYM", "SYMB", "ZDIV", "XYMD", "XHMS", "KYMD", "KHMS",
+    "BVOL", "AVOL", "BDVL", "ADVL", "PBID1", "PASK1", "VBID1", "VASK1", "DBID1", "DASK1",
+]
+
+H0STASP0_FIELDS = ( # 국내주식 실시간호가 (10호가)
+    ["MKSC_SHRN_ISCD", "BSOP_HOUR", "HOUR_CLS_CODE"]
+    + [f"ASKP{i}" for i in range(1, 11)] + [f"BIDP{i}" for i in range(1, 11)]
+    + [f"ASKP_RSQN{i}" for i in range(1, 11)] + [f"BIDP_RSQN{i}" for i in range(1, 11)]
+    + ["TOTAL_ASKP_RSQN", "TOTAL_BIDP_RSQN", "OVTM_TOTAL_ASKP_RSQN", "OVTM_TOTAL_BIDP_RSQN",
+       "ANTC_CNPR", "ANTC_CNQN", "ANTC_VOL", "ANTC_CNTG_VRSS", "ANTC_CNTG_VRSS_SIGN", "ANTC_CNTG_PRDY_CTRT",
+       "ACML_VOL", "TOTAL_ASKP_RSQN_ICDC", "TOTAL_BIDP_RSQN_ICDC", "OVTM_TOTAL_ASKP_ICDC", "OVTM_TOTAL_BIDP_ICDC",
+       "STCK_DEAL_CLS_CODE"]
+)
+
+# Compact record types handed to consumers
+Tick = namedtuple("Tick", ["tr_id", "symbol", "time", "price", "volume"])
+Quote = namedtuple("Quote", ["tr_id", "symbol", "time", "bid", "ask", "bid_size", "ask_size"])
+
+# NumPy row layout for batch decoding (trades and quotes share it; unused columns are NaN)
+ROW_DTYPE = np.dtype([
+    ("tr_id", "U8"), ("symbol", "U16"), ("time", "U6"),
+    ("price", "f8"), ("volume", "f8"),
+    ("bid", "f8"), ("ask", "f8"), ("bid_size", "f8"), ("ask_size", "f8"),
+])
+
+class Schema:
+    """Field layout of one TR: record width + indices of the columns we decode."""
+    def __init__(self, tr_id, fields, kind, columns):
+        self.tr_id = tr_id
+        self.fields = fields
+        self.width = len(fields)
+        self.kind = kind # 'trade' or 'quote'
+        self.index = {name: fields.index(src) for name, src in columns.items()}
+
+SCHEMAS = {
+    "HDFSCNT0": Schema("HDFSCNT0", HDFSCNT0_FIELDS, "trade",
+                       {"symbol": "RSYM", "time": "XHMS", "price": "LAST", "volume": "EVOL"}),
+    "H0STCNT0": Schema("H0STCNT0", H0STCNT0_FIELDS, "trade",
+                       {"symbol": "MKSC_SHRN_ISCD", "time": "STCK_CNTG_HOUR", "price": "STCK_PRPR", "volume": "CNTG_VOL"}),
+    "HDFSASP0": Schema("HDFSASP0", HDFSASP0_FIELDS, "quote",
+                       {"symbol": "RSYM", "time": "XHMS", "bid": "PBID1", "ask": "PASK1", "bid_size": "VBID1", "ask_size": "VASK1"}),
+    "H0STASP0": Schema("H0STASP0", H0STASP0_FIELDS, "quote",
+                       {"symbol": "MKSC_SHRN_ISCD", "time": "BSOP_HOUR", "bid": "BIDP1", "ask": "ASKP1", "bid_size": "BIDP_RSQN1", "ask_size": "ASKP_RSQN1"}),
+}
+
+def _columns(frame):
+    """
+    Splits a frame once and returns (schema, {column: strided field list}).
+    Each column is a single slice over the flat field list (fields[i::width]),
+    so no per-record lists are built. Returns (None, None) for frames we don't decode.
+    """
+    parts = frame.split('|', 3)
+    if len(parts) < 4 or parts[0] != '0':
+        return None, None # System JSON / encrypted execution notices
+
+    schema = SCHEMAS.get(parts[1])
+    if schema is None:
+        return None, None
+
+    fields = parts[3].split('^')
+    count = min(int(parts[2]), len(fields) // schema.width) # Trust only complete records
+    end = count * schema.width
+    return schema, {name: fields[i:end:schema.width] for name, i in schema.index.items()}
+
+def _parse(make, columns):
+    """
+    Records from parallel column lists. Fast path converts everything in one comprehension;
+    if a field is malformed, only that record is dropped and the rest of the batch is kept.
+    """
+    try:
+        return [make(*fields) for fields in zip(*columns)]
+    except ValueError:
+        out = []
+        for fields in zip(*columns):
+            try:
+                out.append(make(*fields))
+            except ValueError:
+                continue
+        return out
+
+def decode_frame(frame):
+    """Every record in one frame as Tick / Quote tuples ([] if not a market-data frame)."""
+    schema, cols = _columns(frame)
+    if schema is None:
+        return []
+
+    tr = schema.tr_id
+    if schema.kind == "trade":
+        return _parse(lambda s, t, p, v: Tick(tr, s, t, float(p), float(v)),
+                      (cols["symbol"], cols["time"], cols["price"], cols["volume"]))
+    return _parse(lambda s, t, b, a, bs, az: Quote(tr, s, t, float(b), float(a), float(bs), float(az)),
+                  (cols["symbol"], cols["time"], cols["bid"], cols["ask"], cols["bid_size"], cols["ask_size"]))
+
+def _numeric(row):
+    try:
+        for x in row[3:]:
+            float(x)
+        return True
+    except ValueError:
+        return False
+
+def decode_frames(frames):
+    """Batch decode: every record of every frame into one NumPy structured array (ROW_DTYPE)."""
+    nan = float("nan")
+    rows = []
+    for frame in frames:
+        schema, cols = _columns(frame)
+        if schema is None:
+            continue
+
+        n = len(cols["symbol"])
+        tr = [schema.tr_id] * n
+        if schema.kind == "trade":
+            rows.extend(zip(tr, cols["symbol"], cols["time"], cols["price"], cols["volume"],
+                            [nan] * n, [nan] * n, [nan] * n, [nan] * n))
+        else:
+            rows.extend(zip(tr, cols["symbol"], cols["time"], [nan] * n, [nan] * n,
+                            cols["bid"], cols["ask"], cols["bid_size"], cols["ask_size"]))
+
+    # NumPy converts the numeric strings to float64 in C while building the array
+    try:
+        return np.array(rows, dtype=ROW_DTYPE)
+    except ValueError:
+        # A malformed numeric field: mask out only the records that have one
+        return np.array([r for r in rows if _numeric(r)], dtype=ROW_DTYPE)
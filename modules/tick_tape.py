@@ -0,0 +1,86 @@
+import os
+import csv
+import datetime
+import threading
+
+# Tick tapes for session replay (replay.py).
+# A tape is a CSV of "timestamp,ticker,price" rows (KST, same clock as run_bot),
+# recorded from the live stream when TICK_RECORD_DIR is set, or synthesized
+# from a daily bar when no recording exists for that day.
+
+# KST session windows as used by run_bot.get_market_status (open, last tick)
+SESSION_HOURS = {
+    "US": ((23, 30), (5, 59)), # 23:30 ~ 06:00 (next day)
+    "KR": ((9, 0), (15, 19)),  # 09:00 ~ 15:20
+}
+
+def session_bounds(market, date):
+    """(first, last) KST datetimes of the session that trades on 'date' (YYYYMMDD, exchange date)"""
+    day = datetime.datetime.strptime(str(date), "%Y%m%d")
+    (oh, om), (ch, cm) = SESSION_HOURS[market]
+    start = day.replace(hour=oh, minute=om)
+    end = day.replace(hour=ch, minute=cm, second=59)
+    if end <= start:
+        end += datetime.timedelta(days=1)
+    return start, end
+
+def session_date(market, now):
+    """Exchange date (YYYYMMDD int) of the session running at KST 'now' (a US session ends the next morning)"""
+    if market == "US" and now.hour < 12:
+        now -= datetime.timedelta(days=1)
+    return int(now.strftime("%Y%m%d"))
+
+def tape_path(root, market, date):
+    return os.path.join(root, market, f"{date}.csv")
+
+class TickRecorder:
+    """Appends streamed ticks to <root>/<market>/<YYYYMMDD>.csv (thread-safe, line-buffered)"""
+    def __init__(self, root, market, date=None):
+        date = date or datetime.datetime.now().strftime("%Y%m%d")
+        path = tape_path(root, market, date)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def record(self, ticker, price, ts=None):
+        ts = ts or datetime.datetime.now()
+        with self._lock:
+            self._file.write(f"{ts.isoformat(sep=' ')},{ticker},{price}\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+def load_tape(path):
+    """Recorded ticks as a time-sorted list of (datetime, ticker, price)"""
+    ticks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) < 3:
+                continue
+            try:
+                ticks.append((datetime.datetime.fromisoformat(row[0]), row[1], float(row[2])))
+            except ValueError:
+                continue # header / partial line
+    ticks.sort(key=lambda t: t[0])
+    return ticks
+
+def synth_ticks(bar, ticker, start, end, interval=1.0):
+    """
+    Intraday path through one daily bar (BAR_DTYPE row): open -> low -> high -> close
+    on up days, open -> high -> low -> close on down days, one tick every 'interval'
+    seconds between start and end. Breakout timing is approximate but every
+    intraday extreme the strategy reacts to is visited.
+    """
+    o, h, l, c = float(bar["open"]), float(bar["high"]), float(bar["low"]), float(bar["close"])
+    waypoints = [o, l, h, c] if c >= o else [o, h, l, c]
+    n = max(4, int((end - start).total_seconds() / interval) + 1)
+    legs = len(waypoints) - 1
+    ticks = []
+    for i in range(n):
+        pos = i * legs / (n - 1)
+        leg = min(int(pos), legs - 1)
+        frac = pos - leg
+        price = waypoints[leg] + (waypoints[leg + 1] - waypoints[leg]) * frac
+        ticks.append((start + datetime.timedelta(seconds=i * interval), ticker, round(price, 4)))
+    return ticks
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from config import KIS_TOKEN_FILE
+from modules.file_lock import FileLock
+from modules.http_pool import get_session, TIMEOUT
+from modules import metrics
+
+# Refresh this long before the token expires (KIS access tokens live 24h)
+REFRESH_AHEAD = 3600
+# Safety margin when deciding a cached token is still usable
+EXPIRY_MARGIN = 60
+# KIS does not return an expiry for the WebSocket approval key; treat it as 12h
+APPROVAL_KEY_TTL = 12 * 3600
+# tokenP is limited to 1 request per minute per app key (EGW00133)
+TOKEN_RETRY_WAIT = 65
+
+class CredentialStore:
+    """
+    On-disk, file-locked cache of the KIS access token and WebSocket approval key.
+    Every client in every process (bot, dashboard, scripts) reads the same file,
+    so a token is only issued once per app key. The long-running bot also starts a
+    background thread (start_refresher) that re-issues the token before it expires,
+    so its callers never wait on the network for it.
+    """
+    def __init__(self, base_url, app_key, app_secret, path=None):
+        self.base_url = base_url
+        self.app_key = app_key
+        self.app_secret = app_secret
+        self.path = path or KIS_TOKEN_FILE
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self.lock = FileLock(self.path + ".lock")
+        self.session = get_session()
+        # Entry key: one server (real/mock) + one app key
+        digest = hashlib.sha1((app_key or "").encode()).hexdigest()[:12]
+        self.key = f"{base_url}|{digest}"
+        self._cache = {}
+        self._refresher = None
+
+    # --- File I/O (caller holds self.lock) ---
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self, data):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def _entry(self):
+        return self._load().get(self.key, {})
+
+    def _update(self, **fields):
+        data = self._load()
+        entry = data.setdefault(self.key, {})
+        entry.update(fields)
+        self._save(data)
+        self._cache = dict(entry)
+
+    # --- Network ---
+    def _issue_token(self):
+        """tokenP 호출 (caller holds self.lock). Returns (token, expires_at) or None on EGW00133."""
+        headers = {"content-type": "application/json"}
+        body = {
+            "grant_type": "client_credentials",
+            "appkey": self.app_key,
+            "appsecret": self.app_secret
+        }
+        with metrics.timer("token_refresh"):
+            res = self.session.post(self.base_url + "/oauth2/tokenP", headers=headers, data=json.dumps(body), timeout=TIMEOUT)
+        
+        # Handle Rate Limit (1 request per minute)
+        if res.status_code == 403 and "EGW00133" in res.text:
+            print("[KIS] Token rate limit hit (EGW00133).")
+            return None
+        
+        if res.status_code != 200:
+            print(f"[KIS] Token Refresh Error: {res.status_code} {res.text}")
+        res.raise_for_status()
+        
+        data = res.json()
+        expires_at = time.time() + int(data['expires_in'])
+        self._update(access_token=data['access_token'], token_expires_at=expires_at)
+        print(f"[KIS] Token refreshed. Expires in {data['expires_in']} seconds.")
+        return data['access_token'], expires_at
+
+    def _issue_approval_key(self):
+        """WebSocket 접속키 발급 (caller holds self.lock)"""
+        headers = {"content-type": "application/json; utf-8"}
+        body = {
+            "grant_type": "client_credentials",
+            "appkey": self.app_key,
+            "secretkey": self.app_secret
+        }
+        res = self.session.post(self.base_url + "/oauth2/Approval", headers=headers, data=json.dumps(body), timeout=TIMEOUT)
+        res.raise_for_status()
+        key = res.json()["approval_key"]
+        self._update(approval_key=key, approval_expires_at=time.time() + APPROVAL_KEY_TTL)
+        return key
+
+    # --- Public ---
+    def get_access_token(self):
+        """
+        Returns (access_token, usable_until).
+        Served from memory or disk; only issues a new token when none is valid.
+        """
+        entry = self._cache
+        if entry.get("token_expires_at", 0) - EXPIRY_MARGIN > time.time():
+            return entry["access_token"], entry["token_expires_at"] - EXPIRY_MARGIN
+        
+        for attempt in range(2):
+            if attempt:
+                # No valid token anywhere: wait out the 1/min limit WITHOUT the lock,
+                # so other processes can still read (or store) a token meanwhile
+                print(f"[KIS] No cached token available. Waiting {TOKEN_RETRY_WAIT} seconds...")
+                time.sleep(TOKEN_RETRY_WAIT)
+            
+            with self.lock:
+                # Another process may have refreshed while we waited for the lock / slept
+                entry = self._entry()
+                if entry.get("token_expires_at", 0) - EXPIRY_MARGIN > time.time():
+                    self._cache = entry
+                    return entry["access_token"], entry["token_expires_at"] - EXPIRY_MARGIN
+                issued = self._issue_token()
+            
+            if issued is not None:
+                token, expires_at = issued
+                return token, expires_at - EXPIRY_MARGIN
+        raise RuntimeError("KIS token rate limit (EGW00133)")
+
+    def get_approval_key(self):
+        """WebSocket approval key (memory -> disk -> network)"""
+        entry = self._cache
+        if entry.get("approval_expires_at", 0) > time.time():
+            return entry["approval_key"]
+        
+        with self.lock:
+            entry = self._entry()
+            if entry.get("approval_expires_at", 0) > time.time():
+                self._cache = entry
+                return entry["approval_key"]
+            return self._issue_approval_key()
+
+    def invalidate_approval_key(self, key):
+        """
+        Drop an approval key the server rejected, so the next get_approval_key() issues a new one.
+        Only if it is still the stored key: another client may have replaced it already.
+        """
+        with self.lock:
+            entry = self._entry()
+            if entry.get("approval_key") == key:
+                self._update(approval_expires_at=0)
+            else:
+                self._cache = entry
+
+    def refresh_if_due(self):
+        """
+        Proactively re-issue the token when it expires within REFRESH_AHEAD.
+        Returns seconds until the next check.
+        """
+        with self.lock:
+            entry = self._entry()
+            remaining = entry.get("token_expires_at", 0) - time.time()
+            if remaining > REFRESH_AHEAD:
+                self._cache = entry
+                return remaining - REFRESH_AHEAD
+            try:
+                issued = self._issue_token()
+            except Exception as e:
+                print(f"[KIS] Background token refresh failed: {e}")
+                issued = None
+        
+        # EGW00133 / network error: current token (if any) stays in use, retry shortly
+        return TOKEN_RETRY_WAIT if issued is None else max(issued[1] - time.time() - REFRESH_AHEAD, TOKEN_RETRY_WAIT)
+
+    def start_refresher(self):
+        """Start the background refresh thread (once per store)."""
+        if self._refresher is not None:
+            return
+        
+        def _loop():
+            while True:
+                try:
+                    delay = self.refresh_if_due()
+                except Exception as e:
+                    print(f"[KIS] Token refresher error: {e}")
+                    delay = TOKEN_RETRY_WAIT
+                time.sleep(min(delay, REFRESH_AHEAD))
+        
+        self._refresher = threading.Thread(target=_loop, name="kis-token-refresher", daemon=True)
+        self._refresher.start()
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_credential_store(base_url, app_key, app_secret, refresher=False):
+    """
+    Process-wide store per (server, app key), shared by KisOverseas/KisDomestic/KisWebSocket.
+    refresher=True starts the background refresh thread; only the long-running bot needs it,
+    short-lived or read-only processes (dashboard, scripts) refresh on demand.
+    """
+    with _stores_lock:
+        key = (base_url, app_key)
+        if key not in _stores:
+            _stores[key] = CredentialStore(base_url, app_key, app_secret)
+        store = _stores[key]
+    if refresher:
+        store.start_refresher()
+    return store
@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from modules.file_lock import FileLock
+
+def headline_key(news_text):
+    """
+    Cache key for a set of headlines: order and duplicates do not matter,
+    so the same RSS snapshot always maps to the same verdict.
+    """
+    lines = sorted({line.strip() for line in news_text.splitlines() if line.strip()})
+    return hashlib.sha1("\n".join(lines).encode("utf-8")).hexdigest()
+
+class VerdictCache:
+    """
+    TTL + size-bounded (LRU) cache of AI sentiment verdicts, shared by every ticker.
+    Persisted to a JSON file (file-locked, atomic replace) so verdicts survive job() restarts
+    and are shared with other processes using the same file.
+    """
+    def __init__(self, path=None, ttl=900, max_entries=256):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # key -> {"verdict": ..., "expires_at": ...}
+        self._lock = threading.RLock()
+        self._inflight = {} # key -> threading.Lock (one LLM call per headline set)
+        self.file_lock = None
+        self.stats = {"hits": 0, "misses": 0}
+        if path:
+            directory = os.path.dirname(path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+            self.file_lock = FileLock(path + ".lock")
+            with self.file_lock:
+                self._merge(self._load())
+
+    # --- File I/O (caller holds self.file_lock) ---
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(self._entries), f)
+        os.replace(tmp, self.path)
+
+    def _merge(self, data):
+        """Add unexpired on-disk entries, oldest first so LRU order follows expiry"""
+        now = time.time()
+        for key, entry in sorted(data.items(), key=lambda kv: kv[1].get("expires_at", 0)):
+            if entry.get("expires_at", 0) > now and key not in self._entries:
+                self._entries[key] = entry
+        self._evict(now)
+
+    def _evict(self, now):
+        for key in [k for k, e in self._entries.items() if e["expires_at"] <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # --- Public ---
+    def get(self, key):
+        """Cached verdict for key, or None if missing / expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires_at"] > time.time():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry["verdict"]
+            if entry:
+                del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, verdict):
+        with self._lock:
+            if not self.file_lock:
+                self._insert(key, verdict)
+                return
+            try:
+                with self.file_lock:
+                    # Keep verdicts other processes wrote meanwhile
+                    self._merge(self._load())
+                    self._insert(key, verdict)
+                    self._save()
+            except OSError as e:
+                print(f"[Gemini] Failed to persist verdict cache: {e}")
+
+    def _insert(self, key, verdict):
+        now = time.time()
+        self._entries[key] = {"verdict": verdict, "expires_at": now + self.ttl}
+        self._entries.move_to_end(key)
+        self._evict(now)
+
+    def get_or_compute(self, key, compute, cacheable=lambda verdict: True):
+        """
+        Cached verdict, or compute() it once even when several tickers break out together:
+        concurrent callers for the same key wait for the first one's result.
+        """
+        verdict = self.get(key)
+        if verdict is not None:
+            return verdict
+        with self._lock:
+            flight = self._inflight.setdefault(key, threading.Lock())
+        with flight:
+            # The caller we waited for may have filled it
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry["expires_at"] > time.time():
+                    self.stats["hits"] += 1
+                    return entry["verdict"]
+            try:
+                verdict = compute()
+                if cacheable(verdict):
+                    self.put(key, verdict)
+                return verdict
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
@@ -0,0 +1,128 @@
+"""
+Faster-than-real-time session replay.
+
+Runs run_bot.job() - target calc, streamed breakout checks, AI gate, orders and
+the session-end sell-off - on a simulated clock against a simulated broker,
+feeding a recorded tick tape (TICK_RECORD_DIR) or, when no tape exists for the
+day, ticks synthesized from that day's stored daily bar.
+
+Usage:
+    python replay.py --market US --date 20240105
+    python replay.py --market US --days 20 --json database/replay_US.json
+    python replay.py --market KR --date 20240105 --speed 600 --ai-reject
+    python replay.py --market US --days 5 --journal database/replay_journal
+"""
+import os
+import json
+import logging
+import argparse
+import time
+from modules import clock
+from modules.clock import SimClock
+from modules.bar_store import get_bar_store
+from modules.logger import logger, set_journal_dir, set_file_logging, set_console_level
+from modules.simulation import SimBroker, StubAnalyst, InlineExecutor, ReplayFeed
+from modules.tick_tape import session_bounds, tape_path, load_tape, synth_ticks
+from config import TICK_RECORD_DIR
+import run_bot
+
+DEFAULT_TAPE_DIR = TICK_RECORD_DIR or "database/ticks"
+
+class _SimTimeFilter(logging.Filter):
+    """Stamps log records with the simulated time"""
+    def filter(self, record):
+        record.created = clock.time()
+        record.msecs = round(record.created % 1 * 1000) % 1000
+        return True
+
+def universe(market):
+    return run_bot.TARGET_TICKERS_US if market == "US" else run_bot.TARGET_TICKERS_KR
+
+def session_ticks(market, date, tickers, store, tape_dir=DEFAULT_TAPE_DIR, interval=1.0):
+    """(ticks, source) for one session: the recorded tape if present, else synthesized from daily bars"""
+    start, end = session_bounds(market, date)
+    path = tape_path(tape_dir, market, date)
+    if os.path.exists(path):
+        ticks = [t for t in load_tape(path) if start <= t[0] <= end and t[1] in tickers]
+        return ticks, "tape"
+
+    ticks = []
+    for ticker in tickers:
+        bars = store.load(market, ticker)
+        day = bars[bars["date"] == int(date)]
+        if len(day):
+            ticks.extend(synth_ticks(day[0], ticker, start, end, interval))
+    ticks.sort(key=lambda t: t[0])
+    return ticks, "bars"
+
+def replay_day(market, date, store=None, tape_dir=DEFAULT_TAPE_DIR, speed=None, can_buy=True, interval=1.0):
+    """Replays one session through run_bot.job(); returns the simulated broker report"""
+    store = store or get_bar_store()
+    tickers = universe(market)
+    history = {}
+    for ticker in tickers:
+        bars = store.load(market, ticker)
+        history[ticker] = bars[bars["date"] < int(date)]
+
+    ticks, source = session_ticks(market, date, tickers, store, tape_dir, interval)
+    broker = SimBroker(market, history, ticks)
+    feed = ReplayFeed(ticks, broker)
+
+    start, _ = session_bounds(market, date)
+    sim = SimClock(start, speed)
+    previous = clock.set_clock(sim)
+    t0 = time.perf_counter()
+    try:
+        run_bot.job(kis=broker, ai=StubAnalyst(can_buy), feed=feed, executor=InlineExecutor())
+    finally:
+        clock.set_clock(previous)
+
+    report = broker.report()
+    report.update({"market": market, "date": str(date), "source": source, "ticks": len(ticks),
+                   "elapsed_sec": round(time.perf_counter() - t0, 3)})
+    return report
+
+def stored_dates(market, store, days):
+    """Most recent 'days' trading dates present in the store for the market's universe"""
+    dates = set()
+    for ticker in universe(market):
+        dates.update(int(d) for d in store.load(market, ticker)["date"])
+    return sorted(dates)[-days:]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay past sessions through run_bot.job() on a simulated clock")
+    parser.add_argument("--market", choices=["US", "KR"], default="US")
+    parser.add_argument("--date", nargs="*", help="Session dates (YYYYMMDD, exchange date)")
+    parser.add_argument("--days", type=int, default=1, help="Replay the last N stored days when --date is omitted")
+    parser.add_argument("--speed", type=float, help="x real time (default: as fast as possible)")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between synthesized ticks")
+    parser.add_argument("--tapes", default=DEFAULT_TAPE_DIR)
+    parser.add_argument("--ai-reject", action="store_true", help="AI stub rejects every buy")
+    parser.add_argument("--json", help="Write all reports to this file (diff between code changes)")
+    parser.add_argument("--verbose", action="store_true", help="Show the bot's session log")
+    parser.add_argument("--journal", help="Write the replayed sessions' event journal to this directory")
+    args = parser.parse_args()
+
+    # Keep replays out of the live trading log, and stamp records with simulated time
+    set_file_logging(False)
+    if not args.verbose:
+        set_console_level(logging.WARNING)
+    logger.addFilter(_SimTimeFilter())
+    # The live journal is never touched; replay events (incl. simulated fills) only on request
+    set_journal_dir(args.journal)
+
+    store = get_bar_store()
+    dates = args.date or stored_dates(args.market, store, args.days)
+    reports = []
+    for date in dates:
+        rep = replay_day(args.market, date, store, args.tapes, args.speed, not args.ai_reject, args.interval)
+        reports.append(rep)
+        print(f"[Replay] {args.market} {date} ({rep['source']}, {rep['ticks']} ticks, {rep['elapsed_sec']}s): "
+              f"{len(rep['trades'])} trades, P&L {rep['pnl']:+.2f}")
+        for t in rep["trades"]:
+            print(f"    {t['ticker']:<8} {t['entry_time'][11:19]} {t['entry']:.2f} -> {t['exit']:.2f} ({t['return']:+.2%})")
+
+    print(f"[Replay] Total P&L {sum(r['pnl'] for r in reports):+.2f} over {len(reports)} sessions")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
@@ -1,13 +1,28 @@
+import os
 import time
+import asyncio
+import threading
 import datetime
 import schedule
+import numpy as np
 import sys
 from modules.kis_api import KisOverseas
 from modules.kis_domestic import KisDomestic
+from modules.kis_async import AsyncKisOverseas, AsyncKisDomestic
+from modules.kis_websocket import KisWebSocket
+from modules.breakout_engine import BreakoutEngine
 from modules.gemini_analyst import GeminiAnalyst
-from modules.logger import logger
-from strategies.technical import calculate_ma, check_trend
-from strategies.volatility_breakout import calculate_target_price
+from modules.sentiment_prefetcher import SentimentPrefetcher
+from modules.http_pool import prewarm
+from modules.token_store import get_credential_store
+from modules.logger import logger, log_event
+from modules.tick_tape import TickRecorder
+from modules import clock
+from modules import metrics
+from strategies.technical import SMA
+from strategies.universe import to_bar_matrix, calculate_universe_targets, check_trend_universe
+from config import KIS_BASE_URL, KIS_APP_KEY, KIS_APP_SECRET, KIS_STREAMING, TICK_RECORD_DIR, AI_READY_TIMEOUT
+from config import METRICS_PORT, METRICS_FILE, METRICS_INTERVAL, METRICS_DIR
 
 # Configuration
 # "Universe" of Hot ETFs/Stocks to monitor
@@ -39,12 +54,14 @@ TARGET_TICKERS_KR = [
 
 QTY = 1 # Quantity per trade (Adjust based on portfolio size!)
 K_VALUE = 0.5
+STREAM_STALE_SEC = 3 # Fall back to REST polling for a ticker after this long without a streamed tick
+SELLOFF_RETRY_SEC = 1800 # Keep retrying a rejected / failed session-end sell for this long
 
 def get_market_status():
     """
-    Returns 'US', 'KR', or 'CLOSED' based on current KST time.
+    Returns 'US', 'KR', or 'CLOSED' based on current KST time (modules.clock, simulated in replays).
     """
-    now = datetime.datetime.now()
+    now = clock.now()
     t = int(now.strftime("%H%M"))
     
     # US Market: 23:30 ~ 06:00
@@ -57,132 +74,200 @@ def get_market_status():
         
     return 'CLOSED'
 
-def job():
-    market = get_market_status()
-    
-    if market == 'CLOSED':
-        logger.info("Market is closed. Sleeping.")
-        return
-
-    # Select Market Context
-    if market == 'US':
-        logger.info(f"🇺🇸 Starting US Trading Session for {TARGET_TICKERS_US}")
-        kis = KisOverseas()
-        tickers = TARGET_TICKERS_US
-    else:
-        logger.info(f"🇰🇷 Starting KR Trading Session for {TARGET_TICKERS_KR}")
-        kis = KisDomestic()
-        tickers = TARGET_TICKERS_KR
+async def init_targets(kis_async, tickers, market="US"):
+    """
+    Session setup for the whole universe: daily bars (local bar store + one delta
+    request per ticker) and current prices are fetched concurrently, then MA20 / range / target are computed for every
+    ticker in one vectorized pass (strategies.universe).
+    Returns monitoring_targets {ticker: {'target', 'status', 'buys'}}.
+    """
+    logger.info(f"Analyzing {tickers}...")
+    ohlc_list, prices = await asyncio.gather(
+        asyncio.gather(*(kis_async.get_daily_ohlc_cached(t) for t in tickers)),
+        kis_async.get_current_prices(tickers),
+    )
     
-    ai = GeminiAnalyst()
+    bars = to_bar_matrix(ohlc_list)
+    ind = calculate_universe_targets(bars, window=20, k=K_VALUE)
+    bull = check_trend_universe([prices[t] for t in tickers], ind["ma"])
     
-    # Dictionary to store monitoring targets
     monitoring_targets = {}
-
-    # 1. Initialize Targets for each ticker
-    for ticker in tickers:
-        logger.info(f"Analyzing {ticker}...")
-        
-        # A. Trend Check (20MA)
-        ohlc = kis.get_daily_ohlc(ticker)
-        if not ohlc:
+    for i, ticker in enumerate(tickers):
+        if not ohlc_list[i]:
             logger.error(f"[{ticker}] Failed to get OHLC. Skipping.")
             continue
-
-        closes = [float(x['clos']) for x in ohlc]
-        closes.reverse() 
-        
-        ma20 = calculate_ma(closes, 20)
-        current_price = kis.get_current_price(ticker)
-        
+        current_price = prices[ticker]
         if not current_price:
-             logger.error(f"[{ticker}] Failed to get Current Price. Skipping.")
-             continue
-
+            logger.error(f"[{ticker}] Failed to get Current Price. Skipping.")
+            continue
+        
+        ma20 = None if np.isnan(ind["ma"][i]) else float(ind["ma"][i])
+        open_price = float(ind['open'][i])
         logger.info(f"[{ticker}] Current: {current_price}, MA20: {ma20}")
         
-        if not check_trend(current_price, ma20):
+        if not bull[i]:
             logger.info(f"[{ticker}] Bear Market (Price < 20MA). Skipping.")
+            log_event("target", market=market, ticker=ticker, price=current_price, ma=ma20, open=open_price, target=None, trend="bear")
             continue
-
-        # B. Calculate Target Price (Common Logic)
-        # Note: KR API OHLC structure is adapted to match US one in kis_domestic.py
-        # Need Open price for today.
         
-        # Get Quote/Current for Open Price
-        # For simplicity, we use OHLC[0] if available or fetch current quote
-        # OHLC[0] from API is today's data usually in KIS, but let's be safe.
-        today_open = float(ohlc[0]['open']) # API returns latest first usually?
-        # Actually kis_domestic returns list daily daily.
-        # Let's rely on OHLC data we just got.
-        # KIS Domestic OHLC[0] is most recent day.
+        # Target = OHLC[0] open + OHLC[0] range * K (same as calculate_target_price)
+        target_price = float(ind["target"][i])
+        logger.info(f"[{ticker}] Bull Market! Target Price: {target_price} (Open: {open_price})")
+        log_event("target", market=market, ticker=ticker, price=current_price, ma=ma20, open=open_price, target=target_price, trend="bull")
         
-        target_price = calculate_target_price(today_open, ohlc, K_VALUE)
-        logger.info(f"[{ticker}] Bull Market! Target Price: {target_price} (Open: {today_open})")
+        # Streaming MA20 (warm-started from the same closes, oldest first) so the
+        # trend filter can be re-checked against every tick
+        closes = bars["close"][i]
+        trend = SMA(20).warm(closes[~np.isnan(closes)][:20][::-1])
         
         monitoring_targets[ticker] = {
             'target': target_price,
-            'status': 'monitoring',  # monitoring, bought
+            'trend': trend,
+            'status': 'monitoring',  # monitoring, ordering, bought
             'buys': 0
         }
+    return monitoring_targets
 
-    if not monitoring_targets:
-        logger.info(f"[{market}] No targets found for today. Sleeping.")
-        return
-
-    logger.info(f"[{market}] Watch List: {list(monitoring_targets.keys())}")
-    
-    # 2. Watch Loop
+async def watch_loop(market, kis_async, engine, streaming):
+    """
+    Watch loop. Breakout checks run in engine.on_tick, driven by KisWebSocket ticks
+    when streaming; REST quotes are polled (concurrently) only for tickers whose
+    stream has been silent for STREAM_STALE_SEC, or for all of them without a stream.
+    """
     while True:
         # Check if market closed
         current_market = get_market_status()
         if current_market != market:
             logger.info(f"[{market}] Market Closed. Ending Session.")
             break
-            
-        for ticker, data in monitoring_targets.items():
-            if data['status'] == 'bought':
-                continue
-                
-            current_price = kis.get_current_price(ticker)
-            target_price = data['target']
-            
-            if current_price and current_price >= target_price:
-                logger.info(f"[{ticker}] Breakout Detected! ({current_price} >= {target_price})")
-                
-                logger.info("Checking AI Sentiment...")
-                news = ai.fetch_news() # TODO: Improve AI news source for KR stocks later
-                sentiment = ai.check_market_sentiment(news)
-                
-                logger.info(f"AI Result: {sentiment}")
-                
-                if sentiment.get('can_buy', False):
-                    logger.info(f"[{ticker}] AI Approved. Buying...")
-                    res = kis.buy_market_order(ticker, QTY)
-                    # Result checking
-                    is_success = False
-                    if res:
-                        if market == 'US' and res.get('rt_cd') == '0': is_success = True
-                        if market == 'KR' and res.get('rt_cd') == '0': is_success = True
-                        
-                    if is_success:
-                        data['status'] = 'bought'
-                        data['buys'] += 1
-                        logger.info(f"[{ticker}] Buy Success!")
-                    else:
-                        logger.error(f"[{ticker}] Buy Failed: {res}")
-                else:
-                    logger.info(f"[{ticker}] AI Rejected buying due to risk.")
-                    time.sleep(10) 
-
-        time.sleep(0.1)
+        
+        pending = engine.stale_tickers(STREAM_STALE_SEC) if streaming else engine.pending_tickers()
+        if pending:
+            prices = await kis_async.get_current_prices(pending)
+            for ticker, price in prices.items():
+                engine.on_tick(ticker, price, source="rest")
+
+        await clock.asleep(0.1 if pending else 0.5)
+
+def start_stream(market, tickers, engine):
+    """
+    Run KisWebSocket on its own thread/event loop, feeding ticks into the engine.
+    With TICK_RECORD_DIR set, every tick is also appended to the day's tick tape (replay.py).
+    """
+    recorder = TickRecorder(TICK_RECORD_DIR, market) if TICK_RECORD_DIR else None
+    
+    async def on_tick(ticker, price):
+        engine.on_tick(ticker, price, source="ws")
+        if recorder:
+            recorder.record(ticker, price)
+    
+    ws = KisWebSocket(tickers, on_tick, market=market)
+    threading.Thread(target=ws.start, name="kis-ws", daemon=True).start()
+    return ws
+
+def sell_off(market, kis, tickers):
+    """
+    Session-end sell-off. Leveraged positions must not be held overnight, so a sell
+    that is not accepted (network error, KIS error) is retried with back-off until it
+    is, for up to SELLOFF_RETRY_SEC. Returns the tickers still held.
+    """
+    pending = list(tickers)
+    deadline = clock.time() + SELLOFF_RETRY_SEC
+    delay = 1
+    while pending:
+        for ticker in list(pending):
+            logger.info(f"[{ticker}] Selling Market Order...")
+            res = kis.sell_market_order(ticker, QTY)
+            accepted = bool(res and res.get('rt_cd') == '0')
+            log_event("order", market=market, ticker=ticker, side="sell", qty=QTY,
+                      accepted=accepted, latency_ms=None, response=res)
+            if accepted:
+                pending.remove(ticker)
+            else:
+                logger.error(f"[{ticker}] Sell Failed: {res}")
+        if not pending:
+            break
+        if clock.time() + delay > deadline:
+            logger.critical(f"[{market}] Sell-off incomplete after {SELLOFF_RETRY_SEC}s. STILL HOLDING {pending} - sell manually!")
+            break
+        logger.warning(f"[{market}] Retrying sell for {pending} in {delay}s...")
+        clock.sleep(delay)
+        delay = min(delay * 2, 30)
+    return pending
+
+def job(kis=None, ai=None, feed=None, executor=None):
+    """
+    One trading session. Live by default; replay.py injects a simulated broker (kis),
+    an AI stub (ai), a recorded tick feed (same signature as start_stream) and an
+    inline order executor.
+    """
+    market = get_market_status()
+    
+    if market == 'CLOSED':
+        logger.info("Market is closed. Sleeping.")
+        return
+
+    # Stage latency histograms cover one session
+    metrics.reset()
+    log_event("session_start", market=market, tickers=TARGET_TICKERS_US if market == 'US' else TARGET_TICKERS_KR)
+
+    # Select Market Context
+    if market == 'US':
+        logger.info(f"🇺🇸 Starting US Trading Session for {TARGET_TICKERS_US}")
+        kis = kis or KisOverseas()
+        tickers = TARGET_TICKERS_US
+    else:
+        logger.info(f"🇰🇷 Starting KR Trading Session for {TARGET_TICKERS_KR}")
+        kis = kis or KisDomestic()
+        tickers = TARGET_TICKERS_KR
+    
+    # AI sentiment (market's own news sources) is refreshed in the background from now on;
+    # the first verdict overlaps target setup
+    sentiment = SentimentPrefetcher(ai or GeminiAnalyst(), market, tickers).start()
+    kis_async = AsyncKisOverseas(kis) if market == 'US' else AsyncKisDomestic(kis)
+    
+    # 1. Initialize Targets for the whole universe (parallel fetch + vectorized indicators)
+    monitoring_targets = asyncio.run(init_targets(kis_async, tickers, market))
+
+    if not monitoring_targets:
+        logger.info(f"[{market}] No targets found for today. Sleeping.")
+        kis_async.close()
+        sentiment.stop()
+        log_event("session_end", market=market, latency=None, stages=metrics.summary())
+        return
+
+    logger.info(f"[{market}] Watch List: {list(monitoring_targets.keys())}")
+    if not sentiment.wait_ready(AI_READY_TIMEOUT):
+        logger.info(f"[{market}] AI verdict not ready yet; breakouts wait for it (no buys until then).")
+    
+    # 2. Watch Loop (streamed ticks drive breakouts, REST polling as fallback)
+    engine = BreakoutEngine(market, kis, sentiment, monitoring_targets, QTY, executor=executor)
+    streaming = feed is not None or KIS_STREAMING
+    ws = (feed or start_stream)(market, list(monitoring_targets.keys()), engine) if streaming else None
+    
+    try:
+        asyncio.run(watch_loop(market, kis_async, engine, streaming))
+    finally:
+        kis_async.close()
+        if ws:
+            ws.stop()
+        engine.shutdown()
+        sentiment.stop()
+    
+    summary = engine.latency_summary()
+    if summary:
+        logger.info(f"[{market}] Tick-to-order latency: {summary}")
         
     # 3. Market Close Sell-off
     logger.info(f"[{market}] Session End. Selling All Holdings.")
-    for ticker, data in monitoring_targets.items():
-        if data['status'] == 'bought':
-            logger.info(f"[{ticker}] Selling Market Order...")
-            kis.sell_market_order(ticker, QTY)
+    sell_off(market, kis, [t for t, d in monitoring_targets.items() if d['status'] == 'bought'])
+
+    # 4. Per-stage latency (p50 / p99) for this session
+    for stage, stats in metrics.summary().items():
+        logger.info(f"[{market}] Stage {stage}: {stats}")
+    if feed is None and METRICS_DIR:
+        metrics.write_file(os.path.join(METRICS_DIR, f"{market}_{clock.now():%Y%m%d}.json"))
+    log_event("session_end", market=market, latency=summary, stages=metrics.summary())
 
 if __name__ == "__main__":
     logger.info("=== Global ETF Sniper Bot Started ===")
@@ -200,12 +285,23 @@ if __name__ == "__main__":
         
     schedule.every(1).minutes.do(heartbeat)
     
+    # Keep the shared access token fresh in the background (the dashboard and scripts don't)
+    get_credential_store(KIS_BASE_URL, KIS_APP_KEY, KIS_APP_SECRET, refresher=True)
+    
+    # Stage latency export (Prometheus endpoint and/or textfile)
+    if METRICS_PORT:
+        metrics.start_http_server(METRICS_PORT)
+    if METRICS_FILE:
+        metrics.start_file_exporter(METRICS_FILE, METRICS_INTERVAL)
+    
     # Startup Check
     ctx = get_market_status()
     if ctx != 'CLOSED':
         logger.info(f"Bot started during {ctx} Trading Hours. Launching job immediately.")
         job()
 
+    last_prewarm = None
+
     while True:
         schedule.run_pending()
         
@@ -215,6 +311,11 @@ if __name__ == "__main__":
         now = datetime.datetime.now()
         t = int(now.strftime("%H%M"))
         
+        # Pre-warm the KIS connection pool 1 minute before each open (08:59 / 23:29)
+        if t in (859, 2329) and last_prewarm != t:
+            prewarm(KIS_BASE_URL)
+            last_prewarm = t
+        
         # Trigger at 09:00 for KR
         if t == 900:
             job()
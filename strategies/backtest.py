@@ -0,0 +1,148 @@
+import numpy as np
+
+# Vectorized backtest of the live strategy (run_bot): VBO entry gated by the MA trend filter,
+# exit at the session close. All arrays are (tickers x days), oldest day first, NaN = no bar.
+
+def load_universe(store, market, tickers):
+    """
+    Align stored daily bars (modules.bar_store) on the union of trading dates.
+    Returns (dates, bars) with bars = {'open','high','low','close'} 2D arrays.
+    """
+    stored = [store.load(market, t) for t in tickers]
+    dates = np.unique(np.concatenate([b["date"] for b in stored])) if stored else np.empty(0, dtype="i4")
+    bars = {key: np.full((len(tickers), len(dates)), np.nan) for key in ("open", "high", "low", "close")}
+    for i, b in enumerate(stored):
+        if len(b) == 0:
+            continue
+        cols = np.searchsorted(dates, b["date"])
+        for key in bars:
+            bars[key][i, cols] = b[key]
+    return dates, bars
+
+def rolling_mean(x, window):
+    """Trailing mean along axis 1 (NaN until 'window' valid values, NaN-aware via cumulative sums)"""
+    valid = ~np.isnan(x)
+    csum = np.cumsum(np.where(valid, x, 0.0), axis=1)
+    ccnt = np.cumsum(valid, axis=1)
+    csum = np.concatenate([np.zeros((x.shape[0], 1)), csum], axis=1)
+    ccnt = np.concatenate([np.zeros((x.shape[0], 1)), ccnt], axis=1)
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        s = csum[:, window:] - csum[:, :-window]
+        n = ccnt[:, window:] - ccnt[:, :-window]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:, window - 1:] = np.where(n == window, s / window, np.nan)
+    return out
+
+def _shift(x, n=1):
+    """Previous day's value along axis 1"""
+    out = np.full(x.shape, np.nan)
+    out[:, n:] = x[:, :-n]
+    return out
+
+def entry_levels(bars, k=0.5, ma_window=20):
+    """
+    Per ticker and day t, the levels run_bot uses for session t. At session start the
+    latest daily bar KIS returns (ohlc[0]) is the previous session, t-1:
+      ma      : MA(ma_window) of closes up to t-1       (init_targets trend filter, checked with the open)
+      target  : open[t-1] + (high[t-1] - low[t-1]) * k  (calculate_target_price with today_open = ohlc[0]['open'])
+      tick_ma : per-tick trend level. BreakoutEngine checks price > SMA.peek_last(price), the MA with
+                close[t-1] replaced by the live price, i.e. price > mean of the ma_window - 1 closes up to t-2
+    """
+    o, h, l, c = bars["open"], bars["high"], bars["low"], bars["close"]
+    if ma_window > 1:
+        tick_ma = _shift(rolling_mean(c, ma_window - 1), 2)
+    else:
+        tick_ma = np.full(c.shape, np.inf) # price > price never holds
+    return {
+        "ma": _shift(rolling_mean(c, ma_window)),
+        "target": _shift(o) + (_shift(h) - _shift(l)) * k,
+        "tick_ma": tick_ma,
+    }
+
+def run_backtest(bars, k=0.5, ma_window=20, stop_loss=None, fee=0.0, dates=None, tickers=None):
+    """
+    Per ticker and day t (same rules as run_bot.init_targets + BreakoutEngine.on_tick), with
+    ma / target / tick_ma from entry_levels:
+      trend  : open[t] > ma (the session-start quote is the open)
+      entry  : the first price with price >= target and price > tick_ma; reached if high[t]
+               gets there, filled at max(open[t], target, tick_ma)
+      exit   : close[t] (session-end sell-off), or entry * (1 - stop_loss) if low[t] touches it
+    fee: round-trip cost as a fraction of the entry price.
+    Capital is split equally across the universe; each ticker slot trades at most once a day.
+    """
+    o, h, l, c = bars["open"], bars["high"], bars["low"], bars["close"]
+    levels = entry_levels(bars, k, ma_window)
+    ma, target, tick_ma = levels["ma"], levels["target"], levels["tick_ma"]
+
+    with np.errstate(invalid="ignore"):
+        entered = (o > ma) & (h >= target) & (h > tick_ma) & ~np.isnan(c)
+        fill = np.maximum(np.maximum(o, target), tick_ma)
+        exit_px = c
+        if stop_loss:
+            stop_px = fill * (1 - stop_loss)
+            exit_px = np.where(l <= stop_px, stop_px, c)
+        trade_ret = np.where(entered, exit_px / fill - 1 - fee, 0.0)
+
+    n_tickers, n_days = c.shape
+    daily = trade_ret.sum(axis=0) / max(n_tickers, 1)
+    equity = np.cumprod(1 + daily)
+    peak = np.maximum.accumulate(equity) if n_days else equity
+    drawdown = equity / peak - 1 if n_days else equity
+
+    rets = trade_ret[entered]
+    has_bar = ~np.isnan(c)
+    years = n_days / 252 if n_days else 0
+    total = float(equity[-1] - 1) if n_days else 0.0
+    std = daily.std()
+
+    report = {
+        "trades": int(entered.sum()),
+        "win_rate": float((rets > 0).mean()) if rets.size else 0.0,
+        "avg_trade_return": float(rets.mean()) if rets.size else 0.0,
+        "total_return": total,
+        "cagr": float((1 + total) ** (1 / years) - 1) if years and total > -1 else 0.0,
+        "mdd": float(drawdown.min()) if n_days else 0.0,
+        "sharpe": float(daily.mean() / std * np.sqrt(252)) if std > 0 else 0.0,
+        # Share of ticker-days with a position / share of days with any position
+        "exposure": float(entered.sum() / has_bar.sum()) if has_bar.any() else 0.0,
+        "days_in_market": float(entered.any(axis=0).mean()) if n_days else 0.0,
+        "equity": equity,
+        "per_ticker_return": np.prod(1 + trade_ret, axis=1) - 1,
+    }
+
+    if dates is not None and tickers is not None:
+        ti, di = np.nonzero(entered)
+        report["trade_log"] = [
+            {"date": int(dates[d]), "ticker": tickers[t], "entry": float(fill[t, d]),
+             "exit": float(exit_px[t, d]), "return": float(trade_ret[t, d])}
+            for t, d in zip(ti, di)
+        ]
+    return report
+
+if __name__ == "__main__":
+    # python -m strategies.backtest --market US  (uses bars from backfill.py)
+    import argparse
+    import time
+    from modules.bar_store import get_bar_store
+    from run_bot import TARGET_TICKERS_US, TARGET_TICKERS_KR, K_VALUE
+
+    parser = argparse.ArgumentParser(description="Backtest VBO + MA filter on the local bar store")
+    parser.add_argument("--market", choices=["US", "KR"], default="US")
+    parser.add_argument("--k", type=float, default=K_VALUE)
+    parser.add_argument("--ma", type=int, default=20)
+    parser.add_argument("--stop", type=float, default=None)
+    parser.add_argument("--fee", type=float, default=0.0)
+    args = parser.parse_args()
+
+    tickers = TARGET_TICKERS_US if args.market == "US" else TARGET_TICKERS_KR
+    dates, bars = load_universe(get_bar_store(), args.market, tickers)
+    t0 = time.perf_counter()
+    rep = run_backtest(bars, args.k, args.ma, args.stop, args.fee)
+    elapsed = time.perf_counter() - t0
+
+    print(f"{args.market} {len(tickers)} tickers x {len(dates)} days ({elapsed * 1000:.1f} ms)")
+    for key in ("trades", "win_rate", "avg_trade_return", "total_return", "cagr", "mdd", "sharpe", "exposure", "days_in_market"):
+        print(f"  {key:<18} {rep[key]:.4f}" if isinstance(rep[key], float) else f"  {key:<18} {rep[key]}")
+    for t, r in zip(tickers, rep["per_ticker_return"]):
+        print(f"  {t:<8} {r:+.2%}")
@@ -1,3 +1,4 @@
+import math
 import pandas as pd
 
 def calculate_ma(prices, window=20):
@@ -20,3 +21,89 @@ def check_trend(current_price, ma_value):
     if ma_value is None:
         return False
     return current_price > ma_value
+
+
+# --- Streaming (incremental) indicators ---
+# O(1) per update, fixed-size preallocated state (no allocation per tick/bar).
+# Reproduces the pandas reference named in its docstring bit-for-bit, so a
+# warm-started object agrees with calculate_ma-style batch code.
+# run_bot warms one SMA(20) per ticker; BreakoutEngine re-checks the trend on every tick.
+
+class SMA:
+    """
+    Simple Moving Average.
+    Reference: pd.Series(x).rolling(window).mean()
+    Uses the same Kahan-compensated add/remove sums as pandas' roll_mean.
+    """
+    def __init__(self, window=20):
+        self.window = window
+        self._buf = [0.0] * window
+        self._pos = 0
+        self._count = 0 # samples seen (capped at window)
+        self._nobs = 0
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._neg = 0
+        self._same = 0
+        self._prev = float("nan")
+        self.value = None
+
+    def warm(self, history):
+        """Warm start from historical values (oldest first)"""
+        for x in history:
+            self.update(x)
+        return self
+
+    def update(self, x):
+        if self._count == self.window:
+            old = self._buf[self._pos]
+            if old == old: # not NaN
+                self._nobs -= 1
+                y = -old - self._comp_remove
+                t = self._sum + y
+                self._comp_remove = t - self._sum - y
+                self._sum = t
+                if math.copysign(1.0, old) < 0:
+                    self._neg -= 1
+        else:
+            self._count += 1
+            if self._count == 1:
+                self._prev = x
+
+        self._buf[self._pos] = x
+        self._pos = (self._pos + 1) % self.window
+
+        if x == x:
+            self._nobs += 1
+            y = x - self._comp_add
+            t = self._sum + y
+            self._comp_add = t - self._sum - y
+            self._sum = t
+            if math.copysign(1.0, x) < 0:
+                self._neg += 1
+            self._same = self._same + 1 if x == self._prev else 1
+            self._prev = x
+
+        if self._count < self.window or self._nobs < self.window:
+            self.value = None
+        elif self._same >= self._nobs:
+            self.value = self._prev
+        else:
+            result = self._sum / self._nobs
+            if self._neg == 0 and result < 0:
+                result = 0.0
+            elif self._neg == self._nobs and result > 0:
+                result = 0.0
+            self.value = result
+        return self.value
+
+    def peek_last(self, x):
+        """
+        MA with the newest sample replaced by x, without changing state.
+        Lets the trend filter follow a still-forming bar on every tick.
+        """
+        if self._count < self.window:
+            return None
+        newest = self._buf[(self._pos - 1) % self.window]
+        return (self._sum - newest + x) / self.window
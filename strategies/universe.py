@@ -0,0 +1,51 @@
+import numpy as np
+
+def to_bar_matrix(ohlc_list, length=None):
+    """
+    Stack per-ticker KIS daily bars into 2D arrays (tickers x days).
+    ohlc_list: list of KIS 'output2'-style lists (latest first), None for a failed fetch
+    Column 0 is the most recent bar, same order as the API. Missing days are NaN.
+    Returns dict with 'open', 'high', 'low', 'close' arrays.
+    """
+    if length is None:
+        length = max((len(x) for x in ohlc_list if x), default=0)
+
+    bars = {key: np.full((len(ohlc_list), length), np.nan) for key in ("open", "high", "low", "close")}
+    for i, ohlc in enumerate(ohlc_list):
+        if not ohlc:
+            continue
+        rows = ohlc[:length]
+        n = len(rows)
+        # KIS returns numbers as strings; NumPy parses them on assignment
+        bars["open"][i, :n] = [x['open'] for x in rows]
+        bars["high"][i, :n] = [x['high'] for x in rows]
+        bars["low"][i, :n] = [x['low'] for x in rows]
+        bars["close"][i, :n] = [x['clos'] for x in rows]
+    return bars
+
+def calculate_universe_targets(bars, window=20, k=0.5):
+    """
+    Session setup for the whole universe in one pass.
+    Same rules as calculate_ma / calculate_target_price, per row:
+      ma     = mean of the latest 'window' closes (NaN if fewer bars)
+      range  = high[0] - low[0]
+      target = open[0] + range * k
+    Returns dict of 1D arrays: 'open', 'ma', 'range', 'target'.
+    """
+    closes = bars["close"][:, :window]
+    ma = closes.mean(axis=1) if closes.shape[1] == window else np.full(closes.shape[0], np.nan)
+
+    today_open = bars["open"][:, 0]
+    rng = bars["high"][:, 0] - bars["low"][:, 0]
+    return {
+        "open": today_open,
+        "ma": ma, # NaN propagates for tickers with < window bars
+        "range": rng,
+        "target": today_open + rng * k,
+    }
+
+def check_trend_universe(prices, ma):
+    """Vectorized check_trend: True where price > MA (False for NaN MA / missing price)"""
+    prices = np.asarray(prices, dtype=float)
+    with np.errstate(invalid="ignore"):
+        return prices > ma
@@ -0,0 +1,123 @@
+"""
+Parallel parameter sweep for the VBO + MA strategy (strategies/backtest.py).
+
+Spreads a grid (or random sample) of K, MA window, stop-loss exit and
+universe subsets over a process pool. The bar matrices are written once to a
+.npy file and every worker maps it read-only, so nothing large is pickled per
+task and throughput scales with the number of cores.
+
+Usage:
+    python sweep.py --market US
+    python sweep.py --market US --k 0.3 0.4 0.5 0.6 --ma 5 10 20 60 --stop 0 0.02 0.05
+    python sweep.py --market KR --samples 500 --subset-size 3 --subsets 50 --workers 16
+"""
+import os
+import random
+import argparse
+import datetime
+import itertools
+import tempfile
+import multiprocessing
+from math import comb
+import numpy as np
+from strategies.backtest import load_universe, run_backtest
+
+FIELDS = ("open", "high", "low", "close")
+METRICS = ("sharpe", "cagr", "calmar", "total_return", "win_rate")
+
+# Per-worker read-only view of the shared bars: shape (fields, tickers, days)
+_BARS = None
+
+def share_bars(bars, path):
+    """Writes the bar matrices as one .npy so workers can memory-map them"""
+    np.save(path, np.stack([bars[f] for f in FIELDS]))
+    return path
+
+def _init_worker(path):
+    global _BARS
+    _BARS = np.load(path, mmap_mode="r")
+
+def _evaluate(params):
+    rows = list(params["subset"])
+    bars = {f: np.asarray(_BARS[i, rows]) for i, f in enumerate(FIELDS)}
+    rep = run_backtest(bars, k=params["k"], ma_window=params["ma"],
+                       stop_loss=params["stop"] or None, fee=params["fee"])
+    result = {key: rep[key] for key in ("trades", "win_rate", "total_return", "cagr", "mdd", "sharpe", "exposure")}
+    result["calmar"] = rep["cagr"] / abs(rep["mdd"]) if rep["mdd"] < 0 else 0.0
+    return {**params, **result}
+
+def build_tasks(n_tickers, ks, mas, stops, fee=0.0, subset_size=None, n_subsets=0, samples=None, seed=0):
+    """
+    Parameter sets to evaluate. The full universe is always included;
+    subset_size/n_subsets add random ticker combinations of that size.
+    samples: random search over the grid instead of the full product.
+    """
+    rng = random.Random(seed)
+    subsets = [tuple(range(n_tickers))]
+    if subset_size and subset_size < n_tickers and n_subsets:
+        combos = set()
+        while len(combos) < n_subsets and len(combos) < comb(n_tickers, subset_size):
+            combos.add(tuple(sorted(rng.sample(range(n_tickers), subset_size))))
+        subsets += sorted(combos)
+
+    grid = list(itertools.product(ks, mas, stops, subsets))
+    if samples and samples < len(grid):
+        grid = rng.sample(grid, samples)
+    return [{"k": k, "ma": ma, "stop": stop, "fee": fee, "subset": subset} for k, ma, stop, subset in grid]
+
+def sweep(bars, tasks, workers=None, metric="sharpe"):
+    """Evaluates every task on a process pool and returns results ranked by 'metric' (best first)"""
+    workers = workers or os.cpu_count() or 1
+    fd, path = tempfile.mkstemp(prefix="sweep_bars_", suffix=".npy")
+    os.close(fd)
+    try:
+        share_bars(bars, path)
+        # Several tasks per IPC round trip; small enough to keep every core busy at the end
+        chunksize = max(1, len(tasks) // (workers * 8))
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(path,)) as pool:
+            results = list(pool.imap_unordered(_evaluate, tasks, chunksize=chunksize))
+    finally:
+        os.remove(path)
+    return sorted(results, key=lambda r: r[metric], reverse=True)
+
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+    from modules.bar_store import get_bar_store
+    from run_bot import TARGET_TICKERS_US, TARGET_TICKERS_KR
+
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep over the local bar store")
+    parser.add_argument("--market", choices=["US", "KR"], default="US")
+    parser.add_argument("--tickers", nargs="*")
+    parser.add_argument("--k", type=float, nargs="+", default=[round(0.1 * i, 1) for i in range(1, 11)])
+    parser.add_argument("--ma", type=int, nargs="+", default=[5, 10, 20, 40, 60, 120])
+    parser.add_argument("--stop", type=float, nargs="+", default=[0, 0.02, 0.03, 0.05], help="0 = exit at close only")
+    parser.add_argument("--fee", type=float, default=0.0)
+    parser.add_argument("--subset-size", type=int)
+    parser.add_argument("--subsets", type=int, default=0)
+    parser.add_argument("--samples", type=int, help="Random search: evaluate this many grid points")
+    parser.add_argument("--metric", choices=METRICS, default="sharpe")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    tickers = args.tickers or (TARGET_TICKERS_US if args.market == "US" else TARGET_TICKERS_KR)
+    dates, bars = load_universe(get_bar_store(), args.market, tickers)
+    tasks = build_tasks(len(tickers), args.k, args.ma, args.stop, args.fee,
+                        args.subset_size, args.subsets, args.samples)
+
+    print(f"[Sweep] {args.market} {len(tickers)} tickers x {len(dates)} days, {len(tasks)} runs")
+    t0 = time.perf_counter()
+    results = sweep(bars, tasks, args.workers, args.metric)
+    elapsed = time.perf_counter() - t0
+    print(f"[Sweep] Done in {elapsed:.1f}s ({len(tasks) / elapsed:.0f} runs/s)")
+
+    df = pd.DataFrame(results)
+    df["subset"] = df["subset"].apply(lambda s: " ".join(tickers[i] for i in s) if len(s) < len(tickers) else "ALL")
+    out = os.path.join("database", f"sweep_{args.market}_{datetime.datetime.now().strftime('%Y%m%d')}.csv")
+    os.makedirs("database", exist_ok=True)
+    df.to_csv(out, index=False)
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(df.head(args.top).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print(f"[Sweep] Full results: {out}")
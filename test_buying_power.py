@@ -1,5 +1,4 @@
 from modules.kis_api import KisOverseas
-import requests
 import json
 
 kis = KisOverseas()
@@ -26,7 +25,8 @@ paths = [
 for p in paths:
     print(f"\n--- Testing Path: {p} ---")
     try:
-        res = requests.get(kis.url + p, headers=headers, params=params)
+        kis.limiter.wait("account") # host-wide limiter shared with the bot
+        res = kis.session.get(kis.url + p, headers=headers, params=params)
         print("Status:", res.status_code)
         if res.status_code != 404:
             print("Response:", res.text[:200])
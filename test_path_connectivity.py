@@ -1,4 +1,4 @@
-from modules.kis_api import KisOverseas
+from modules.kis_api import KisOverseas, RateLimiter
 import requests
 import json
 import os
@@ -21,7 +21,9 @@ paths = [
 ]
 
 headers = {"content-type": "application/json"}
+limiter = RateLimiter() # host-wide limiter shared with the bot
 for p in paths:
+    limiter.wait("account")
     url = "https://openapi.koreainvestment.com:9443" + p
     res = requests.get(url, headers=headers)
     print(f"Path: {p} -> Status: {res.status_code}")
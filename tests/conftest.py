@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+# Tests import the bot's modules the same way run_bot.py does (repo root on the path)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(autouse=True, scope="session")
+def _quiet_bot_logs():
+    """Keep test runs out of the trading log and the live event journal"""
+    import logging
+    from modules.logger import set_file_logging, set_console_level, set_journal_dir
+    set_file_logging(False)
+    set_console_level(logging.WARNING)
+    set_journal_dir(None)
+    yield
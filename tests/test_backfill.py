@@ -0,0 +1,73 @@
+import datetime
+import numpy as np
+from modules.bar_store import BarStore
+from backfill import Backfill
+
+PAGE = 30
+
+def weekdays(n, start=datetime.date(2023, 1, 2)):
+    out, day = [], start
+    while len(out) < n:
+        if day.weekday() < 5:
+            out.append(int(day.strftime("%Y%m%d")))
+        day += datetime.timedelta(days=1)
+    return out
+
+class FakeKis:
+    """get_daily_ohlc paging like KIS: up to PAGE rows ending at bymd (inclusive), latest first"""
+    def __init__(self, dates, scale=1.0):
+        self.dates = dates
+        self.scale = scale
+        self.calls = []
+        self.revise_after = None # switch to a new adjusted-price basis after this many calls
+
+    def get_daily_ohlc(self, ticker, period="D", bymd=None):
+        self.calls.append(bymd)
+        if self.revise_after is not None and len(self.calls) > self.revise_after:
+            self.scale = 0.5
+        days = [d for d in self.dates if d <= int(bymd or self.dates[-1])][-PAGE:]
+        return [{'xymd': str(d), 'open': i * self.scale, 'high': i * self.scale, 'low': i * self.scale,
+                 'clos': (100 + i) * self.scale, 'tvol': 1}
+                for i, d in reversed(list(zip((self.dates.index(d) for d in days), days)))]
+
+def expected_close(kis, dates):
+    return np.array([(100 + kis.dates.index(d)) * kis.scale for d in dates])
+
+def test_backfill_pages_to_the_listing_day(tmp_path):
+    kis = FakeKis(weekdays(100))
+    store = BarStore(str(tmp_path))
+    n = Backfill("US", kis, store).run_ticker("TQQQ", "20000101")
+
+    bars = store.load("US", "TQQQ")
+    assert n == len(bars) == 100
+    assert list(bars["date"]) == kis.dates
+    np.testing.assert_allclose(bars["close"], expected_close(kis, kis.dates))
+    # Every older page ends on the oldest stored day (one day of overlap)
+    assert all(int(call) in kis.dates for call in kis.calls[1:])
+
+def test_backfill_stops_at_start(tmp_path):
+    kis = FakeKis(weekdays(100))
+    store = BarStore(str(tmp_path))
+    start = kis.dates[40]
+    Backfill("US", kis, store).run_ticker("TQQQ", str(start))
+    assert store.load("US", "TQQQ")["date"][0] <= start
+
+def test_backfill_restarts_on_price_revision(tmp_path):
+    kis = FakeKis(weekdays(100))
+    kis.revise_after = 2 # a split is applied while older pages are being fetched
+    store = BarStore(str(tmp_path))
+    Backfill("US", kis, store).run_ticker("TQQQ", "20000101")
+
+    bars = store.load("US", "TQQQ")
+    assert list(bars["date"]) == kis.dates
+    # Whole history on the new basis, no mix of pre- and post-split prices
+    np.testing.assert_allclose(bars["close"], expected_close(kis, kis.dates))
+
+def test_backfill_state_saved_while_workers_run(tmp_path):
+    kis = FakeKis(weekdays(60))
+    store = BarStore(str(tmp_path))
+    backfill = Backfill("US", kis, store)
+    results = backfill.run([f"T{i}" for i in range(8)], "20000101", workers=4)
+    assert set(results.values()) == {60}
+    reloaded = Backfill("US", kis, store)
+    assert reloaded.state["T0"] == {"listed_from": kis.dates[0]}
@@ -0,0 +1,141 @@
+import asyncio
+import datetime
+import numpy as np
+import pytest
+from modules import clock
+from modules.clock import SimClock
+from modules.bar_store import BAR_DTYPE
+from modules.breakout_engine import BreakoutEngine
+from modules.kis_async import AsyncKisOverseas
+from modules.sentiment_prefetcher import SentimentPrefetcher
+from modules.simulation import SimBroker, StubAnalyst, InlineExecutor
+from modules.tick_tape import session_bounds
+from strategies.backtest import entry_levels, run_backtest
+import run_bot
+
+TICKERS = run_bot.TARGET_TICKERS_US
+
+def make_bars(n_tickers, n_days, seed=0, start=datetime.date(2024, 1, 2)):
+    """Random-walk daily bars on a common weekday calendar, BAR_DTYPE per ticker"""
+    rng = np.random.default_rng(seed)
+    dates = []
+    day = start
+    while len(dates) < n_days:
+        if day.weekday() < 5:
+            dates.append(int(day.strftime("%Y%m%d")))
+        day += datetime.timedelta(days=1)
+
+    out = []
+    for _ in range(n_tickers):
+        bars = np.empty(n_days, dtype=BAR_DTYPE)
+        close = 100.0
+        for i, date in enumerate(dates):
+            o = round(close * (1 + rng.normal(0, 0.01)), 2)
+            c = round(o * (1 + rng.normal(0.001, 0.02)), 2)
+            h = round(max(o, c) * (1 + abs(rng.normal(0, 0.01))), 2)
+            l = round(min(o, c) * (1 - abs(rng.normal(0, 0.01))), 2)
+            bars[i] = (date, o, h, l, c, 1000.0)
+            close = c
+        out.append(bars)
+    return out
+
+def as_matrix(stored):
+    return {key: np.stack([b[key] for b in stored]) for key in ("open", "high", "low", "close")}
+
+def day_ticks(bar, ticker, start, steps=20):
+    """open -> low -> high -> close (up day) or open -> high -> low -> close, visiting every extreme exactly"""
+    o, h, l, c = (float(bar[k]) for k in ("open", "high", "low", "close"))
+    waypoints = [o, l, h, c] if c >= o else [o, h, l, c]
+    prices = [o]
+    for a, b in zip(waypoints, waypoints[1:]):
+        prices += [a + (b - a) * j / steps for j in range(1, steps)] + [b]
+    return [(start + datetime.timedelta(seconds=i), ticker, p) for i, p in enumerate(prices)]
+
+def live_session(stored, t):
+    """run_bot.init_targets + BreakoutEngine for day t on a simulated broker; returns (targets, bought tickers)"""
+    date = int(stored[0]["date"][t])
+    start, _ = session_bounds("US", date)
+    history = {ticker: bars[:t] for ticker, bars in zip(TICKERS, stored)}
+    ticks = sorted((tick for ticker, bars in zip(TICKERS, stored) for tick in day_ticks(bars[t], ticker, start)),
+                   key=lambda x: x[0])
+    broker = SimBroker("US", history, ticks)
+
+    previous = clock.set_clock(SimClock(start))
+    kis_async = AsyncKisOverseas(broker)
+    try:
+        targets = asyncio.run(run_bot.init_targets(kis_async, TICKERS, "US"))
+        sentiment = SentimentPrefetcher(StubAnalyst(), "US", TICKERS)
+        sentiment.refresh()
+        engine = BreakoutEngine("US", broker, sentiment, targets, 1, executor=InlineExecutor())
+        for _, ticker, price in ticks:
+            broker.on_price(ticker, price)
+            engine.on_tick(ticker, price)
+    finally:
+        kis_async.close()
+        clock.set_clock(previous)
+    return targets, {ticker for ticker, d in targets.items() if d['status'] == 'bought'}
+
+def test_live_session_matches_backtest():
+    stored = make_bars(len(TICKERS), 45, seed=7)
+    bars = as_matrix(stored)
+    levels = entry_levels(bars, run_bot.K_VALUE, 20)
+    rep = run_backtest(bars, run_bot.K_VALUE, 20, dates=stored[0]["date"], tickers=TICKERS)
+
+    total_entries = 0
+    for t in range(21, 45):
+        targets, bought = live_session(stored, t)
+        date = int(stored[0]["date"][t])
+
+        bull = {ticker for i, ticker in enumerate(TICKERS) if bars["open"][i, t] > levels["ma"][i, t]}
+        assert set(targets) == bull, date
+        for i, ticker in enumerate(TICKERS):
+            if ticker in targets:
+                assert targets[ticker]['target'] == pytest.approx(levels["target"][i, t], rel=1e-12)
+
+        entries = {trade["ticker"] for trade in rep["trade_log"] if trade["date"] == date}
+        assert bought == entries, date
+        total_entries += len(entries)
+    assert total_entries > 0 # the fixture exercises the entry path
+
+def test_run_backtest_metrics():
+    # One ticker, 4 days: history, a bear day (open not above MA), then a breakout day
+    bars = {
+        "open":  np.array([[10.0, 10.0, 10.0, 10.5]]),
+        "high":  np.array([[11.0, 11.0, 11.0, 12.0]]),
+        "low":   np.array([[9.0, 9.0, 9.0, 10.0]]),
+        "close": np.array([[10.0, 10.0, 10.2, 11.55]]),
+    }
+    rep = run_backtest(bars, k=0.5, ma_window=2)
+    # day 4: ma = 10.1 < open 10.5; target = day 3 open 10 + (11 - 9) * 0.5 = 11;
+    # tick_ma = day 2 close 10; close 11.55 -> +5%
+    assert rep["trades"] == 1
+    assert rep["avg_trade_return"] == pytest.approx(0.05)
+    assert rep["total_return"] == pytest.approx(0.05)
+    assert rep["win_rate"] == 1.0
+    assert rep["mdd"] == 0.0
+    assert rep["days_in_market"] == pytest.approx(0.25)
+
+    stopped = run_backtest(bars, k=0.5, ma_window=2, stop_loss=0.05, fee=0.001)
+    # low 10.0 <= 11 * 0.95 = 10.45 -> stopped out at -5%, minus the fee
+    assert stopped["avg_trade_return"] == pytest.approx(-0.051)
+    assert stopped["mdd"] == pytest.approx(-0.051)
+    assert stopped["win_rate"] == 0.0
+
+def test_per_tick_trend_check_blocks_entry():
+    # Bull at the open (ma = 10.25 < 10.5) and the high clears the target, but every
+    # price up to the high stays below the MA with the live price in (tick_ma = 12.5)
+    bars = {
+        "open":  np.array([[10.0, 10.0, 10.0, 10.5]]),
+        "high":  np.array([[11.0, 13.0, 11.0, 12.0]]),
+        "low":   np.array([[9.0, 9.0, 7.0, 10.0]]),
+        "close": np.array([[10.0, 12.5, 8.0, 11.5]]),
+    }
+    levels = entry_levels(bars, k=0.5, ma_window=2)
+    assert levels["ma"][0, 3] == 10.25 and levels["tick_ma"][0, 3] == 12.5
+    assert run_backtest(bars, k=0.5, ma_window=2)["trades"] == 0
+
+def test_run_backtest_skips_missing_bars():
+    bars = {key: np.full((2, 3), np.nan) for key in ("open", "high", "low", "close")}
+    rep = run_backtest(bars, ma_window=2)
+    assert rep["trades"] == 0
+    assert rep["exposure"] == 0.0
@@ -0,0 +1,99 @@
+import os
+import pytest
+import numpy as np
+from modules.bar_store import BarStore, BAR_DTYPE, rows_to_bars, bars_to_rows, previous_weekday
+
+def make(dates, scale=1.0):
+    bars = np.empty(len(dates), dtype=BAR_DTYPE)
+    for i, d in enumerate(dates):
+        px = (100 + d % 100) * scale
+        bars[i] = (d, px, px + 1, px - 1, px, 10.0)
+    return bars
+
+# Mon 2024-01-08 .. Fri 2024-01-19 (weekdays only)
+DAYS = [20240108, 20240109, 20240110, 20240111, 20240112, 20240115, 20240116, 20240117, 20240118, 20240119]
+
+def test_rows_roundtrip_sorted_and_deduplicated():
+    rows = bars_to_rows(make(DAYS[:3]))
+    assert [r['xymd'] for r in rows] == ["20240110", "20240109", "20240108"] # latest first
+    bars = rows_to_bars(rows + [dict(rows[0], clos=999.0)])
+    assert list(bars["date"]) == DAYS[:3]
+    assert bars["close"][-1] == 999.0 # last occurrence wins
+
+def test_merge_new_updated(tmp_path):
+    store = BarStore(str(tmp_path))
+    _, status = store.merge("US", "TQQQ", make(DAYS[:5]))
+    assert status == "new"
+    # Overlapping page with one new day and today's still-forming bar changed
+    page = make(DAYS[3:6])
+    page["close"][1] += 0.5 # DAYS[4], the newest stored day
+    bars, status = store.merge("US", "TQQQ", page)
+    assert status == "updated"
+    assert list(bars["date"]) == DAYS[:6]
+    assert bars["close"][4] == page["close"][1]
+
+def test_merge_revision_and_gap_reset_history(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.merge("US", "TQQQ", make(DAYS[:5]))
+    bars, status = store.merge("US", "TQQQ", make(DAYS[2:7], scale=0.5)) # split: past closes changed
+    assert status == "revised"
+    assert list(bars["date"]) == DAYS[2:7]
+
+    store.merge("US", "SOXL", make(DAYS[:3]))
+    bars, status = store.merge("US", "SOXL", make(DAYS[5:8])) # page does not reach stored data
+    assert status == "revised"
+    assert list(store.load("US", "SOXL")["date"]) == DAYS[5:8]
+
+def test_prepend_extends_verifies_and_refuses_gaps(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.merge("US", "TQQQ", make(DAYS[5:]))
+
+    bars, status = store.prepend("US", "TQQQ", make(DAYS[2:6]))
+    assert status == "extended"
+    assert list(bars["date"]) == DAYS[2:]
+
+    _, status = store.prepend("US", "TQQQ", make(DAYS[2:4]))
+    assert status == "unchanged"
+
+    _, status = store.prepend("US", "TQQQ", make(DAYS[:3], scale=0.5))
+    assert status == "revised"
+    _, status = store.prepend("US", "TQQQ", make(DAYS[:2])) # no overlapping day to verify
+    assert status == "gap"
+    assert list(store.load("US", "TQQQ")["date"]) == DAYS[2:]
+
+def test_previous_weekday():
+    assert previous_weekday(20240116) == 20240115
+    assert previous_weekday(20240115) == 20240112 # Monday -> Friday
+
+def test_sync_serves_store_only_while_current(tmp_path, capsys):
+    store = BarStore(str(tmp_path))
+    store.merge("US", "TQQQ", make(DAYS[:5])) # up to Fri 2024-01-12
+    down = lambda ticker: None
+
+    rows = store.sync("US", "TQQQ", down, limit=3, today=20240115) # Monday: Friday is the previous session
+    assert [r['xymd'] for r in rows] == ["20240112", "20240111", "20240110"]
+    assert "using stored bars" in capsys.readouterr().out
+
+    assert store.sync("US", "TQQQ", down, today=20240117) is None # Tuesday's bar is missing
+    assert "skipping" in capsys.readouterr().out
+    assert store.sync("US", "NVDL", down, today=20240115) is None # nothing stored
+
+def test_sync_merges_fetched_page(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.merge("US", "TQQQ", make(DAYS[:5]))
+    rows = store.sync("US", "TQQQ", lambda ticker: bars_to_rows(make(DAYS[3:7])), limit=2)
+    assert [r['xymd'] for r in rows] == ["20240116", "20240115"]
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_repeated_writes_do_not_leak_fds(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.merge("US", "TQQQ", make(DAYS[:5]))
+    before = open_fds()
+    for _ in range(200):
+        store.merge("US", "TQQQ", make(DAYS[3:6]))
+        store.prepend("US", "TQQQ", make(DAYS[:2]))
+    store.delete("US", "TQQQ")
+    assert open_fds() == before
@@ -0,0 +1,42 @@
+import json
+from benchmarks.run_all import BASELINE, direction, best_of, compare, run_bench
+
+def verdicts(current, baseline, tolerance=0.25):
+    return {metric: verdict for metric, _, _, _, verdict in compare(current, baseline, tolerance)}
+
+def test_metric_names_carry_their_direction():
+    assert direction("quotes_per_sec") == 1
+    assert direction("contended_throughput_ratio") == 1
+    assert direction("tick_to_order_p50_ms") == -1
+    assert direction("missed_orders_count") == -1
+    assert direction("tickers") == 0
+
+    with open(BASELINE, encoding="utf-8") as f:
+        metrics = json.load(f)["metrics"]
+    assert [m for m in metrics if direction(m) == 0] == []
+
+def test_best_of_keeps_the_best_run_per_metric():
+    runs = [{"a_per_sec": 100, "b_ms": 2.0, "n": 1}, {"a_per_sec": 120, "b_ms": 2.5, "n": 2}]
+    assert best_of(runs) == {"a_per_sec": 120, "b_ms": 2.0, "n": 1}
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"quotes_per_sec": 100.0, "decode_us": 10.0, "tick_to_order_p99_ms": 10.0,
+                "overshoot_count": 0, "misses_count": 0}
+    current = {"quotes_per_sec": 70.0, "decode_us": 7.0, "tick_to_order_p99_ms": 14.0,
+               "overshoot_count": 1, "misses_count": 0, "new_metric_ms": 1.0}
+    assert verdicts(current, baseline) == {
+        "quotes_per_sec": "REGRESSED", # 30% fewer
+        "decode_us": "improved",
+        "tick_to_order_p99_ms": "ok", # tail metrics get twice the tolerance
+        "overshoot_count": "REGRESSED", # zero baseline: any increase
+        "misses_count": "ok",
+        "new_metric_ms": "new",
+    }
+    assert verdicts({"tick_to_order_p99_ms": 16.0}, baseline)["tick_to_order_p99_ms"] == "REGRESSED"
+
+def test_benchmark_runs_in_a_subprocess():
+    results = run_bench("bench_tick_decoder", 0.02)
+    with open(BASELINE, encoding="utf-8") as f:
+        baseline = json.load(f)["metrics"]
+    assert results and set(results) <= set(baseline)
+    assert all(value > 0 for value in results.values())
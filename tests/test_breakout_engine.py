@@ -0,0 +1,86 @@
+import datetime
+import pytest
+from modules import clock
+from modules.clock import SimClock
+from modules.breakout_engine import BreakoutEngine
+from modules.simulation import SimBroker, InlineExecutor
+from strategies.technical import SMA
+
+class Verdicts:
+    """SentimentPrefetcher stand-in: fixed per-ticker verdicts"""
+    def __init__(self, **can_buy):
+        self.can_buy = can_buy
+
+    def snapshot(self, ticker=None):
+        ok = self.can_buy.get(ticker, True)
+        return {"risk_level": "LOW" if ok else "HIGH", "can_buy": ok, "reason": "test"}
+
+@pytest.fixture
+def sim():
+    sim = SimClock(datetime.datetime(2024, 1, 3, 23, 30))
+    previous = clock.set_clock(sim)
+    yield sim
+    clock.set_clock(previous)
+
+def make_engine(sentiment=None, trend=None):
+    targets = {t: {'target': 100.0, 'trend': trend, 'status': 'monitoring', 'buys': 0} for t in ("TQQQ", "SOXL")}
+    broker = SimBroker("US", {}, [])
+    engine = BreakoutEngine("US", broker, sentiment or Verdicts(), targets, 2, executor=InlineExecutor())
+    return engine, broker
+
+def tick(engine, broker, ticker, price, source="ws"):
+    broker.on_price(ticker, price)
+    engine.on_tick(ticker, price, source)
+
+def test_stream_tick_at_target_buys_once(sim):
+    engine, broker = make_engine()
+    tick(engine, broker, "TQQQ", 99.9)
+    assert broker.fills == []
+
+    tick(engine, broker, "TQQQ", 100.0)
+    tick(engine, broker, "TQQQ", 100.5) # already bought
+    assert [(side, t, qty, price) for _, side, t, qty, price in broker.fills] == [("buy", "TQQQ", 2, 100.0)]
+    assert engine.targets["TQQQ"]["status"] == "bought"
+    assert engine.pending_tickers() == ["SOXL"]
+    assert engine.latency_summary()["orders"] == 1
+
+def test_rest_fallback_only_for_silent_streams(sim):
+    engine, broker = make_engine()
+    assert engine.stale_tickers(2.0) == ["TQQQ", "SOXL"] # nothing streamed yet
+
+    tick(engine, broker, "TQQQ", 95.0)
+    sim.advance(1.0)
+    assert engine.stale_tickers(2.0) == ["SOXL"]
+
+    tick(engine, broker, "TQQQ", 96.0, source="rest") # a polled quote is not proof the stream is alive
+    sim.advance(1.5)
+    assert engine.stale_tickers(2.0) == ["TQQQ", "SOXL"]
+
+    tick(engine, broker, "SOXL", 101.0, source="rest") # the fallback can still trigger the breakout
+    assert engine.targets["SOXL"]["status"] == "bought"
+    assert engine.stale_tickers(2.0) == ["TQQQ"]
+
+def test_ai_rejection_cools_down_then_retries(sim):
+    sentiment = Verdicts(TQQQ=False)
+    engine, broker = make_engine(sentiment)
+    tick(engine, broker, "TQQQ", 101.0)
+    assert engine.targets["TQQQ"]["status"] == "monitoring"
+    assert broker.fills == []
+
+    sentiment.can_buy["TQQQ"] = True
+    sim.advance(engine.REJECT_COOLDOWN - 1)
+    tick(engine, broker, "TQQQ", 101.0)
+    assert broker.fills == [] # still cooling down
+
+    sim.advance(1)
+    tick(engine, broker, "TQQQ", 101.0)
+    assert engine.targets["TQQQ"]["status"] == "bought"
+
+def test_trend_is_rechecked_on_every_tick(sim):
+    # Closes at 104: MA20 with the live price as the newest close stays above any price below 104
+    trend = SMA(20).warm([104.0] * 20)
+    engine, broker = make_engine(trend=trend)
+    tick(engine, broker, "TQQQ", 101.0)
+    assert broker.fills == []
+    tick(engine, broker, "TQQQ", 104.5)
+    assert engine.targets["TQQQ"]["status"] == "bought"
@@ -0,0 +1,44 @@
+import os
+import threading
+import pytest
+from modules.file_lock import FileLock
+
+fcntl = pytest.importorskip("fcntl")
+
+def held_elsewhere(path):
+    """True if another open file description cannot take the flock right now"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+    return False
+
+def test_nested_exit_keeps_the_outer_hold(tmp_path):
+    path = str(tmp_path / "x.lock")
+    lock = FileLock(path)
+    with lock:
+        with lock:
+            assert held_elsewhere(path)
+        assert held_elsewhere(path) # inner exit must not drop the cross-process lock
+    assert not held_elsewhere(path)
+
+def test_threads_exclude_each_other(tmp_path):
+    lock = FileLock(str(tmp_path / "x.lock"))
+    inside = []
+
+    def work(i):
+        for _ in range(200):
+            with lock:
+                inside.append(i)
+                assert len(inside) == 1
+                inside.pop()
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert inside == []
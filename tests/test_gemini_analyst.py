@@ -0,0 +1,57 @@
+import json
+from types import SimpleNamespace
+from modules.gemini_analyst import GeminiAnalyst
+
+NEWS = "- Nvidia beats\n- Chip export ban widened"
+UNIVERSE = ["NVDL", "SOXL", "TQQQ"]
+LOW = {"risk_level": "LOW", "can_buy": True, "reason": "AI demand"}
+HIGH = {"risk_level": "HIGH", "can_buy": False, "reason": "export ban"}
+
+class FakeModel:
+    """generate_content stand-in: replies with the queued texts (or raises them)"""
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(text=reply)
+
+def analyst(*replies):
+    ai = GeminiAnalyst(cache_path=None)
+    ai.model = FakeModel(*replies)
+    return ai
+
+def reply(market, **tickers):
+    return json.dumps({"market": market, "tickers": tickers})
+
+def test_one_call_scores_the_whole_universe():
+    ai = analyst("```json\n" + reply(LOW, SOXL=HIGH, NVDL=HIGH) + "\n```")
+    verdicts = ai.assess_universe(NEWS, UNIVERSE)
+    assert verdicts == {"NVDL": HIGH, "SOXL": HIGH, "TQQQ": LOW, "market": LOW} # TQQQ unscored: market verdict
+    assert len(ai.model.prompts) == 1
+    assert all(f"- {t}:" in ai.model.prompts[0] for t in UNIVERSE)
+
+def test_same_headlines_and_universe_share_one_call():
+    ai = analyst(reply(LOW, SOXL=HIGH))
+    first = ai.assess_universe(NEWS, UNIVERSE)
+    assert ai.assess_universe("- Chip export ban widened\n- Nvidia beats", list(reversed(UNIVERSE))) == first
+    assert len(ai.model.prompts) == 1
+
+def test_failed_call_blocks_every_ticker_and_is_retried():
+    ai = analyst(TimeoutError("deadline exceeded"), reply(LOW))
+    verdicts = ai.assess_universe(NEWS, UNIVERSE)
+    assert set(verdicts) == set(UNIVERSE) | {"market"}
+    assert all(v["risk_level"] == "UNKNOWN" and not v["can_buy"] for v in verdicts.values())
+
+    assert ai.assess_universe(NEWS, UNIVERSE)["TQQQ"] == LOW # not cached: asked again
+    assert len(ai.model.prompts) == 2
+
+def test_without_model_or_news_everything_may_buy():
+    ai = analyst()
+    assert all(v["can_buy"] for v in ai.assess_universe("", UNIVERSE).values())
+    ai.model = None
+    assert all(v["can_buy"] for v in ai.assess_universe(NEWS, UNIVERSE).values())
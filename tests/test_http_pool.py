@@ -0,0 +1,48 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from modules import http_pool
+from modules.http_pool import get_session, prewarm
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive
+    peers = set()
+
+    def _reply(self):
+        self.peers.add(self.client_address)
+        self.send_response(404) # any status still proves the socket is up
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_HEAD = _reply
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    Handler.peers = set()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_one_session_per_process():
+    session = get_session()
+    assert session is get_session()
+    assert session.get_adapter("https://openapi.koreainvestment.com").poolmanager.connection_pool_kw["maxsize"] == http_pool.KIS_POOL_SIZE
+
+def test_prewarmed_connections_are_reused(server):
+    assert prewarm(server, connections=3) == 3
+    opened = set(Handler.peers)
+    assert 1 <= len(opened) <= 3
+
+    session = get_session()
+    for _ in range(5):
+        session.get(server + "/uapi/overseas-price/v1/quotations/price", timeout=http_pool.TIMEOUT)
+    assert Handler.peers == opened # no new handshakes after the pre-warm
+
+def test_prewarm_reports_failed_handshakes():
+    # Nothing listens on port 9 (discard) on a test box: every connect is refused
+    assert prewarm("http://127.0.0.1:9", connections=2) == 0
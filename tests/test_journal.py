@@ -0,0 +1,77 @@
+import json
+import datetime
+import pytest
+from modules import clock
+from modules.clock import SimClock
+from modules.logger import EventJournal, read_events, journal_days, journal_path
+
+@pytest.fixture
+def sim_clock():
+    sim = SimClock(datetime.datetime(2024, 1, 3, 23, 30)) # US session start (KST)
+    previous = clock.set_clock(sim)
+    yield sim
+    clock.set_clock(previous)
+
+def write_session(root, sim):
+    journal = EventJournal(root)
+    journal.write("session_start", market="US", tickers=["TQQQ", "SOXL"])
+    journal.write("target", market="US", ticker="TQQQ", price=61.2, ma=58.0, open=61.0, target=62.0, trend="bull")
+    journal.write("target", market="US", ticker="SOXL", price=30.0, ma=31.0, open=30.0, target=None, trend="bear")
+    sim.advance(3600) # past midnight: same session
+    journal.write("breakout", market="US", ticker="TQQQ", price=62.1, target=62.0, source="ws")
+    journal.write("ai_verdict", market="US", ticker="TQQQ", can_buy=True, risk_level="낮음", reason="호재 뉴스") # non-ASCII
+    journal.write("order", market="US", ticker="TQQQ", side="buy", qty=1, accepted=True, latency_ms=12.5, response={})
+    journal.write("session_end", market="US", latency=None, stages={})
+    journal.close()
+
+def test_index_offsets_point_at_ticker_lines(tmp_path, sim_clock):
+    root = str(tmp_path)
+    write_session(root, sim_clock)
+    assert journal_days(root) == ["20240103"] # the session's start day, not the calendar day
+
+    with open(journal_path("20240103", root), "rb") as f:
+        data = f.read()
+    with open(journal_path("20240103", root, ".idx"), encoding="utf-8") as f:
+        index = [line.rstrip("\n").split("\t") for line in f]
+    assert [name for name, _ in index] == ["TQQQ", "SOXL", "TQQQ", "TQQQ", "TQQQ"] # ticker-less events not indexed
+    for name, offset in index:
+        line = data[int(offset):data.index(b"\n", int(offset))]
+        assert json.loads(line)["ticker"] == name # byte offsets, correct past multi-byte UTF-8
+
+def test_read_events_by_ticker_and_type(tmp_path, sim_clock):
+    root = str(tmp_path)
+    write_session(root, sim_clock)
+
+    everything = read_events("20240103", root=root)
+    assert [e["type"] for e in everything] == ["session_start", "target", "target", "breakout", "ai_verdict", "order", "session_end"]
+    assert everything[1]["ts"] == "2024-01-03 23:30:00.000"
+
+    tqqq = read_events("20240103", ticker="TQQQ", root=root)
+    assert [e["type"] for e in tqqq] == ["target", "breakout", "ai_verdict", "order"]
+    assert tqqq[2]["reason"] == "호재 뉴스"
+    assert read_events("20240103", ticker="TQQQ", types={"order"}, root=root)[0]["latency_ms"] == 12.5
+    assert read_events("20240103", ticker="NVDL", root=root) == []
+    assert read_events("20240104", root=root) == []
+
+def test_reopened_journal_appends_with_correct_offsets(tmp_path, sim_clock):
+    root = str(tmp_path)
+    write_session(root, sim_clock)
+    clock.set_clock(SimClock(datetime.datetime(2024, 1, 3, 23, 45))) # bot restarted the same evening
+    journal = EventJournal(root)
+    journal.write("fill", market="US", ticker="TQQQ", side="sell", qty=1, price=63.0)
+    journal.flush()
+    # Partially written line at the end of the file (crash mid-write)
+    with open(journal_path("20240103", root), "ab") as f:
+        f.write(b'{"ts": "2024-01-03 23:46:00.000", "type": "fi')
+    journal.close()
+
+    tqqq = read_events("20240103", ticker="TQQQ", root=root)
+    assert [e["type"] for e in tqqq] == ["target", "breakout", "ai_verdict", "order", "fill"]
+    assert tqqq[-1]["price"] == 63.0
+    assert len(read_events("20240103", root=root)) == 8
+
+def test_unknown_event_type_is_rejected(tmp_path):
+    journal = EventJournal(str(tmp_path))
+    with pytest.raises(ValueError):
+        journal.write("buy", ticker="TQQQ")
+    journal.close()
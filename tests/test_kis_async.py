@@ -0,0 +1,58 @@
+import time
+import asyncio
+import threading
+from modules import rate_limiter
+from modules.kis_async import AsyncKisOverseas
+from modules.rate_limiter import RateLimiter
+
+class SlowQuotes:
+    """Blocking client: each quote takes one 'round trip' and goes through the limiter like KisOverseas"""
+    url = "https://stub"
+
+    def __init__(self, limiter, latency=0.1, prices=None):
+        self.limiter = limiter
+        self.latency = latency
+        self.prices = prices or {}
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get_current_price(self, ticker):
+        if not self.limiter.wait("quote"):
+            return None
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return self.prices.get(ticker)
+
+def test_universe_quotes_fan_out_concurrently(tmp_path):
+    prices = {"TQQQ": 61.25, "SOXL": 30.5, "UPRO": 80.1, "TECL": 70.0, "FNGU": 20.2} # no quote for LABU
+    client = SlowQuotes(RateLimiter(max_calls=30, period=1.0, path=str(tmp_path / "rl.bin")), prices=prices)
+    api = AsyncKisOverseas(client)
+    tickers = list(prices) + ["LABU"]
+
+    start = time.perf_counter()
+    quotes = asyncio.run(api.get_current_prices(tickers))
+    elapsed = time.perf_counter() - start
+    api.close()
+
+    assert quotes == {**prices, "LABU": None}
+    assert list(quotes) == tickers
+    assert client.peak > 1
+    assert elapsed < client.latency * len(tickers) / 2 # ~one round trip, not six
+
+def test_fan_out_stays_inside_the_rate_limit(tmp_path, monkeypatch):
+    monkeypatch.setitem(rate_limiter.MAX_WAIT, "quote", 0.05)
+    limiter = RateLimiter(max_calls=10, period=30, path=str(tmp_path / "rl.bin"))
+    client = SlowQuotes(limiter, latency=0.01, prices={f"T{i}": float(i) for i in range(12)})
+    api = AsyncKisOverseas(client)
+
+    quotes = asyncio.run(api.get_current_prices([f"T{i}" for i in range(12)]))
+    api.close()
+
+    # Quote lane is 80% of the window: the rest are dropped, not sent
+    assert sum(p is not None for p in quotes.values()) == limiter.caps["quote"] == 8
+    assert limiter.stats()["calls_in_window"] == 8
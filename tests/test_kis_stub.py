@@ -0,0 +1,64 @@
+import json
+import asyncio
+import pytest
+import requests
+import websockets
+from modules.kis_stub import KisStubServer
+from modules.tick_decoder import decode_frame
+
+PRICE = "/uapi/overseas-price/v1/quotations/price"
+
+@pytest.fixture(scope="module")
+def stub():
+    with KisStubServer(rate_limit=None, tick_rate=0, ping_interval=None) as server:
+        yield server
+
+def get(stub, path, appkey="app", **params):
+    return requests.get(stub.base_url + path, params=params, headers={"appkey": appkey}, timeout=5)
+
+def test_quotes_and_orders(stub):
+    stub.prices.set_price("TQQQ", 61.25)
+    res = get(stub, PRICE, EXCD="NAS", SYMB="TQQQ")
+    assert res.status_code == 200
+    assert res.json()["output"]["last"] == "61.2500"
+
+    body = {"PDNO": "TQQQ", "ORD_QTY": "1", "OVRS_ORD_UNPR": "0"}
+    res = requests.post(stub.base_url + "/uapi/overseas-stock/v1/trading/order", data=json.dumps(body),
+                        headers={"tr_id": "TTTT1002U", "Content-Type": "application/json"}, timeout=5)
+    assert res.json()["rt_cd"] == "0"
+    assert stub.orders[-1][1:4] == ("TTTT1002U", "TQQQ", "1")
+
+    assert get(stub, "/uapi/unknown").json()["msg_cd"] == "OPSQ0002"
+
+def test_rate_limit_is_per_app_key(stub, monkeypatch):
+    monkeypatch.setattr(stub, "rate_limit", 3)
+    codes = [get(stub, PRICE, appkey="busy", SYMB="TQQQ").json().get("msg_cd") for _ in range(5)]
+    assert codes.count("EGW00201") == 2
+    assert get(stub, PRICE, appkey="other", SYMB="TQQQ").json()["rt_cd"] == "0"
+
+def test_token_issue_is_throttled(stub):
+    body = json.dumps({"grant_type": "client_credentials", "appkey": "token-test", "appsecret": "s"})
+    first = requests.post(stub.base_url + "/oauth2/tokenP", data=body, timeout=5)
+    second = requests.post(stub.base_url + "/oauth2/tokenP", data=body, timeout=5)
+    assert first.status_code == 200 and first.json()["access_token"]
+    assert (second.status_code, second.json()["error_code"]) == (403, "EGW00133")
+
+def test_websocket_subscribe_push_and_drop(stub):
+    async def session():
+        async with websockets.connect(stub.ws_url + "/tryitout/HDFSCNT0", ping_interval=None) as ws:
+            await ws.send(json.dumps({"header": {"approval_key": "k", "tr_type": "1"},
+                                      "body": {"input": {"tr_id": "HDFSCNT0", "tr_key": "DNASTQQQ"}}}))
+            ack = json.loads(await ws.recv())
+            assert ack["body"]["msg1"] == "SUBSCRIBE SUCCESS"
+
+            await asyncio.get_running_loop().run_in_executor(None, stub.push, "DNASTQQQ", 62.5)
+            ticks = decode_frame(await asyncio.wait_for(ws.recv(), 5))
+            assert [t.symbol for t in ticks] == ["DNASTQQQ"]
+            assert ticks[0].price == pytest.approx(62.5, rel=0.01) # one random-walk step from the pushed price
+
+            stub.drop_sockets()
+            with pytest.raises(websockets.ConnectionClosed):
+                await asyncio.wait_for(ws.recv(), 5)
+
+    asyncio.run(session())
+    assert stub.stats["ws_drops"] >= 1
@@ -0,0 +1,99 @@
+import json
+import asyncio
+from modules import kis_websocket
+from modules.kis_websocket import KisWebSocket
+from modules.token_store import CredentialStore
+
+class FakeStore:
+    """Credential store that issues key-1, key-2, ... and re-issues only after invalidation"""
+    def __init__(self):
+        self.issued = 1
+        self.invalidated = []
+
+    def get_approval_key(self):
+        return f"key-{self.issued}"
+
+    def invalidate_approval_key(self, key):
+        self.invalidated.append(key)
+        if key == f"key-{self.issued}":
+            self.issued += 1
+
+class FakeSocket:
+    """Answers each subscribe with an ACK; key-1 is rejected like an expired approval key"""
+    def __init__(self, client, sent):
+        self.client = client
+        self.sent = sent
+        self.inbox = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, text):
+        req = json.loads(text)
+        key = req["header"]["approval_key"]
+        self.sent.append(key)
+        if key == "key-1":
+            body = {"rt_cd": "1", "msg_cd": "OPSP0011", "msg1": "invalid approval : NOT FOUND"}
+        else:
+            body = {"rt_cd": "0", "msg_cd": "OPSP0000", "msg1": "SUBSCRIBE SUCCESS"}
+            self.client.running = False # accepted: done
+        await self.inbox.put(json.dumps({"header": req["body"]["input"], "body": body}))
+
+    async def recv(self):
+        item = await self.inbox.get()
+        if item is None:
+            raise ConnectionError("closed")
+        return item
+
+    async def close(self):
+        await self.inbox.put(None)
+
+def test_rejected_approval_key_is_reissued_on_reconnect(monkeypatch):
+    store = FakeStore()
+    sent = []
+    monkeypatch.setattr(kis_websocket, "get_credential_store", lambda *args: store)
+    ws = KisWebSocket()
+    ws.BACKOFF_MIN = 0.01
+    monkeypatch.setattr(kis_websocket.websockets, "connect", lambda *args, **kwargs: FakeSocket(ws, sent))
+    ws.subscribe("TQQQ", None)
+
+    asyncio.run(asyncio.wait_for(ws.connect(), 5))
+    assert sent == ["key-1", "key-2"]
+    assert store.invalidated == ["key-1"]
+    assert ws.reconnects == 1
+
+def test_connect_url_follows_the_subscribed_tr(monkeypatch):
+    ws = KisWebSocket()
+    ws.ws_url = "ws://127.0.0.1:21000/"
+    assert ws.connect_url() == "ws://127.0.0.1:21000/tryitout/HDFSCNT0"
+
+    urls = []
+    def connect(url, **kwargs):
+        urls.append(url)
+        ws.running = False
+        raise ConnectionError("refused")
+    monkeypatch.setattr(kis_websocket, "get_credential_store", lambda *args: FakeStore())
+    monkeypatch.setattr(kis_websocket.websockets, "connect", connect)
+    ws.subscribe("122630", None, market="KR")
+    asyncio.run(asyncio.wait_for(ws.connect(), 5))
+    assert urls == ["ws://127.0.0.1:21000/tryitout/H0STCNT0"]
+
+def test_invalidate_only_drops_the_rejected_key(tmp_path):
+    store = CredentialStore("https://example", "app", "secret", path=str(tmp_path / "token.json"))
+    with store.lock:
+        store._update(approval_key="old", approval_expires_at=2e9)
+    assert store.get_approval_key() == "old"
+
+    # Another client already replaced the key: keep the new one
+    other = CredentialStore("https://example", "app", "secret", path=str(tmp_path / "token.json"))
+    with other.lock:
+        other._update(approval_key="new", approval_expires_at=2e9)
+    store.invalidate_approval_key("old")
+    assert store.get_approval_key() == "new"
+
+    store.invalidate_approval_key("new")
+    assert store._entry()["approval_expires_at"] == 0
+    assert store._cache["approval_expires_at"] == 0
@@ -0,0 +1,133 @@
+import os
+import json
+import pytest
+from modules.log_parser import (_Tail, LogTail, EventTail, parse_log_file, build_ticker_data, extract_trades,
+                                ticker_data_from_events, trades_from_events)
+
+LINES = [
+    "2025-12-31 00:30:01,100 - INFO - 🇺🇸 Starting US Trading Session",
+    "2025-12-31 00:30:02,200 - INFO - [TQQQ] Current: 54.38, MA20: 54.31",
+    "2025-12-31 00:30:02,300 - INFO - [TQQQ] Bull Market! Target Price: 55.12 (Open: 54.0)",
+    "2025-12-31 00:30:02,400 - INFO - [SOXL] Bear Market (Price < 20MA). Skipping.",
+    "  continuation of a traceback",
+    "2025-12-31 00:41:10,500 - INFO - [TQQQ] Buy Order Sent! 🚀",
+    "2025-12-31 06:00:00,000 - INFO - [US] Selling All Positions",
+]
+
+def append(path, text, encoding="utf-8"):
+    with open(path, "ab") as f:
+        f.write(text.encode(encoding))
+
+def rotate(path):
+    """Like RotatingFileHandler.doRollover: .log.N -> .log.N+1, ..., .log -> .log.1"""
+    n = 1
+    while os.path.exists(f"{path}.{n}"):
+        n += 1
+    for i in range(n - 1, 0, -1):
+        os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    os.replace(path, path + ".1")
+
+def test_log_tail_matches_full_parse(tmp_path):
+    path = str(tmp_path / "trading_20251231.log")
+    tail = LogTail(path, window=3)
+    assert tail.poll() == 0 # no file yet
+
+    append(path, "\n".join(LINES[:3]) + "\n" + LINES[3][:20]) # last line still being written
+    assert tail.poll() == 3
+    assert tail.ticker_data["TQQQ"]["Target"] == "55.12"
+    assert "SOXL" not in tail.ticker_data
+
+    append(path, LINES[3][20:] + "\n" + "\n".join(LINES[4:]) + "\n")
+    assert tail.poll() == 4
+    assert tail.poll() == 0
+
+    parsed = parse_log_file(path)
+    assert tail.ticker_data == build_ticker_data(parsed)
+    assert list(tail.trades) == extract_trades(parsed)
+    assert list(tail.lines) == parsed[-3:]
+    assert tail.last == parsed[-1]
+
+def test_lines_split_across_chunks(tmp_path):
+    path = str(tmp_path / "trading.log")
+    append(path, "\n".join(LINES) + "\n")
+    tail = LogTail(path)
+    tail.CHUNK = 7
+    tail.poll()
+    assert list(tail.lines) == parse_log_file(path)
+
+def test_truncated_file_is_read_from_the_start(tmp_path):
+    path = str(tmp_path / "trading.log")
+    append(path, "\n".join(LINES[:4]) + "\n")
+    tail = LogTail(path)
+    tail.poll()
+
+    with open(path, "w", encoding="utf-8") as f: # truncated in place
+        f.write(LINES[5] + "\n")
+    assert tail.poll() == 1
+    assert tail.trades[-1]["message"] == "[TQQQ] Buy Order Sent! 🚀"
+
+def test_rotation_drains_the_old_file_first(tmp_path):
+    path = str(tmp_path / "trading_20251231.log")
+    append(path, "\n".join(LINES[:2]) + "\n")
+    tail = LogTail(path)
+    assert tail.poll() == 2
+
+    # Appended after the last poll, then size-rotated
+    append(path, LINES[2] + "\n")
+    rotate(path)
+    append(path, LINES[5] + "\n")
+    assert tail.poll() == 2
+    assert [l["message"] for l in list(tail.lines)[-2:]] == ["[TQQQ] Bull Market! Target Price: 55.12 (Open: 54.0)",
+                                                            "[TQQQ] Buy Order Sent! 🚀"]
+    assert tail.ticker_data["TQQQ"]["Target"] == "55.12"
+    assert tail.offset == os.path.getsize(path)
+
+    # Two rotations between polls
+    append(path, LINES[3] + "\n")
+    rotate(path)
+    append(path, "2025-12-31 01:00:00,000 - INFO - between rotations\n")
+    rotate(path)
+    append(path, LINES[6] + "\n")
+    assert tail.poll() == 3
+    assert [l["message"] for l in list(tail.lines)[-3:]] == [
+        "[SOXL] Bear Market (Price < 20MA). Skipping.", "between rotations", "[US] Selling All Positions"]
+
+def test_trades_window_is_bounded(tmp_path):
+    path = str(tmp_path / "trading.log")
+    append(path, "".join(f"2025-12-31 00:41:{i % 60:02d},000 - INFO - [TQQQ] Buy Order Sent! {i}\n" for i in range(50)))
+    tail = LogTail(path, window=10, trade_window=5)
+    tail.poll()
+    assert [t["message"] for t in tail.trades] == [f"[TQQQ] Buy Order Sent! {i}" for i in range(45, 50)]
+    assert len(tail.lines) == 10
+
+def test_tail_base_is_abstract():
+    with pytest.raises(TypeError):
+        _Tail("trading.log")
+
+def test_cp949_lines(tmp_path):
+    path = str(tmp_path / "trading.log")
+    append(path, "2025-12-31 00:30:03,000 - WARNING - [TQQQ] 매수 보류\n", encoding="cp949")
+    tail = LogTail(path)
+    tail.poll()
+    assert tail.last["message"] == "[TQQQ] 매수 보류"
+
+def test_event_tail(tmp_path):
+    path = str(tmp_path / "20251231.jsonl")
+    events = [
+        {"ts": "2025-12-31 00:30:02.000", "type": "target", "market": "US", "ticker": "TQQQ",
+         "price": 54.38, "ma": 54.31, "open": 54.0, "target": 55.12, "trend": "bull"},
+        {"ts": "2025-12-31 00:41:10.000", "type": "breakout", "market": "US", "ticker": "TQQQ", "price": 55.2},
+        {"ts": "2025-12-31 00:41:10.050", "type": "order", "market": "US", "ticker": "TQQQ",
+         "side": "buy", "qty": 1, "accepted": True, "latency_ms": 40.0},
+    ]
+    text = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events)
+    tail = EventTail(path)
+    append(path, text[:-10])
+    assert tail.poll() == 2
+    append(path, text[-10:])
+    assert tail.poll() == 1
+
+    assert tail.count == 3
+    assert tail.ticker_data == ticker_data_from_events(events)
+    assert tail.ticker_data["TQQQ"]["Status"] == "bought"
+    assert list(tail.trades) == trades_from_events(events)
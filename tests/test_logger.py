@@ -0,0 +1,58 @@
+import time
+import logging
+from modules.logger import DedupFilter, DailyRotatingFileHandler
+
+def record(msg, created, level=logging.INFO, args=None):
+    rec = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    rec.created = created
+    return rec
+
+def test_repeats_within_window_are_suppressed_then_counted():
+    dedup = DedupFilter(window=10)
+    assert dedup.filter(record("Heartbeat: Market Status: %s", 100.0, args=("US",)))
+    assert not dedup.filter(record("Heartbeat: Market Status: %s", 101.0, args=("US",)))
+    assert not dedup.filter(record("Heartbeat: Market Status: US", 105.0)) # same rendered text
+    assert dedup.filter(record("Heartbeat: Market Status: KR", 105.0)) # different text
+
+    rec = record("Heartbeat: Market Status: %s", 112.0, args=("US",))
+    assert dedup.filter(rec)
+    assert rec.getMessage() == "Heartbeat: Market Status: US (suppressed 2 repeats in 12s)"
+
+    rec = record("Heartbeat: Market Status: US", 123.0) # nothing suppressed since
+    assert dedup.filter(rec)
+    assert rec.getMessage() == "Heartbeat: Market Status: US"
+
+def test_level_is_part_of_the_key():
+    dedup = DedupFilter(window=10)
+    assert dedup.filter(record("Heartbeat", 100.0, level=logging.INFO))
+    assert dedup.filter(record("Heartbeat", 100.5, level=logging.DEBUG))
+    assert not dedup.filter(record("Heartbeat", 101.0, level=logging.INFO))
+
+def test_warnings_and_errors_are_never_suppressed():
+    dedup = DedupFilter(window=10)
+    for level in (logging.WARNING, logging.ERROR, logging.CRITICAL):
+        for t in (100.0, 100.5, 101.0):
+            rec = record("[TQQQ] Buy Failed: None", t, level=level)
+            assert dedup.filter(rec)
+            assert rec.getMessage() == "[TQQQ] Buy Failed: None"
+
+def test_disabled_and_bounded():
+    assert all(DedupFilter(window=0).filter(record("same", 100.0)) for _ in range(3))
+
+    dedup = DedupFilter(window=10)
+    dedup.MAX_KEYS = 3
+    for i in range(5):
+        assert dedup.filter(record(f"msg {i}", 100.0))
+    assert len(dedup._seen) == 3
+    assert dedup.filter(record("msg 0", 101.0)) # evicted, so logged again
+    assert not dedup.filter(record("msg 4", 101.0))
+
+def test_daily_file_per_record_day(tmp_path):
+    handler = DailyRotatingFileHandler(str(tmp_path), "trading_")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    day1 = time.mktime((2024, 1, 3, 23, 59, 0, 0, 0, -1))
+    handler.emit(record("before midnight", day1, level=logging.INFO))
+    handler.emit(record("after midnight", day1 + 120, level=logging.INFO))
+    handler.close()
+    assert (tmp_path / "trading_20240103.log").read_text(encoding="utf-8") == "before midnight\n"
+    assert (tmp_path / "trading_20240104.log").read_text(encoding="utf-8") == "after midnight\n"
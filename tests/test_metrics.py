@@ -0,0 +1,83 @@
+import re
+import json
+import pytest
+import requests
+from modules import metrics
+from modules.metrics import BUCKETS, METRIC_NAME
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """A private registry, so the bot modules' histograms don't leak into these tests"""
+    monkeypatch.setattr(metrics, "_histograms", {})
+
+def series(text, name):
+    """{labels: value} for every sample of one series in Prometheus text"""
+    pattern = re.compile(rf"^{METRIC_NAME}{name}\{{(.*)\}} (\S+)$")
+    return {m.group(1): float(m.group(2)) for m in map(pattern.match, text.splitlines()) if m}
+
+def test_buckets_and_quantiles():
+    hist = metrics.histogram("order_post")
+    assert metrics.histogram("order_post") is hist
+
+    for ms in range(1, 101): # 1 .. 100 ms
+        hist.observe(ms / 1000)
+    assert hist.count == 100
+    assert hist.max == 0.1
+    assert hist.sum == pytest.approx(5.05)
+    # Within the ~26% bucket resolution
+    assert hist.quantile(0.5) == pytest.approx(0.050, rel=0.26)
+    assert hist.quantile(0.99) == pytest.approx(0.099, rel=0.26)
+    assert hist.quantile(1.0) == 0.1
+
+    edge = metrics.histogram("edge")
+    edge.observe(BUCKETS[10]) # upper bounds are inclusive (le)
+    assert edge.counts[10] == 1
+    edge.observe(1e6) # beyond the last bucket
+    assert edge.counts[-1] == 1 and edge.quantile(1.0) == 1e6
+
+def test_render_is_cumulative_prometheus_text():
+    quote = metrics.histogram("rest", kind="quote")
+    for s in (0.002, 0.004, 0.5):
+        quote.observe(s)
+    with metrics.timer("ai_gate"):
+        pass
+
+    text = metrics.render()
+    buckets = series(text, "_bucket")
+    quote_buckets = [v for k, v in buckets.items() if k.startswith('stage="rest",kind="quote"')]
+    assert len(quote_buckets) == len(BUCKETS) + 1
+    assert quote_buckets == sorted(quote_buckets) # cumulative
+    assert buckets['stage="rest",kind="quote",le="+Inf"'] == 3
+    assert buckets['stage="rest",kind="quote",le="0.00501187"'] == 2
+
+    assert series(text, "_count") == {'stage="ai_gate"': 1, 'stage="rest",kind="quote"': 3}
+    assert series(text, "_sum")['stage="rest",kind="quote"'] == pytest.approx(0.506)
+    assert f"# TYPE {METRIC_NAME} histogram" in text
+    assert len(series(text, "_quantile")) == 4
+
+def test_reset_keeps_series_but_clears_samples(tmp_path):
+    metrics.observe("tick_to_order", 0.012)
+    assert metrics.summary()["tick_to_order"]["count"] == 1
+
+    path = str(tmp_path / "metrics" / "session.json")
+    metrics.write_file(path)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == metrics.summary()
+
+    metrics.reset()
+    assert metrics.summary() == {}
+    assert series(metrics.render(), "_count") == {'stage="tick_to_order"': 0}
+
+def test_http_endpoint():
+    metrics.observe("token_refresh", 0.2)
+    server = metrics.start_http_server(0)
+    try:
+        base = f"http://127.0.0.1:{server.server_port}"
+        res = requests.get(base + "/metrics", timeout=5)
+        assert res.status_code == 200
+        assert res.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert series(res.text, "_count") == {'stage="token_refresh"': 1}
+        assert requests.get(base + "/other", timeout=5).status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
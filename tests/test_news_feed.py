@@ -0,0 +1,77 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from modules.news_feed import NewsFeed
+
+def rss(items, encoding="utf-8"):
+    body = "".join(f"<item><guid>{guid}</guid><title>{title}</title></item>" for guid, title in items)
+    return f'<?xml version="1.0" encoding="{encoding}"?><rss><channel>{body}</channel></rss>'.encode(encoding)
+
+class Feed(BaseHTTPRequestHandler):
+    """One RSS document per path; answers If-None-Match with 304 while the ETag matches"""
+    protocol_version = "HTTP/1.1"
+    docs = {} # path -> (etag, body)
+    seen = [] # (path, If-None-Match) of every request
+
+    def do_GET(self):
+        self.seen.append((self.path, self.headers.get("If-None-Match")))
+        if self.path not in self.docs:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag, body = self.docs[self.path]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    Feed.docs, Feed.seen = {}, []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Feed)
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_unchanged_feed_is_a_304(server):
+    Feed.docs["/us"] = ('"v1"', rss([("2", "Nvidia beats"), ("1", "Fed holds")]))
+    feed = NewsFeed("US", sources=[server + "/us"], max_items=5)
+    assert feed.fetch(force=True) == "- Nvidia beats\n- Fed holds"
+
+    assert feed.poll(force=True) == 0
+    assert Feed.seen[-1] == ("/us", '"v1"')
+    assert feed.text() == "- Nvidia beats\n- Fed holds" # same text -> same verdict cache key
+    assert feed.stats()[server + "/us"]["not_modified"] == 1
+
+def test_only_new_items_are_added(server):
+    Feed.docs["/us"] = ('"v1"', rss([("1", "Fed holds")]))
+    feed = NewsFeed("US", sources=[server + "/us"], max_items=2)
+    feed.poll(force=True)
+
+    Feed.docs["/us"] = ('"v2"', rss([("3", "Oil spikes"), ("2", "Nvidia beats"), ("1", "Fed holds")]))
+    assert feed.poll(force=True) == 2
+    assert feed.text() == "- Oil spikes\n- Nvidia beats" # newest max_items kept
+
+def test_polls_are_rate_limited(server):
+    Feed.docs["/us"] = ('"v1"', rss([("1", "Fed holds")]))
+    feed = NewsFeed("US", sources=[server + "/us"], min_interval=60)
+    feed.poll()
+    assert feed.poll() == 0
+    assert len(Feed.seen) == 1
+
+def test_euc_kr_feed_and_a_failing_source(server):
+    Feed.docs["/kr"] = ('"k1"', rss([("1", "코스피 상승 마감")], encoding="euc-kr"))
+    feed = NewsFeed("KR", sources=[server + "/kr", server + "/down"])
+    assert feed.fetch(force=True) == "- 코스피 상승 마감"
@@ -0,0 +1,111 @@
+import time
+import datetime
+import threading
+import multiprocessing
+import pytest
+from modules import rate_limiter, clock
+from modules.clock import SimClock
+from modules.rate_limiter import RateLimiter
+import run_bot
+
+@pytest.fixture
+def limiter_file(tmp_path):
+    return str(tmp_path / "ratelimit.bin")
+
+@pytest.fixture
+def short_waits(monkeypatch):
+    for kind in rate_limiter.MAX_WAIT:
+        monkeypatch.setitem(rate_limiter.MAX_WAIT, kind, 0.05)
+
+def test_lane_caps_keep_headroom_for_orders(limiter_file, short_waits):
+    limiter = RateLimiter(max_calls=10, period=30, path=limiter_file)
+    assert limiter.caps == {"order": 10, "account": 9, "quote": 8, "history": 6}
+
+    assert all(limiter.wait("quote") for _ in range(8))
+    assert limiter.wait("quote") is False # quote lane full
+    assert limiter.wait("history") is False
+    assert limiter.wait("account") is True # 9th slot
+    assert limiter.wait("order") is True # 10th slot: reserved for orders
+    assert limiter.wait("order") is False # window full
+
+    stats = limiter.stats()
+    assert stats["calls_in_window"] == 10
+    assert stats["lanes"]["quote"]["timeouts"] == 1
+    assert stats["lanes"]["quote"]["count"] == 8
+
+def test_window_is_shared_across_instances(limiter_file, short_waits):
+    bot = RateLimiter(max_calls=10, period=30, path=limiter_file)
+    dashboard = RateLimiter(max_calls=10, period=30, path=limiter_file) # another process, same app key
+    assert all(bot.wait("quote") for _ in range(8))
+    assert dashboard.wait("quote") is False
+    assert dashboard.wait("order") is True
+    assert bot.stats()["calls_in_window"] == 9
+
+def test_queued_order_goes_before_queued_quote(limiter_file):
+    limiter = RateLimiter(max_calls=2, period=0.3, path=limiter_file)
+    assert limiter.wait("order") and limiter.wait("order") # window full for 0.3 s
+    granted = []
+
+    def request(kind):
+        assert limiter.wait(kind)
+        granted.append(kind)
+
+    quote = threading.Thread(target=request, args=("quote",))
+    quote.start()
+    time.sleep(0.05) # the quote queues first
+    order = threading.Thread(target=request, args=("order",))
+    order.start()
+    quote.join(5)
+    order.join(5)
+    assert granted == ["order", "quote"]
+
+def test_block_waits_past_max_wait(limiter_file, short_waits):
+    limiter = RateLimiter(max_calls=2, period=0.3, path=limiter_file)
+    assert limiter.wait("order") and limiter.wait("order")
+    assert limiter.wait("order") is False # would have been dropped after MAX_WAIT
+    t0 = time.monotonic()
+    assert limiter.wait("order", block=True) is True
+    assert time.monotonic() - t0 > 0.1
+
+class FlakyBroker:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def sell_market_order(self, ticker, qty):
+        self.calls += 1
+        if self.calls <= self.failures:
+            return None # rate limit / network error
+        return {'rt_cd': '0', 'msg1': 'ok'}
+
+def test_sell_off_retries_until_accepted():
+    previous = clock.set_clock(SimClock(datetime.datetime(2024, 1, 3, 6, 0)))
+    try:
+        broker = FlakyBroker(failures=3)
+        assert run_bot.sell_off("US", broker, ["TQQQ"]) == []
+        assert broker.calls == 4
+
+        stuck = FlakyBroker(failures=10 ** 6)
+        assert run_bot.sell_off("US", stuck, ["SOXL"]) == ["SOXL"] # gives up after SELLOFF_RETRY_SEC
+        assert clock.time() - datetime.datetime(2024, 1, 3, 6, 0).timestamp() <= run_bot.SELLOFF_RETRY_SEC + 30
+    finally:
+        clock.set_clock(previous)
+
+def _burst(path, n, out):
+    limiter = RateLimiter(max_calls=5, period=0.5, path=path)
+    for _ in range(n):
+        assert limiter.wait("order", block=True)
+        out.put(time.time())
+
+def test_window_holds_across_processes(limiter_file):
+    ctx = multiprocessing.get_context("fork")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_burst, args=(limiter_file, 5, out)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    stamps = sorted(out.get(timeout=30) for _ in range(15))
+    for p in procs:
+        p.join(10)
+        assert p.exitcode == 0
+    # No 0.5 s window (any start point) ever holds more than 5 calls from all processes together
+    assert all(stamps[i + 5] - stamps[i] >= 0.5 - 0.01 for i in range(len(stamps) - 5))
@@ -0,0 +1,63 @@
+import datetime
+import numpy as np
+import pytest
+from modules.bar_store import BarStore, BAR_DTYPE
+from modules.tick_tape import TickRecorder, session_bounds
+import replay
+import run_bot
+
+DATES = np.busday_offset("2024-01-02", np.arange(30), roll="forward")
+DAY = int(DATES[-1].astype(datetime.date).strftime("%Y%m%d"))
+
+@pytest.fixture
+def store(tmp_path):
+    """Universe in a steady uptrend, so the replayed day is a bull day with a reachable target"""
+    store = BarStore(str(tmp_path / "bars"))
+    for n, ticker in enumerate(replay.universe("US")):
+        close = 100.0 + n + np.arange(len(DATES)) * 0.5
+        bars = np.empty(len(DATES), dtype=BAR_DTYPE)
+        bars["date"] = [int(d.astype(datetime.date).strftime("%Y%m%d")) for d in DATES]
+        bars["open"] = close - 0.4
+        bars["high"] = close + 0.6
+        bars["low"] = close - 0.8
+        bars["close"] = close
+        bars["volume"] = 1000.0
+        store.merge("US", ticker, bars)
+    return store
+
+@pytest.fixture
+def minute_ticks(monkeypatch):
+    """A tick a minute still counts as a live stream (no REST fallback polling)"""
+    monkeypatch.setattr(run_bot, "STREAM_STALE_SEC", 120)
+    return 60
+
+def test_replay_from_daily_bars(store, tmp_path, minute_ticks):
+    rep = replay.replay_day("US", DAY, store, tape_dir=str(tmp_path / "tapes"), interval=minute_ticks)
+    tickers = replay.universe("US")
+    assert rep["source"] == "bars"
+    assert rep["ticks"] == len(tickers) * 390 # 23:30 ~ 05:59 every minute
+
+    # Each ticker breaks out once and is sold at the session end: nothing is held overnight
+    assert sorted(t["ticker"] for t in rep["trades"]) == sorted(tickers)
+    assert rep["fills"] == 2 * len(tickers)
+    assert all(t["exit_time"] > t["entry_time"] for t in rep["trades"])
+
+    again = replay.replay_day("US", DAY, store, tape_dir=str(tmp_path / "tapes"), interval=minute_ticks)
+    assert again["trades"] == rep["trades"] # deterministic
+
+def test_ai_rejection_blocks_every_buy(store, tmp_path, minute_ticks):
+    rep = replay.replay_day("US", DAY, store, tape_dir=str(tmp_path / "tapes"), can_buy=False, interval=minute_ticks)
+    assert rep["fills"] == 0 and rep["pnl"] == 0
+
+def test_recorded_tape_wins_over_bars(store, tmp_path):
+    start, _ = session_bounds("US", DAY)
+    recorder = TickRecorder(str(tmp_path / "tapes"), "US", DAY)
+    # TQQQ: previous day open 115.6, range 1.4 -> target 116.3
+    for i, price in enumerate([115.0, 116.5, 117.0, 116.0]):
+        recorder.record("TQQQ", price, start + datetime.timedelta(minutes=i))
+    recorder.record("TQQQ", 200.0, start - datetime.timedelta(minutes=1)) # before the session: ignored
+    recorder.close()
+
+    rep = replay.replay_day("US", DAY, store, tape_dir=str(tmp_path / "tapes"))
+    assert (rep["source"], rep["ticks"]) == ("tape", 4)
+    assert [(t["ticker"], t["entry"], t["exit"]) for t in rep["trades"]] == [("TQQQ", 116.5, 116.0)]
@@ -0,0 +1,78 @@
+import pytest
+from modules import sentiment_prefetcher
+from modules.sentiment_prefetcher import SentimentPrefetcher
+
+LOW = {"risk_level": "LOW", "can_buy": True, "reason": "calm"}
+HIGH = {"risk_level": "HIGH", "can_buy": False, "reason": "chip export ban"}
+ERROR = {"risk_level": "UNKNOWN", "can_buy": False, "reason": "AI Error: 503"}
+
+class ScriptedAnalyst:
+    """Returns the queued universe verdicts one refresh at a time"""
+    def __init__(self, *tables):
+        self.tables = list(tables)
+        self.calls = 0
+
+    def fetch_news(self, market="US"):
+        return "Fed holds rates"
+
+    def assess_universe(self, news_text, tickers, market="US"):
+        self.calls += 1
+        return self.tables.pop(0)
+
+class Monotonic:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Monotonic()
+    monkeypatch.setattr(sentiment_prefetcher, "time", fake)
+    return fake
+
+def test_no_verdict_means_no_buy(clock):
+    prefetcher = SentimentPrefetcher(ScriptedAnalyst(), "US", ["TQQQ"], max_age=300)
+    assert prefetcher.snapshot("TQQQ")["can_buy"] is False
+    assert prefetcher.snapshot("TQQQ")["risk_level"] == "UNKNOWN"
+    assert not prefetcher.wait_ready(0)
+
+def test_per_ticker_verdicts_fall_back_to_market(clock):
+    ai = ScriptedAnalyst({"SOXL": HIGH, "market": LOW})
+    prefetcher = SentimentPrefetcher(ai, "US", ["TQQQ", "SOXL"], max_age=300)
+    prefetcher.refresh()
+    assert prefetcher.wait_ready(0)
+    assert prefetcher.snapshot("SOXL") == HIGH
+    assert prefetcher.snapshot("TQQQ") == LOW # not scored: market verdict
+    assert prefetcher.snapshot() == LOW
+
+def test_ai_error_keeps_last_table_until_stale(clock):
+    ai = ScriptedAnalyst({"TQQQ": LOW, "market": LOW}, {"TQQQ": ERROR, "market": ERROR})
+    prefetcher = SentimentPrefetcher(ai, "US", ["TQQQ"], max_age=300)
+    prefetcher.refresh()
+
+    clock.now += 200
+    prefetcher.refresh() # failed refresh does not replace or re-date the good table
+    assert prefetcher.snapshot("TQQQ") == LOW
+
+    clock.now += 101
+    stale = prefetcher.snapshot("TQQQ")
+    assert (stale["risk_level"], stale["can_buy"]) == ("UNKNOWN", False)
+    assert "stale" in stale["reason"]
+
+def test_first_refresh_failing_blocks_buys(clock):
+    prefetcher = SentimentPrefetcher(ScriptedAnalyst({"TQQQ": ERROR, "market": ERROR}), "US", ["TQQQ"], max_age=300)
+    prefetcher.refresh()
+    assert prefetcher.snapshot("TQQQ")["can_buy"] is False
+
+def test_background_refresh():
+    ai = ScriptedAnalyst(*[{"market": LOW}] * 100)
+    prefetcher = SentimentPrefetcher(ai, "US", ["TQQQ"], interval=0.01, max_age=60).start()
+    try:
+        assert prefetcher.wait_ready(5)
+        assert prefetcher.snapshot("TQQQ") == LOW
+    finally:
+        prefetcher.stop()
+        prefetcher._thread.join(5)
+    assert not prefetcher._thread.is_alive()
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from strategies.backtest import run_backtest
+from sweep import build_tasks, sweep
+
+@pytest.fixture(scope="module")
+def bars():
+    """4 tickers x 300 days of random-walk OHLC matrices"""
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(rng.normal(0.0005, 0.02, (4, 300)).cumsum(axis=1))
+    open_ = close * (1 + rng.normal(0, 0.01, close.shape))
+    spread = np.abs(rng.normal(0, 0.01, close.shape))
+    return {"open": open_, "high": np.maximum(open_, close) * (1 + spread),
+            "low": np.minimum(open_, close) * (1 - spread), "close": close}
+
+def test_grid_covers_every_combination():
+    tasks = build_tasks(4, ks=[0.4, 0.5], mas=[5, 20], stops=[0, 0.02], fee=0.001)
+    assert len(tasks) == 8
+    assert {(t["k"], t["ma"], t["stop"]) for t in tasks} == {(k, m, s) for k in (0.4, 0.5) for m in (5, 20) for s in (0, 0.02)}
+    assert all(t["subset"] == (0, 1, 2, 3) and t["fee"] == 0.001 for t in tasks)
+
+def test_subsets_and_random_search_are_reproducible():
+    tasks = build_tasks(4, [0.5], [20], [0], subset_size=2, n_subsets=10)
+    subsets = [t["subset"] for t in tasks]
+    assert subsets[0] == (0, 1, 2, 3)
+    assert len(subsets) == 1 + 6 # capped at C(4, 2)
+    assert len(set(subsets)) == len(subsets)
+
+    grid = dict(ks=[0.3, 0.4, 0.5, 0.6], mas=[5, 10, 20], stops=[0, 0.02, 0.05])
+    picked = build_tasks(4, samples=5, seed=3, **grid)
+    assert len(picked) == 5
+    assert picked == build_tasks(4, samples=5, seed=3, **grid)
+
+def test_pool_results_match_a_serial_run(bars):
+    tasks = build_tasks(4, ks=[0.3, 0.5], mas=[5, 20], stops=[0, 0.03], subset_size=3, n_subsets=2)
+    results = sweep(bars, tasks, workers=2, metric="total_return")
+    assert len(results) == len(tasks)
+
+    returns = [r["total_return"] for r in results]
+    assert returns == sorted(returns, reverse=True)
+
+    for r in results:
+        rows = list(r["subset"])
+        rep = run_backtest({f: m[rows] for f, m in bars.items()}, k=r["k"], ma_window=r["ma"], stop_loss=r["stop"] or None)
+        assert (r["trades"], r["total_return"], r["sharpe"]) == (rep["trades"], rep["total_return"], rep["sharpe"])
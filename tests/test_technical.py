@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+from strategies.technical import SMA
+
+NAN_AT = [5, 6, 50]
+
+def walk(n=120, seed=0, nan_at=()):
+    rng = np.random.default_rng(seed)
+    x = 100 + rng.normal(0, 1, n).cumsum()
+    x[list(nan_at)] = np.nan
+    return x
+
+def stream(indicator, *columns):
+    """Feed rows one by one; None -> NaN so the result compares against pandas"""
+    out = [indicator.update(*row) for row in zip(*columns)]
+    return np.array([np.nan if v is None else v for v in out], dtype=float)
+
+def assert_same(actual, expected):
+    np.testing.assert_array_equal(actual, np.asarray(expected, dtype=float))
+
+@pytest.mark.parametrize("nan_at", [(), NAN_AT])
+def test_sma(nan_at):
+    x = walk(nan_at=nan_at)
+    assert_same(stream(SMA(20), x), pd.Series(x).rolling(20).mean())
+
+def test_sma_constant_window_is_exact():
+    x = np.r_[walk(30), np.full(25, 101.1)]
+    assert_same(stream(SMA(20), x), pd.Series(x).rolling(20).mean())
+
+def test_sma_peek_last_follows_the_live_price():
+    x = walk(25)
+    sma = SMA(20).warm(x[:24])
+    assert sma.peek_last(101.5) == pytest.approx(pd.Series(np.r_[x[:23], 101.5]).rolling(20).mean().iloc[-1], rel=1e-12)
+    assert sma.value == pd.Series(x[:24]).rolling(20).mean().iloc[-1] # state unchanged
+    assert SMA(20).warm(x[:19]).peek_last(101.5) is None
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from modules.tick_decoder import SCHEMAS, ROW_DTYPE, Tick, Quote, decode_frame, decode_frames
+
+def record(tr_id, **values):
+    """One record of a TR: every schema field, named ones filled in"""
+    return "^".join(str(values.get(name, "0")) for name in SCHEMAS[tr_id].fields)
+
+def frame(tr_id, records, count=None):
+    return f"0|{tr_id}|{len(records) if count is None else count:03d}|" + "^".join(records)
+
+US_TRADES = frame("HDFSCNT0", [
+    record("HDFSCNT0", RSYM="DNASTQQQ", XHMS="093001", LAST="61.25", EVOL="100"),
+    record("HDFSCNT0", RSYM="DNASSOXL", XHMS="093001", LAST="30.5", EVOL="7"),
+])
+KR_TRADE = frame("H0STCNT0", [record("H0STCNT0", MKSC_SHRN_ISCD="122630", STCK_CNTG_HOUR="090000", STCK_PRPR="15020", CNTG_VOL="3")])
+US_QUOTE = frame("HDFSASP0", [record("HDFSASP0", RSYM="DNASTQQQ", XHMS="093002", PBID1="61.2", PASK1="61.3", VBID1="5", VASK1="9")])
+KR_QUOTE = frame("H0STASP0", [record("H0STASP0", MKSC_SHRN_ISCD="122630", BSOP_HOUR="090001", BIDP1="15015", ASKP1="15020",
+                                     BIDP_RSQN1="40", ASKP_RSQN1="12")])
+
+def test_schema_widths_match_kis_specs():
+    assert {tr: s.width for tr, s in SCHEMAS.items()} == {"HDFSCNT0": 26, "H0STCNT0": 46, "HDFSASP0": 17, "H0STASP0": 59}
+
+def test_decode_trades_and_quotes():
+    assert decode_frame(US_TRADES) == [
+        Tick("HDFSCNT0", "DNASTQQQ", "093001", 61.25, 100.0),
+        Tick("HDFSCNT0", "DNASSOXL", "093001", 30.5, 7.0),
+    ]
+    assert decode_frame(KR_TRADE) == [Tick("H0STCNT0", "122630", "090000", 15020.0, 3.0)]
+    assert decode_frame(US_QUOTE) == [Quote("HDFSASP0", "DNASTQQQ", "093002", 61.2, 61.3, 5.0, 9.0)]
+    assert decode_frame(KR_QUOTE) == [Quote("H0STASP0", "122630", "090001", 15015.0, 15020.0, 40.0, 12.0)]
+
+@pytest.mark.parametrize("data", [
+    '{"header": {"tr_id": "PINGPONG"}}', # system JSON
+    "1|H0STCNI0|001|encrypted", # encrypted execution notice
+    "0|H0STCNI0|001|a^b^c", # TR we don't decode
+    "0|HDFSCNT0|001", # no payload
+])
+def test_non_market_data_frames_are_skipped(data):
+    assert decode_frame(data) == []
+    assert len(decode_frames([data])) == 0
+
+def test_only_complete_records_are_trusted():
+    full = record("HDFSCNT0", RSYM="DNASTQQQ", LAST="61.25", EVOL="1")
+    truncated = frame("HDFSCNT0", [full, full[:20]], count=2)
+    assert [t.symbol for t in decode_frame(truncated)] == ["DNASTQQQ"]
+    overcounted = frame("HDFSCNT0", [full], count=3)
+    assert len(decode_frame(overcounted)) == 1
+
+def test_decode_frames_matches_decode_frame():
+    frames = [US_TRADES, '{"header": {"tr_id": "PINGPONG"}}', KR_QUOTE, KR_TRADE, US_QUOTE]
+    rows = decode_frames(frames)
+    assert rows.dtype == ROW_DTYPE
+    records = [r for f in frames for r in decode_frame(f)]
+    assert len(rows) == len(records) == 5
+
+    for row, rec in zip(rows, records):
+        assert (row["tr_id"], row["symbol"], row["time"]) == (rec.tr_id, rec.symbol, rec.time)
+        if isinstance(rec, Tick):
+            assert (row["price"], row["volume"]) == (rec.price, rec.volume)
+            assert np.isnan([row["bid"], row["ask"], row["bid_size"], row["ask_size"]]).all()
+        else:
+            assert (row["bid"], row["ask"], row["bid_size"], row["ask_size"]) == (rec.bid, rec.ask, rec.bid_size, rec.ask_size)
+            assert np.isnan([row["price"], row["volume"]]).all()
+
+    assert len(decode_frames([])) == 0
+
+def test_malformed_record_is_dropped_alone():
+    good = record("HDFSCNT0", RSYM="DNASTQQQ", XHMS="093001", LAST="61.25", EVOL="100")
+    bad = record("HDFSCNT0", RSYM="DNASSOXL", XHMS="093001", LAST="", EVOL="7")
+    data = frame("HDFSCNT0", [good, bad, good.replace("61.25", "61.3")])
+    assert [t.price for t in decode_frame(data)] == [61.25, 61.3]
+
+    quotes = frame("HDFSASP0", [record("HDFSASP0", RSYM="DNASTQQQ", PBID1="x", PASK1="61.3"),
+                                record("HDFSASP0", RSYM="DNASTQQQ", PBID1="61.2", PASK1="61.3")])
+    assert [q.bid for q in decode_frame(quotes)] == [61.2]
+
+    rows = decode_frames([data, KR_TRADE, quotes])
+    assert list(rows["symbol"]) == ["DNASTQQQ", "DNASTQQQ", "122630", "DNASTQQQ"]
+    assert list(rows["price"][:3]) == [61.25, 61.3, 15020.0]
@@ -0,0 +1,112 @@
+import json
+import time
+import threading
+import pytest
+from modules import token_store
+from modules.token_store import CredentialStore, get_credential_store, REFRESH_AHEAD, EXPIRY_MARGIN
+
+class Response:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+        self.text = json.dumps(body)
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status_code != 200:
+            raise RuntimeError(self.status_code)
+
+class FakeSession:
+    """tokenP: issues token-1, token-2, ...; answers EGW00133 while rate_limited"""
+    def __init__(self):
+        self.posts = 0
+        self.rate_limited = False
+
+    def post(self, url, headers=None, data=None, timeout=None):
+        self.posts += 1
+        if self.rate_limited:
+            return Response(403, {"error_code": "EGW00133"})
+        return Response(200, {"access_token": f"token-{self.posts}", "expires_in": 86400})
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "token.json")
+
+def make_store(path, session):
+    store = CredentialStore("https://example", "app", "secret", path=path)
+    store.session = session
+    return store
+
+def test_token_issued_once_and_shared_through_the_file(path):
+    session = FakeSession()
+    bot = make_store(path, session)
+    token, usable_until = bot.get_access_token()
+    assert token == "token-1"
+    assert usable_until == pytest.approx(time.time() + 86400 - EXPIRY_MARGIN, abs=5)
+
+    dashboard = make_store(path, session) # another process, same file
+    assert dashboard.get_access_token()[0] == "token-1"
+    assert bot.get_access_token()[0] == "token-1" # memory
+    assert session.posts == 1
+
+def test_rate_limit_wait_releases_the_lock(path, monkeypatch):
+    monkeypatch.setattr(token_store, "TOKEN_RETRY_WAIT", 0.5)
+    limited = FakeSession()
+    limited.rate_limited = True
+    waiting = make_store(path, limited)
+    other = make_store(path, FakeSession())
+
+    def other_process():
+        time.sleep(0.1) # while 'waiting' sleeps out EGW00133
+        t0 = time.monotonic()
+        with other.lock:
+            other.lock_wait = time.monotonic() - t0
+            other._issue_token()
+
+    thread = threading.Thread(target=other_process)
+    thread.start()
+    token, _ = waiting.get_access_token()
+    thread.join()
+
+    assert other.lock_wait < 0.2 # not blocked for the whole retry wait
+    assert token == "token-1" # re-checked the file after the wait instead of calling tokenP again
+    assert limited.posts == 1
+
+def test_rate_limit_twice_raises(path, monkeypatch):
+    monkeypatch.setattr(token_store, "TOKEN_RETRY_WAIT", 0.01)
+    session = FakeSession()
+    session.rate_limited = True
+    with pytest.raises(RuntimeError, match="EGW00133"):
+        make_store(path, session).get_access_token()
+    assert session.posts == 2
+
+def test_refresh_if_due(path):
+    session = FakeSession()
+    store = make_store(path, session)
+    with store.lock:
+        store._update(access_token="old", token_expires_at=time.time() + REFRESH_AHEAD + 100)
+    assert store.refresh_if_due() == pytest.approx(100, abs=5)
+    assert session.posts == 0
+
+    with store.lock:
+        store._update(token_expires_at=time.time() + REFRESH_AHEAD - 100) # due
+    delay = store.refresh_if_due()
+    assert session.posts == 1
+    assert store.get_access_token()[0] == "token-1"
+    assert delay == pytest.approx(86400 - REFRESH_AHEAD, abs=5)
+
+    session.rate_limited = True
+    with store.lock:
+        store._update(token_expires_at=time.time() + 10)
+    assert store.refresh_if_due() == token_store.TOKEN_RETRY_WAIT
+
+def test_refresher_only_on_request(monkeypatch):
+    monkeypatch.setattr(token_store, "_stores", {})
+    started = []
+    monkeypatch.setattr(CredentialStore, "start_refresher", lambda self: started.append(self))
+    store = get_credential_store("https://example", "app", "secret")
+    assert started == [] # dashboard / scripts
+    assert get_credential_store("https://example", "app", "secret", refresher=True) is store
+    assert started == [store]
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from strategies.technical import calculate_ma, check_trend
+from strategies.volatility_breakout import calculate_target_price
+from strategies.universe import to_bar_matrix, calculate_universe_targets, check_trend_universe
+
+def rows(n, base=100.0, first_date=20240130):
+    """KIS-style daily rows, latest first, numbers as strings"""
+    return [{'xymd': str(first_date - i), 'open': str(base + i), 'high': str(base + i + 2),
+             'low': str(base + i - 1), 'clos': str(base + i + 0.5)} for i in range(n)]
+
+def test_to_bar_matrix_pads_missing_with_nan():
+    bars = to_bar_matrix([rows(25), None, rows(3, base=50.0)], length=22)
+    assert bars["close"].shape == (3, 22)
+    assert bars["close"][0, 0] == 100.5 and bars["close"][0, 21] == 121.5
+    assert np.isnan(bars["close"][1]).all()
+    assert list(bars["open"][2, :3]) == [50.0, 51.0, 52.0]
+    assert np.isnan(bars["open"][2, 3:]).all()
+    assert to_bar_matrix([rows(4), []])["high"].shape == (2, 4)
+
+def test_targets_match_scalar_rules():
+    histories = [rows(30), rows(20, base=80.0), rows(19, base=60.0), None]
+    bars = to_bar_matrix(histories, length=20)
+    prices = [115.0, 79.0, 61.0, 50.0]
+    out = calculate_universe_targets(bars, window=20, k=0.5)
+
+    for i, hist in enumerate(histories[:3]):
+        ma = calculate_ma([float(r['clos']) for r in reversed(hist)], 20) # oldest first
+        if ma is None:
+            assert np.isnan(out["ma"][i])
+        else:
+            assert out["ma"][i] == pytest.approx(ma, rel=1e-12)
+        assert out["open"][i] == float(hist[0]['open'])
+        assert out["target"][i] == calculate_target_price(float(hist[0]['open']), hist, 0.5)
+    assert np.isnan(out["target"][3])
+
+    bull = check_trend_universe(prices, out["ma"])
+    assert list(bull) == [check_trend(p, None if np.isnan(m) else m) for p, m in zip(prices, out["ma"])]
+    assert list(bull) == [True, False, False, False]
+
+def test_short_history_universe():
+    out = calculate_universe_targets(to_bar_matrix([rows(5)]), window=20)
+    assert np.isnan(out["ma"]).all()
+    assert out["range"][0] == 3.0
+    assert out["target"][0] == 100.0 + 3.0 * 0.5
@@ -0,0 +1,83 @@
+import time
+import threading
+import pytest
+from modules import verdict_cache
+from modules.verdict_cache import VerdictCache, headline_key
+
+LOW = {"risk_level": "LOW", "can_buy": True, "reason": "calm"}
+HIGH = {"risk_level": "HIGH", "can_buy": False, "reason": "rate shock"}
+
+class FakeTime:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(verdict_cache, "time", fake)
+    return fake
+
+def test_headline_set_key_ignores_order_and_repeats():
+    assert headline_key("Fed holds\nNvidia beats\n") == headline_key("  Nvidia beats\n\nFed holds\nFed holds")
+    assert headline_key("Fed holds") != headline_key("Fed hikes")
+
+def test_entries_expire_after_ttl(fake_time):
+    cache = VerdictCache(ttl=60)
+    cache.put("k", LOW)
+    fake_time.now += 59
+    assert cache.get("k") == LOW
+    fake_time.now += 1
+    assert cache.get("k") is None
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+def test_least_recently_used_is_evicted_first(fake_time):
+    cache = VerdictCache(ttl=60, max_entries=2)
+    cache.put("a", LOW)
+    cache.put("b", HIGH)
+    cache.get("a") # a is now the most recent
+    cache.put("c", LOW)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (LOW, None, LOW)
+
+def test_verdicts_survive_restarts_and_are_shared(tmp_path, fake_time):
+    path = str(tmp_path / "ai" / "verdicts.json")
+    bot, dashboard = VerdictCache(path, ttl=60), VerdictCache(path, ttl=60)
+    bot.put("a", LOW)
+    dashboard.put("b", HIGH) # merges what the bot wrote instead of overwriting it
+
+    restarted = VerdictCache(path, ttl=60)
+    assert (restarted.get("a"), restarted.get("b")) == (LOW, HIGH)
+
+    fake_time.now += 61
+    assert len(VerdictCache(path, ttl=60)._entries) == 0 # expired on disk: not loaded
+
+def test_concurrent_misses_compute_once():
+    cache = VerdictCache(ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def ask_model():
+        calls.append(1)
+        release.wait(5)
+        return LOW
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", ask_model))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+    assert results == [LOW] * 4
+    assert len(calls) == 1
+
+def test_errors_are_not_cached():
+    cache = VerdictCache(ttl=60)
+    error = {"risk_level": "UNKNOWN", "can_buy": False, "reason": "AI Error: timeout"}
+    cacheable = lambda verdict: verdict["risk_level"] != "UNKNOWN"
+    assert cache.get_or_compute("k", lambda: error, cacheable) == error
+    assert cache.get_or_compute("k", lambda: LOW, cacheable) == LOW
+    assert cache.get("k") == LOW